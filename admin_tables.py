@@ -0,0 +1,126 @@
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.orm import joinedload
+from extensions import db
+from models import User, Listing, Message
+from search import search_condition
+
+# ==================== KONŠTANTY ====================
+# Povolené zoradenia (?sort=) - každé má index: created_at cez ix_listing_(*_)created_at / ix_message_created_at,
+# cena cez ix_listing_status_price; id na konci robí poradie stabilným pri rovnakých hodnotách
+LISTING_SORTS = {
+    'newest': (Listing.created_at.desc(), Listing.id.desc()),
+    'oldest': (Listing.created_at.asc(), Listing.id.asc()),
+    'price_desc': (Listing.price.desc(), Listing.id.desc()),
+    'price_asc': (Listing.price.asc(), Listing.id.asc()),
+}
+MESSAGE_SORTS = {
+    'newest': (Message.created_at.desc(), Message.id.desc()),
+    'oldest': (Message.created_at.asc(), Message.id.asc()),
+}
+LISTING_STATUSES = ('active', 'sold', 'inactive')
+MESSAGE_STATUSES = ('read', 'unread')
+DATE_FORMAT = '%Y-%m-%d'
+
+
+# ==================== POMOCNÉ FUNKCIE ====================
+def _parse_date(value):
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+def _user_id(value):
+    """ID používateľa z filtra ?user= (číslo alebo presné používateľské meno cez unikátny index)"""
+    if value.isdigit():
+        return int(value)
+    return db.select(User.id).where(User.username == value).scalar_subquery()
+
+
+def _filter_args(args, names):
+    """Neprázdne hodnoty filtrov (pre formulár, odkazy stránkovania a kľúč cache počtu)"""
+    filters = {}
+    for name in names:
+        value = args.get(name, '').strip()
+        if value:
+            filters[name] = value
+    return filters
+
+
+def _apply_dates(query, column, filters):
+    date_from = _parse_date(filters.get('date_from'))
+    date_to = _parse_date(filters.get('date_to'))
+    if date_from:
+        query = query.filter(column >= date_from)
+    else:
+        filters.pop('date_from', None)
+    if date_to:
+        query = query.filter(column < date_to + timedelta(days=1))  # vrátane celého dňa
+    else:
+        filters.pop('date_to', None)
+    return query
+
+
+# ==================== FILTRE ====================
+def filter_listings(args):
+    """Query pre admin tabuľku inzerátov podľa ?status=&user=&date_from=&date_to=&q=&sort=.
+
+    Vráti (query, filters) - autor a kategória sa načítajú v tom istom dotaze (joinedload).
+    Text q sa hľadá cez FTS5 index listing_fts (slová s prefixovou zhodou, ako /listings?q=).
+    """
+    filters = _filter_args(args, ('status', 'user', 'date_from', 'date_to', 'q', 'sort'))
+    query = Listing.query.options(joinedload(Listing.author), joinedload(Listing.category))
+
+    if filters.get('status') in LISTING_STATUSES:
+        query = query.filter(Listing.status == filters['status'])
+    else:
+        filters.pop('status', None)
+    if 'user' in filters:
+        query = query.filter(Listing.user_id == _user_id(filters['user']))
+    query = _apply_dates(query, Listing.created_at, filters)
+    condition = search_condition(filters['q']) if 'q' in filters else None
+    if condition is not None:
+        query = query.filter(condition)
+    else:
+        filters.pop('q', None)
+
+    if filters.get('sort') not in LISTING_SORTS:
+        filters.pop('sort', None)
+    return query.order_by(*LISTING_SORTS[filters.get('sort', 'newest')]), filters
+
+
+def filter_messages(args):
+    """Query pre admin tabuľku správ podľa ?status=read|unread&user=&sender=&date_from=&date_to=&q=&sort=.
+
+    Filter user hľadá odosielateľa aj príjemcu, sender len odosielateľa; odosielateľ, príjemca
+    a inzerát sa načítajú naraz. Text q nemá index (ILIKE prechádza všetky správy, ktoré prejdú
+    ostatnými filtrami) - pri veľkom počte správ ho treba kombinovať s user/sender alebo dátumom.
+    """
+    filters = _filter_args(args, ('status', 'user', 'sender', 'date_from', 'date_to', 'q', 'sort'))
+    query = Message.query.options(joinedload(Message.sender), joinedload(Message.receiver),
+                                  joinedload(Message.listing))
+
+    if filters.get('status') in MESSAGE_STATUSES:
+        query = query.filter(Message.is_read.is_(filters['status'] == 'read'))
+    else:
+        filters.pop('status', None)
+    if 'user' in filters:
+        user_id = _user_id(filters['user'])
+        query = query.filter(or_(Message.sender_id == user_id, Message.receiver_id == user_id))
+    if 'sender' in filters:
+        query = query.filter(Message.sender_id == _user_id(filters['sender']))
+    query = _apply_dates(query, Message.created_at, filters)
+    if 'q' in filters:
+        query = query.filter(Message.content.ilike(f"%{filters['q']}%"))
+
+    if filters.get('sort') not in MESSAGE_SORTS:
+        filters.pop('sort', None)
+    return query.order_by(*MESSAGE_SORTS[filters.get('sort', 'newest')]), filters
+
+
+def selected_ids(form, query, id_column):
+    """ID vybrané v admin tabuľke: zaškrtnuté riadky (ids) alebo pri scope=filter všetky vyhovujúce filtru"""
+    if form.get('scope') == 'filter':
+        return [id for (id,) in query.with_entities(id_column).order_by(None).all()]
+    return sorted(set(form.getlist('ids', type=int)))
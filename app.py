@@ -1,55 +1,88 @@
 from flask import Flask
-from extensions import db, login_manager
+from flask_login import current_user
+from extensions import db, login_manager, cache
 from models import User
-import routes
-
-
-def create_app():
+from database import configure_database, database_uri_from_env, DEFAULT_DATABASE_URI
+from images import image_pipeline
+from assets import assets
+from metrics import metrics
+from moderation import moderation
+from events import event_broker
+from popularity import view_counter
+from routes import register_routes
+
+
+def create_app(config=None):
+    """Vytvorí kompletnú aplikáciu (konfigurácia, rozšírenia, routes) - pre vývojový server aj WSGI"""
     app = Flask(__name__)
 
     # Konfigurácia
     app.config['SECRET_KEY'] = 'heslo, ktore sa potom ma zmenit na nieco bezpecnejsie'
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///data.db'
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_uri_from_env('DATABASE_URL', DEFAULT_DATABASE_URI)
+    app.config['DB_REPLICA_URI'] = database_uri_from_env('DATABASE_REPLICA_URL')
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['CACHE_BACKEND'] = 'memory'  # 'sqlite' = cache zdieľaná medzi workermi (instance/cache.db)
+    # Ostatné kľúče z prostredia s prefixom FLASK_, napr. FLASK_DB_POOL_SIZE=20 (hodnoty sa čítajú ako JSON)
+    app.config.from_prefixed_env()
+    if config:
+        app.config.update(config)
 
     # Inicializácia rozšírení
+    configure_database(app)
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = 'login'
+    cache.init_app(app)
+    image_pipeline.init_app(app)
+    assets.init_app(app)
+    metrics.init_app(app)
+    moderation.init_app(app)
+    view_counter.init_app(app)
+    event_broker.init_app(app)
+
+    # Nastavenie context processor
+    @app.context_processor
+    def inject_user():
+        return dict(current_user=current_user)
+
+    # Import a registrácia všetkých routes
+    register_routes(app)
+
+    # CLI príkazy
+    from commands import register_commands
+    register_commands(app)
 
     return app
 
 
+# User loader pre Flask-Login
+@login_manager.user_loader
+def load_user(user_id):
+    return db.session.get(User, int(user_id))
+
+
 def init_db(app):
     """Vytvorí databázové tabuľky"""
     with app.app_context():
         db.create_all()
 
+        # Zmeny schémy pre existujúcu databázu (create_all nemení existujúce tabuľky)
+        from migrations import run_migrations
+        run_migrations()
 
-if __name__ == '__main__':
-    app = create_app()
-
-
-    # Nastavenie context processor
-    @app.context_processor
-    def inject_user():
-        from flask_login import current_user
-        return dict(current_user=current_user)
-
-
-    # User loader pre Flask-Login
-    @login_manager.user_loader
-    def load_user(user_id):
-        from models import User
-        return db.session.get(User, int(user_id))
+        # Fulltextový index inzerátov (FTS5)
+        from search import create_search_index
+        create_search_index()
 
+        # Úlohy moderovania prerušené ukončením servera už nikto nedokončí
+        from moderation import moderation
+        moderation.fail_interrupted_jobs()
 
-    # Import a registrácia všetkých routes
-    from routes import register_routes
 
-    register_routes(app)  # TOTO JE KĽÚČOVÉ!
+if __name__ == '__main__':
+    app = create_app()
 
     # Inicializácia databázy
     init_db(app)
 
-    app.run(debug=True)
\ No newline at end of file
+    app.run(debug=True)
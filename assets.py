@@ -0,0 +1,275 @@
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:  # bez balíka brotli sa vytvárajú len .gz varianty
+    brotli = None
+
+# ==================== KONŠTANTY ====================
+ASSET_FOLDERS = ('css', 'js')  # podpriečinky v static/, ktoré sa spracúvajú
+DIST_FOLDER = 'dist'  # výstup build-assets v static/
+MANIFEST_NAME = 'manifest.json'
+FINGERPRINT_LENGTH = 10
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600  # sekúnd
+COMPRESSED_VARIANTS = (('br', '.br'), ('gzip', '.gz'))  # poradie preferencie
+CONTENT_ADDRESSED = re.compile(r'^uploads/(renditions/)?([0-9a-f]{2}/){2}[0-9a-f]{64}[\w.-]*$')
+
+
+# ==================== MINIFIKÁCIA ====================
+def minify_css(source):
+    """Odstráni komentáre a nadbytočné medzery (konzervatívne - nemení selektory)"""
+    source = re.sub(r'/\*.*?\*/', '', source, flags=re.DOTALL)
+    source = re.sub(r'\s+', ' ', source)
+    source = re.sub(r'\s*([{};,>])\s*', r'\1', source)
+    source = re.sub(r':\s+', ':', source)
+    return source.replace(';}', '}').strip()
+
+
+_REGEX_PRECEDERS = set('(,=:[!&|?{};+-*%<>~^')
+# Po týchto slovách začína '/' regulárny výraz (po identifikátore, čísle, ')' či ']' je to delenie)
+_REGEX_KEYWORDS = re.compile(r'(?<![\w$.])(return|typeof|case|delete|void|instanceof|in|of|new|throw|'
+                             r'yield|await|else|do)\s*$')
+
+
+def minify_js(source):
+    """Odstráni komentáre, odsadenie a prázdne riadky mimo reťazcov a šablón.
+
+    Konce riadkov sa zachovávajú (automatické vkladanie bodkočiarok ostáva bez zmeny)
+    a obsah reťazcov, template literálov aj regulárnych výrazov sa kopíruje doslova.
+
+    Či '/' začína regulárny výraz alebo je delenie, sa určí podľa predchádzajúceho tokenu:
+    po operátore alebo kľúčovom slove (return, typeof, ...) regex, po hodnote delenie - aj po
+    postfixovom 'i++' / 'a--'. Regex nemôže pokračovať cez koniec riadku; ak by musel, je to delenie.
+    Nejednoznačné prípady drží tests/test_assets.py.
+    """
+    out = []
+    i, length = 0, len(source)
+    templates = []  # hĺbky zátvoriek pre vnorené ${...} v template literáloch
+    line_start = True
+    last_significant = ''
+    previous_significant = ''
+
+    def copy_quoted(start, quote):
+        j = start + 1
+        while j < length and source[j] != quote:
+            j += 2 if source[j] == '\\' else 1
+        return j + 1
+
+    def copy_regex(start):
+        """Koniec regulárneho výrazu (vrátane príznakov) alebo None, ak to regex nie je"""
+        j, in_class = start + 1, False
+        while j < length and source[j] != '\n':
+            char = source[j]
+            if char == '\\':
+                j += 2
+                continue
+            if char == '[':
+                in_class = True
+            elif char == ']':
+                in_class = False
+            elif char == '/' and not in_class:
+                j += 1
+                while j < length and (source[j].isalnum() or source[j] in '_$'):
+                    j += 1
+                return j
+            j += 1
+        return None
+
+    def starts_regex():
+        if not last_significant:
+            return True
+        if last_significant in '+-' and previous_significant == last_significant:
+            return False  # postfixové i++ / a--
+        return last_significant in _REGEX_PRECEDERS or _REGEX_KEYWORDS.search(''.join(out[-12:])) is not None
+
+    def remember(char):
+        nonlocal last_significant, previous_significant
+        previous_significant, last_significant = last_significant, char
+
+    while i < length:
+        char = source[i]
+
+        if line_start and char in ' \t':
+            i += 1
+            continue
+        if char == '\n':
+            while out and out[-1] in (' ', '\t'):
+                out.pop()
+            if not line_start:
+                out.append('\n')
+            line_start = True
+            i += 1
+            continue
+
+        if source.startswith('//', i):
+            end = source.find('\n', i)
+            i = length if end == -1 else end
+            continue
+        if source.startswith('/*', i):
+            end = source.find('*/', i + 2)
+            i = length if end == -1 else end + 2
+            continue
+
+        line_start = False
+
+        if char in '\'"':
+            end = copy_quoted(i, char)
+            out.append(source[i:end])
+            remember(char)
+            i = end
+            continue
+        if char == '/' and starts_regex():
+            end = copy_regex(i)
+            if end is not None:
+                out.append(source[i:end])
+                remember('/')
+                i = end
+                continue
+
+        if char == '`' or (char == '}' and templates and templates[-1] == 0):
+            if char == '}':
+                templates.pop()
+            j = i + 1
+            while j < length and source[j] != '`' and not source.startswith('${', j):
+                j += 2 if source[j] == '\\' else 1
+            if source.startswith('${', j):
+                templates.append(0)
+                j += 2
+            else:
+                j += 1
+            out.append(source[i:j])
+            remember('`' if source[j - 1] == '`' else '{')
+            i = j
+            continue
+
+        if templates:
+            if char == '{':
+                templates[-1] += 1
+            elif char == '}':
+                templates[-1] -= 1
+
+        out.append(char)
+        if not char.isspace():
+            remember(char)
+        i += 1
+
+    return ''.join(out).strip() + '\n'
+
+
+MINIFIERS = {'.css': minify_css, '.js': minify_js}
+
+
+# ==================== BUILD ====================
+def fingerprinted_name(path, content):
+    """'js/main.js' -> 'dist/js/main.<hash>.js'"""
+    digest = hashlib.sha256(content).hexdigest()[:FINGERPRINT_LENGTH]
+    stem, extension = os.path.splitext(path)
+    return f'{DIST_FOLDER}/{stem}.{digest}{extension}'
+
+
+def build_assets(static_folder):
+    """Minifikuje CSS/JS, uloží ich pod názvom s hashom obsahu spolu s .gz/.br variantmi a zapíše manifest.
+
+    Staré verzie v static/dist sa nemažú, aby stránky v cache prehliadačov ešte chvíľu fungovali.
+    """
+    manifest = {}
+    for folder in ASSET_FOLDERS:
+        for root, _, files in os.walk(os.path.join(static_folder, folder)):
+            for name in sorted(files):
+                extension = os.path.splitext(name)[1]
+                if extension not in MINIFIERS:
+                    continue
+                source_path = os.path.join(root, name)
+                path = os.path.relpath(source_path, static_folder).replace(os.sep, '/')
+
+                with open(source_path, encoding='utf-8') as f:
+                    content = MINIFIERS[extension](f.read()).encode('utf-8')
+
+                target = fingerprinted_name(path, content)
+                target_path = os.path.join(static_folder, target)
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                with open(target_path, 'wb') as f:
+                    f.write(content)
+                with open(target_path + '.gz', 'wb') as f:
+                    f.write(gzip.compress(content, 9, mtime=0))
+                if brotli is not None:
+                    with open(target_path + '.br', 'wb') as f:
+                        f.write(brotli.compress(content, quality=11))
+
+                manifest[path] = target
+
+    with open(os.path.join(static_folder, DIST_FOLDER, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+# ==================== SERVOVANIE ====================
+class Assets:
+    """Odtlačky (fingerprint) statických súborov a ich servovanie s dlhodobou cache.
+
+    Ak existuje static/dist/manifest.json (`flask --app app build-assets`), url_for('static', ...)
+    vracia cestu k minifikovanej verzii s hashom v názve. Takéto súbory aj nahrané obrázky
+    pomenované podľa hashu obsahu sa posielajú s `Cache-Control: public, max-age=31536000, immutable`
+    a ak prehliadač podporuje brotli/gzip, servuje sa predkomprimovaný variant.
+
+    Konfigurácia:
+        ASSETS_FINGERPRINT  False = url_for ignoruje manifest (napr. pri vývoji CSS/JS)
+    """
+
+    def __init__(self, app=None):
+        self.manifest = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.static_folder = app.static_folder
+        self.load_manifest()
+        if app.config.setdefault('ASSETS_FINGERPRINT', True):
+            app.url_defaults(self._fingerprint_url)
+        app.view_functions['static'] = self.send_static_file
+        app.extensions['assets'] = self
+
+    def load_manifest(self):
+        path = os.path.join(self.static_folder, DIST_FOLDER, MANIFEST_NAME)
+        try:
+            with open(path, encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+
+    def _fingerprint_url(self, endpoint, values):
+        if endpoint == 'static' and values.get('filename') in self.manifest:
+            values['filename'] = self.manifest[values['filename']]
+
+    def send_static_file(self, filename):
+        """Náhrada za predvolený view 'static' (súbory bez odtlačku sa posielajú ako doteraz)"""
+        if filename.startswith(f'{DIST_FOLDER}/'):
+            response = self._send_precompressed(filename)
+            response.vary.add('Accept-Encoding')
+        elif CONTENT_ADDRESSED.match(filename):
+            response = send_from_directory(self.static_folder, filename, max_age=IMMUTABLE_MAX_AGE)
+        else:
+            return send_from_directory(self.static_folder, filename)
+
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    def _send_precompressed(self, filename):
+        for encoding, suffix in COMPRESSED_VARIANTS:
+            if encoding in request.accept_encodings \
+                    and os.path.isfile(os.path.join(self.static_folder, filename + suffix)):
+                response = send_from_directory(self.static_folder, filename + suffix, max_age=IMMUTABLE_MAX_AGE,
+                                               mimetype=mimetypes.guess_type(filename)[0])
+                response.headers['Content-Encoding'] = encoding
+                return response
+        return send_from_directory(self.static_folder, filename, max_age=IMMUTABLE_MAX_AGE)
+
+
+assets = Assets()
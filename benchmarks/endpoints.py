@@ -0,0 +1,217 @@
+"""
+Záťažový benchmark hlavných endpointov cez Flask test client nad syntetickými dátami.
+
+Pre každý endpoint vypíše latenciu (p50/p95/p99/max) a počet SQL dotazov na požiadavku.
+Predvolene vytvorí dočasnú SQLite databázu a naplní ju cez benchmarks/seed_data.py;
+s --database sa použije existujúca databáza (napr. na porovnanie pred a po zmene schémy).
+
+Spustenie (z koreňa projektu):
+    python benchmarks/endpoints.py --listings 20000 --messages 50000 --requests 100
+    python benchmarks/endpoints.py --no-cache --only listings
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event, func  # noqa: E402
+from sqlalchemy.engine import Engine  # noqa: E402
+from extensions import db  # noqa: E402
+from models import User, Category, Listing, Conversation  # noqa: E402
+from seed_data import SEED_PASSWORD, LOCATIONS, add_volume_arguments, volumes_from_args, seed_database  # noqa: E402
+
+PERCENTILES = (50, 95, 99)
+
+
+# ==================== SCENÁRE ====================
+def build_scenarios(data, rnd):
+    """Názov -> funkcia vracajúca URL ďalšej požiadavky (parametre sa pri každej požiadavke menia)"""
+    listing_ids = data['listing_ids']
+    category_ids = data['category_ids']
+    return {
+        'home': lambda: '/',
+        'listings': lambda: '/listings',
+        'listings?category': lambda: f'/listings?category={rnd.choice(category_ids)}',
+        'listings?price': lambda: f'/listings?min_price={rnd.randint(10, 100)}&max_price={rnd.randint(200, 2000)}',
+        'listings?location': lambda: f'/listings?location={rnd.choice(LOCATIONS).split()[0]}',
+        'listings?radius': lambda: f'/listings?location={rnd.choice(LOCATIONS)}&radius={rnd.choice([10, 25, 50])}',
+        'listings?sort=popular': lambda: '/listings?sort=popular',
+        'listings?q': lambda: f"/listings?q={rnd.choice(['bicykel', 'telefón', 'stôl', 'nový'])}",
+        'listing_detail': lambda: f'/listings/{rnd.choice(listing_ids)}',
+        'api_conversations': lambda: '/api/conversations',
+        'api_my_favorites': lambda: '/api/my-favorites',
+        'api_my_listings': lambda: '/api/my-listings',
+        'admin_panel': lambda: '/admin',
+        'admin_users': lambda: '/admin/users',
+        'admin_listings': lambda: '/admin/listings',
+        'admin_messages': lambda: '/admin/messages',
+        'admin_categories': lambda: '/admin/categories',
+    }
+
+
+def benchmark_user(admin_id=None):
+    """Admin s najväčším počtom konverzácií (aby API endpointy mali čo vracať)"""
+    conversations = db.select(func.count(Conversation.id)).where(
+        db.or_(Conversation.user_a_id == User.id, Conversation.user_b_id == User.id)).scalar_subquery()
+    query = db.select(User).where(User.role == 'admin')
+    if admin_id is not None:
+        query = query.where(User.id == admin_id)
+    return db.session.scalars(query.order_by(conversations.desc()).limit(1)).first()
+
+
+# ==================== MERANIE ====================
+class QueryCounter:
+    """Počíta SQL dotazy vykonané na všetkých engine-och (vrátane repliky)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(Engine, 'after_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Engine, 'after_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def percentile(sorted_values, p):
+    """Percentil metódou najbližšieho poradia (presná hodnota z nameraných, bez interpolácie)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-p * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def run(client, scenarios, requests, warmup):
+    results = []
+    with QueryCounter() as counter:
+        for name, next_url in scenarios.items():
+            for _ in range(warmup):
+                client.get(next_url())
+
+            durations, queries, statuses = [], [], set()
+            for _ in range(requests):
+                url = next_url()
+                counter.count = 0
+                start = time.perf_counter()
+                response = client.get(url)
+                response.get_data()
+                durations.append((time.perf_counter() - start) * 1000)
+                queries.append(counter.count)
+                statuses.add(response.status_code)
+
+            durations.sort()
+            result = {
+                'endpoint': name,
+                'requests': requests,
+                'status': ','.join(str(status) for status in sorted(statuses)),
+                'max_ms': durations[-1],
+                'avg_queries': sum(queries) / len(queries),
+                'max_queries': max(queries),
+            }
+            for p in PERCENTILES:
+                result[f'p{p}_ms'] = percentile(durations, p)
+            results.append(result)
+            print_row(result)
+    return results
+
+
+def print_header():
+    columns = ''.join(f'{f"p{p} ms":>9}' for p in PERCENTILES)
+    print(f"\n{'endpoint':<22}{'status':>8}{columns}{'max ms':>9}{'SQL/req':>9}{'max SQL':>9}")
+    print('-' * (22 + 8 + 9 * len(PERCENTILES) + 27))
+
+
+def print_row(result):
+    columns = ''.join(f"{result[f'p{p}_ms']:>9.2f}" for p in PERCENTILES)
+    print(f"{result['endpoint']:<22}{result['status']:>8}{columns}{result['max_ms']:>9.2f}"
+          f"{result['avg_queries']:>9.1f}{result['max_queries']:>9}")
+
+
+# ==================== SPUSTENIE ====================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_volume_arguments(parser)
+    parser.add_argument('--database', help='URL existujúcej databázy (bez generovania dát), napr. sqlite:////cesta/data.db')
+    parser.add_argument('--requests', type=int, default=50, help='meraných požiadaviek na endpoint')
+    parser.add_argument('--warmup', type=int, default=3, help='nemeraných požiadaviek na endpoint vopred')
+    parser.add_argument('--no-cache', action='store_true', help='vypne cache stránok (CACHE_BACKEND = null)')
+    parser.add_argument('--only', action='append', default=[], help='iba endpointy začínajúce týmto názvom')
+    parser.add_argument('--json', dest='json_path', help='výsledky uloží aj do JSON súboru')
+    args = parser.parse_args()
+
+    from app import create_app, init_db
+
+    workdir = None
+    if args.database:
+        uri = args.database
+    else:
+        workdir = tempfile.mkdtemp(prefix='trhovisko-bench-')
+        uri = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': uri,
+        'DB_REPLICA_URI': None,
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'IMAGE_WORKERS': 0,
+        'CACHE_BACKEND': 'null' if args.no_cache else 'memory',
+    })
+    init_db(app)
+
+    try:
+        with app.app_context():
+            admin_id = None
+            if workdir:
+                start = time.perf_counter()
+                counts = seed_database(**volumes_from_args(args))
+                admin_id = counts['admin_id']
+                print(f'Dáta vygenerované za {time.perf_counter() - start:.1f} s: '
+                      + ', '.join(f'{name} {value}' for name, value in counts.items() if name != 'admin_id'))
+
+            user = benchmark_user(admin_id)
+            if user is None:
+                parser.error('v databáze nie je žiadny admin (vytvorte ho alebo použite generované dáta)')
+            data = {
+                'listing_ids': db.session.scalars(
+                    db.select(Listing.id).where(Listing.status == 'active')).all() or [0],
+                'category_ids': db.session.scalars(db.select(Category.id)).all() or [0],
+            }
+            email = user.email
+
+        client = app.test_client()
+        response = client.post('/login', data={'email': email, 'password': SEED_PASSWORD})
+        if response.status_code != 302:
+            print(f'Upozornenie: prihlásenie ako {email} zlyhalo, API a admin endpointy vrátia presmerovanie.')
+
+        scenarios = build_scenarios(data, random.Random(args.seed))
+        if args.only:
+            scenarios = {name: url for name, url in scenarios.items()
+                         if any(name.startswith(prefix) for prefix in args.only)}
+
+        print(f'Používateľ: {email}, {args.requests} požiadaviek na endpoint, '
+              f"cache {'vypnutá' if args.no_cache else 'zapnutá'}")
+        print_header()
+        results = run(client, scenarios, args.requests, args.warmup)
+
+        if args.json_path:
+            with open(args.json_path, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2)
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
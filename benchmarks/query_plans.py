@@ -0,0 +1,120 @@
+"""
+Porovnanie plánov dotazov (EXPLAIN QUERY PLAN) a časov pre najčastejšie dotazy
+bez indexov a s indexmi z models.py.
+
+Spustenie (z koreňa projektu):
+    python benchmarks/query_plans.py --listings 50000 --messages 100000
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text, or_, and_, func  # noqa: E402
+from extensions import db  # noqa: E402
+from models import Listing, Message, Favorite, Image  # noqa: E402
+
+ME = 1
+OTHER = 2
+
+HOT_QUERIES = {
+    'home (najnovšie aktívne)':
+        db.select(Listing).where(Listing.status == 'active')
+        .order_by(Listing.created_at.desc()).limit(6),
+    'listings podľa kategórie':
+        db.select(Listing).where(Listing.status == 'active', Listing.category_id == 3)
+        .order_by(Listing.created_at.desc()).limit(12),
+    'moje inzeráty':
+        db.select(Listing).where(Listing.user_id == ME).order_by(Listing.created_at.desc()),
+    'obrázky inzerátu':
+        db.select(Image).where(Image.listing_id == 42),
+    'konverzácia':
+        db.select(Message).where(or_(
+            and_(Message.sender_id == ME, Message.receiver_id == OTHER),
+            and_(Message.sender_id == OTHER, Message.receiver_id == ME)
+        )).order_by(Message.created_at.asc()),
+    'neprečítané správy':
+        db.select(func.count()).select_from(Message)
+        .where(Message.receiver_id == ME, Message.is_read.is_(False)),
+    'je obľúbené':
+        db.select(Favorite).where(Favorite.user_id == ME, Favorite.listing_id == 42),
+}
+
+
+def seed(engine, listings, messages, users=500, categories=20):
+    rnd = random.Random(42)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO user (id, username, email, password_hash, role) VALUES (:id, :u, :e, 'x', 'user')"
+        ), [{'id': i, 'u': f'user{i}', 'e': f'user{i}@example.com'} for i in range(1, users + 1)])
+        conn.execute(text("INSERT INTO category (id, name) VALUES (:id, :n)"),
+                     [{'id': i, 'n': f'Kategória {i}'} for i in range(1, categories + 1)])
+        conn.execute(text(
+            "INSERT INTO listing (id, title, description, price, location, user_id, category_id, status, created_at) "
+            "VALUES (:id, :t, 'popis', :p, 'Bratislava', :u, :c, :s, :d)"
+        ), [{'id': i, 't': f'Inzerát {i}', 'p': rnd.uniform(1, 1000), 'u': rnd.randint(1, users),
+             'c': rnd.randint(1, categories), 's': rnd.choice(['active', 'active', 'active', 'sold']),
+             'd': now - timedelta(minutes=rnd.randint(0, 500000))} for i in range(1, listings + 1)])
+        conn.execute(text("INSERT INTO image (filename, listing_id, is_primary) VALUES (:f, :l, 0)"),
+                     [{'f': f'{i}.jpg', 'l': rnd.randint(1, listings)} for i in range(listings)])
+        conn.execute(text(
+            "INSERT INTO message (content, sender_id, receiver_id, listing_id, created_at, is_read) "
+            "VALUES ('ahoj', :s, :r, :l, :d, :read)"
+        ), [{'s': rnd.randint(1, users), 'r': rnd.randint(1, users), 'l': rnd.randint(1, listings),
+             'd': now - timedelta(minutes=rnd.randint(0, 500000)), 'read': rnd.random() < 0.8}
+            for _ in range(messages)])
+        conn.execute(text("INSERT INTO favorite (user_id, listing_id) VALUES (:u, :l)"),
+                     [{'u': rnd.randint(1, users), 'l': rnd.randint(1, listings)} for _ in range(listings // 2)])
+        conn.execute(text('ANALYZE'))
+
+
+def explain(engine, label):
+    print(f'\n===== {label} =====')
+    with engine.connect() as conn:
+        for name, statement in HOT_QUERIES.items():
+            sql = str(statement.compile(engine, compile_kwargs={'literal_binds': True}))
+            plan = [row[-1] for row in conn.execute(text('EXPLAIN QUERY PLAN ' + sql))]
+
+            start = time.perf_counter()
+            for _ in range(20):
+                conn.execute(text(sql)).fetchall()
+            elapsed = (time.perf_counter() - start) / 20 * 1000
+
+            print(f'{name:<28} {elapsed:8.2f} ms   ' + ' | '.join(plan))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--listings', type=int, default=20000)
+    parser.add_argument('--messages', type=int, default=50000)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine)
+
+    indexes = [index for table in db.metadata.sorted_tables for index in table.indexes]
+    for index in indexes:
+        index.drop(engine)
+
+    seed(engine, args.listings, args.messages)
+    explain(engine, 'BEZ INDEXOV')
+
+    for index in indexes:
+        index.create(engine)
+    with engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+    explain(engine, 'S INDEXMI')
+
+    engine.dispose()
+    os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,223 @@
+"""
+Generátor syntetických dát: naplní databázu aplikácie používateľmi, stromom kategórií,
+inzerátmi, obrázkami, správami a obľúbenými v zadanom množstve.
+
+Dáta sa pridávajú k existujúcim (ID pokračujú od najvyššieho), generátor je deterministický
+podľa --seed. Heslo všetkých vytvorených používateľov je SEED_PASSWORD, prvý z nich je admin.
+
+Spustenie (z koreňa projektu, databáza podľa DATABASE_URL alebo instance/data.db):
+    python benchmarks/seed_data.py --users 1000 --listings 20000 --messages 50000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func  # noqa: E402
+from werkzeug.security import generate_password_hash  # noqa: E402
+from extensions import db  # noqa: E402
+from models import User, Category, Listing, Image, Message, Favorite  # noqa: E402
+from messaging import rebuild_conversations  # noqa: E402
+from places import resolve_listing_places  # noqa: E402
+from popularity import recount_popularity  # noqa: E402
+
+# ==================== KONŠTANTY ====================
+SEED_PASSWORD = 'benchmark'
+BATCH_SIZE = 5000  # riadkov v jednom INSERT-e
+HISTORY_DAYS = 365  # rozpätie dátumov vytvorenia inzerátov a správ
+
+DEFAULT_VOLUMES = {
+    'users': 200,
+    'categories': 30,
+    'listings': 5000,
+    'images': 2,  # priemerný počet obrázkov na inzerát
+    'messages': 10000,
+    'favorites': 5000,
+}
+
+CATEGORY_NAMES = [
+    'Elektronika', 'Mobily', 'Počítače', 'Auto-moto', 'Bicykle', 'Šport', 'Nábytok', 'Záhrada',
+    'Oblečenie', 'Obuv', 'Knihy', 'Hudba', 'Hračky', 'Deti', 'Zvieratá', 'Stroje', 'Náradie',
+    'Reality', 'Služby', 'Starožitnosti', 'Foto', 'Hry', 'Kuchyňa', 'Kozmetika', 'Hobby',
+]
+LOCATIONS = [
+    'Bratislava', 'Bratislava - Ružinov', 'Bratislava - Petržalka', 'Košice', 'Košice - Sídlisko KVP',
+    'Prešov', 'Žilina', 'Banská Bystrica', 'Nitra', 'Trnava', 'Trenčín', 'Martin', 'Poprad',
+    'Piešťany', 'Zvolen', 'Michalovce', 'Levice', 'Komárno', 'Liptovský Mikuláš', 'Senec',
+]
+ADJECTIVES = ['zachovalý', 'nový', 'málo používaný', 'funkčný', 'originálny', 'lacný', 'kvalitný', 'starší']
+NOUNS = ['bicykel', 'telefón', 'notebook', 'stôl', 'kočík', 'monitor', 'gauč', 'bunda', 'fotoaparát',
+         'kosačka', 'gitara', 'skriňa', 'televízor', 'stolička', 'vŕtačka', 'lyže', 'konzola', 'hodinky']
+SENTENCES = [
+    'Predávam pre nepotrebnosť.', 'Stav ako na fotkách.', 'Osobný odber alebo poslanie kuriérom.',
+    'Cena dohodou.', 'Bez poškodení, plne funkčné.', 'Pri rýchlom jednaní zľava.',
+    'Doklad o kúpe k dispozícii.', 'Nefajčiarska domácnosť.', 'Možná výmena.',
+]
+MESSAGES = ['Dobrý deň, je to ešte aktuálne?', 'Aká je najnižšia cena?', 'Môžem si to prísť pozrieť?',
+            'Posielate aj poštou?', 'Ďakujem, beriem.', 'Ešte to máte?', 'Dohodnuté, zajtra o 17:00.']
+
+
+# ==================== GENEROVANIE ====================
+def _next_id(model):
+    return (db.session.scalar(db.select(func.max(model.id))) or 0) + 1
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        db.session.execute(db.insert(model), rows[start:start + BATCH_SIZE])
+
+
+def _random_date(rnd, now, after=None):
+    date = now - timedelta(seconds=rnd.randint(0, HISTORY_DAYS * 24 * 3600))
+    return max(date, after) if after else date
+
+
+def seed_database(users=DEFAULT_VOLUMES['users'], categories=DEFAULT_VOLUMES['categories'],
+                  listings=DEFAULT_VOLUMES['listings'], images=DEFAULT_VOLUMES['images'],
+                  messages=DEFAULT_VOLUMES['messages'], favorites=DEFAULT_VOLUMES['favorites'], seed=42):
+    """Vygeneruje dáta v aktuálnom app contexte; vráti slovník s počtami a ID prvého (admin) používateľa"""
+    rnd = random.Random(seed)
+    now = datetime.utcnow()
+    password_hash = generate_password_hash(SEED_PASSWORD)
+
+    # Používatelia
+    first_user = _next_id(User)
+    user_ids = list(range(first_user, first_user + users))
+    user_created = {user_id: _random_date(rnd, now) for user_id in user_ids}
+    _insert(User, [{
+        'id': user_id,
+        'username': f'user{user_id}',
+        'email': f'user{user_id}@example.com',
+        'password_hash': password_hash,
+        'role': 'admin' if user_id == first_user else 'user',
+        'created_at': user_created[user_id],
+    } for user_id in user_ids])
+
+    # Kategórie: asi tretina hlavných, ostatné ako podkategórie (do hĺbky 3)
+    first_category = _next_id(Category)
+    category_rows = []
+    for offset in range(categories):
+        category_id = first_category + offset
+        parent_id = None
+        if offset >= max(1, categories // 3):
+            parent = rnd.choice(category_rows)
+            parent_id = parent['id'] if parent['depth'] < 2 else parent['parent_id']
+        depth = 0 if parent_id is None else next(r['depth'] for r in category_rows if r['id'] == parent_id) + 1
+        name = CATEGORY_NAMES[offset % len(CATEGORY_NAMES)]
+        if offset >= len(CATEGORY_NAMES):
+            name = f'{name} {offset // len(CATEGORY_NAMES) + 1}'
+        category_rows.append({'id': category_id, 'name': name, 'description': f'Kategória {name}',
+                              'parent_id': parent_id, 'depth': depth})
+    _insert(Category, [{key: value for key, value in row.items() if key != 'depth'} for row in category_rows])
+    category_ids = [row['id'] for row in category_rows]
+
+    # Inzeráty (rozdelenie podľa autora aj kategórie je nerovnomerné ako v skutočnosti)
+    first_listing = _next_id(Listing)
+    listing_ids = list(range(first_listing, first_listing + listings))
+    listing_rows = []
+    for listing_id in listing_ids:
+        user_id = user_ids[min(int(rnd.paretovariate(1.2)) - 1, users - 1)] if rnd.random() < 0.3 \
+            else rnd.choice(user_ids)
+        noun = rnd.choice(NOUNS)
+        listing_rows.append({
+            'id': listing_id,
+            'title': f'{rnd.choice(ADJECTIVES).capitalize()} {noun}',
+            'description': ' '.join(rnd.sample(SENTENCES, 3)) + f' Ponúkam {noun}.',
+            'price': round(rnd.lognormvariate(4, 1.2), 2),
+            'location': rnd.choice(LOCATIONS),
+            'user_id': user_id,
+            'category_id': rnd.choice(category_ids),
+            'status': rnd.choices(['active', 'sold', 'inactive'], weights=[85, 10, 5])[0],
+            'created_at': _random_date(rnd, now, after=user_created[user_id]),
+        })
+    _insert(Listing, listing_rows)
+
+    # Obrázky (iba záznamy - súbory na disku nevznikajú, šablóny odkazujú na neexistujúce originály)
+    image_rows = []
+    for listing_id in listing_ids:
+        for position in range(rnd.randint(0, images * 2)):
+            image_rows.append({'filename': f'seed/{listing_id}_{position}.jpg', 'listing_id': listing_id,
+                               'is_primary': position == 0})
+    _insert(Image, image_rows)
+
+    # Správy: vlákna kupujúci - predávajúci k inzerátu, časť všeobecných
+    message_rows = []
+    while len(message_rows) < messages and listing_rows:
+        listing = rnd.choice(listing_rows)
+        buyer = rnd.choice(user_ids)
+        if buyer == listing['user_id']:
+            continue
+        listing_id = listing['id'] if rnd.random() < 0.9 else None
+        sent_at = _random_date(rnd, now, after=listing['created_at'])
+        for turn in range(min(rnd.randint(1, 6), messages - len(message_rows))):
+            sender, receiver = (buyer, listing['user_id']) if turn % 2 == 0 else (listing['user_id'], buyer)
+            sent_at += timedelta(minutes=rnd.randint(1, 600))
+            message_rows.append({'content': rnd.choice(MESSAGES), 'sender_id': sender, 'receiver_id': receiver,
+                                 'listing_id': listing_id, 'created_at': min(sent_at, now),
+                                 'is_read': rnd.random() < 0.8})
+    _insert(Message, message_rows)
+
+    # Obľúbené (každá dvojica používateľ - inzerát najviac raz)
+    pairs = set()
+    attempts = 0
+    while len(pairs) < favorites and attempts < favorites * 10 and listing_ids:
+        attempts += 1
+        pairs.add((rnd.choice(user_ids), rnd.choice(listing_ids)))
+    _insert(Favorite, [{'user_id': user_id, 'listing_id': listing_id, 'created_at': _random_date(rnd, now)}
+                       for user_id, listing_id in sorted(pairs)])
+
+    db.session.commit()
+
+    # Odvodené dáta (fulltextový index sa plní triggermi z search.py)
+    rebuild_conversations()
+    resolve_listing_places()
+    recount_popularity()
+    db.session.commit()
+
+    return {
+        'admin_id': first_user,
+        'users': len(user_ids),
+        'categories': len(category_rows),
+        'listings': len(listing_rows),
+        'images': len(image_rows),
+        'messages': len(message_rows),
+        'favorites': len(pairs),
+    }
+
+
+def add_volume_arguments(parser):
+    """Argumenty s množstvom dát (zdieľané s benchmarks/endpoints.py)"""
+    for name, default in DEFAULT_VOLUMES.items():
+        help_text = 'priemerný počet obrázkov na inzerát' if name == 'images' else f'počet ({name})'
+        parser.add_argument(f'--{name}', type=int, default=default, help=f'{help_text}, predvolene {default}')
+    parser.add_argument('--seed', type=int, default=42, help='semienko generátora náhodných čísel')
+
+
+def volumes_from_args(args):
+    return {name: getattr(args, name) for name in list(DEFAULT_VOLUMES) + ['seed']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    add_volume_arguments(parser)
+    args = parser.parse_args()
+
+    from app import create_app, init_db
+    app = create_app()
+    init_db(app)
+
+    with app.app_context():
+        start = time.perf_counter()
+        counts = seed_database(**volumes_from_args(args))
+        elapsed = time.perf_counter() - start
+
+    print(f"Vytvorené za {elapsed:.1f} s: " + ', '.join(f'{name} {counts[name]}' for name in DEFAULT_VOLUMES))
+    print(f"Admin: user{counts['admin_id']}@example.com / {SEED_PASSWORD}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, session, make_response
+from flask_login import current_user
+
+# ==================== KONŠTANTY ====================
+DEFAULT_TTL = 300  # sekúnd
+DEFAULT_MAX_ENTRIES = 1000
+PAGE_CACHE = 'pages'  # menný priestor cache pre verejné stránky s inzerátmi a kategóriami
+
+
+# ==================== BACKENDY ====================
+class MemoryBackend:
+    """LRU cache v pamäti procesu s expiráciou položiek (predvolený backend)"""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._counters = {}  # generácie sa nesmú vytlačiť cez LRU
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def counter(self, key):
+        return self._counters.get(key, 0)
+
+    def incr(self, key):
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """LRU cache v lokálnom SQLite súbore, zdieľaná medzi viacerými workermi"""
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connection() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS cache_entry ('
+                'key TEXT PRIMARY KEY, value BLOB, expires_at REAL, accessed_at REAL)'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS ix_cache_entry_accessed_at ON cache_entry (accessed_at)')
+            connection.execute('CREATE TABLE IF NOT EXISTS cache_counter (key TEXT PRIMARY KEY, value INTEGER)')
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def get(self, key):
+        connection = self._connection()
+        now = time.time()
+        row = connection.execute('SELECT value, expires_at FROM cache_entry WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] < now:
+            connection.execute('DELETE FROM cache_entry WHERE key = ?', (key,))
+            return None
+        connection.execute('UPDATE cache_entry SET accessed_at = ? WHERE key = ?', (now, key))
+        return pickle.loads(row[0])
+
+    def set(self, key, value, ttl):
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            'INSERT OR REPLACE INTO cache_entry (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)',
+            (key, pickle.dumps(value), now + ttl, now)
+        )
+        connection.execute(
+            'DELETE FROM cache_entry WHERE key IN ('
+            'SELECT key FROM cache_entry ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_entries,)
+        )
+
+    def counter(self, key):
+        row = self._connection().execute('SELECT value FROM cache_counter WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key):
+        connection = self._connection()
+        connection.execute(
+            'INSERT INTO cache_counter (key, value) VALUES (?, 1) '
+            'ON CONFLICT(key) DO UPDATE SET value = value + 1',
+            (key,)
+        )
+        return self.counter(key)
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache_entry')
+
+
+# ==================== CACHE ====================
+class Cache:
+    """Cache odpovedí a fragmentov s invalidáciou cez menné priestory.
+
+    Každý menný priestor (napr. 'listings') má číslo generácie, ktoré je súčasťou kľúča.
+    invalidate() zvýši generáciu, takže staré položky sa už nenájdu a postupne vypadnú cez LRU/TTL.
+
+    Konfigurácia:
+        CACHE_BACKEND      'memory' (predvolené), 'sqlite' alebo 'null' (vypnutá cache)
+        CACHE_SQLITE_PATH  cesta k súboru pre backend 'sqlite'
+        CACHE_DEFAULT_TTL  životnosť položky v sekundách
+        CACHE_MAX_ENTRIES  maximálny počet položiek (LRU)
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.default_ttl = DEFAULT_TTL
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.setdefault('CACHE_BACKEND', 'memory')
+        max_entries = app.config.setdefault('CACHE_MAX_ENTRIES', DEFAULT_MAX_ENTRIES)
+        self.default_ttl = app.config.setdefault('CACHE_DEFAULT_TTL', DEFAULT_TTL)
+
+        if backend == 'sqlite':
+            path = app.config.setdefault('CACHE_SQLITE_PATH', os.path.join(app.instance_path, 'cache.db'))
+            self.backend = SQLiteBackend(path, max_entries)
+        elif backend == 'memory':
+            self.backend = MemoryBackend(max_entries)
+        else:
+            self.backend = None
+
+        app.extensions['cache'] = self
+
+    def generation(self, namespace):
+        """Aktuálna generácia menného priestoru (mení sa pri každom invalidate)"""
+        if self.backend is None:
+            return 0
+        return self.backend.counter(f'generation:{namespace}')
+
+    def get(self, namespace, key):
+        if self.backend is None:
+            return None
+        return self.backend.get(f'{namespace}:{self.generation(namespace)}:{key}')
+
+    def set(self, namespace, key, value, ttl=None):
+        if self.backend is None:
+            return
+        self.backend.set(f'{namespace}:{self.generation(namespace)}:{key}', value, ttl or self.default_ttl)
+
+    def invalidate(self, *namespaces):
+        """Zneplatní všetky položky v daných menných priestoroch"""
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            self.backend.incr(f'generation:{namespace}')
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def cached_page(self, namespace, ttl=None):
+        """Dekorátor pre GET view: odpoveď pre anonymného používateľa sa uloží do cache.
+
+        Prihlásení používatelia a stránky s čakajúcimi flash správami sa necachujú,
+        pretože ich HTML závisí od session.
+        """
+        def decorator(f):
+            @wraps(f)
+            def decorated_function(*args, **kwargs):
+                if self.backend is None or request.method != 'GET' \
+                        or current_user.is_authenticated or session.get('_flashes'):
+                    return f(*args, **kwargs)
+
+                key = f'page:{request.full_path}'
+                cached = self.get(namespace, key)
+                if cached is not None:
+                    body, status, mimetype = cached
+                    response = make_response(body, status)
+                    response.mimetype = mimetype
+                    response.headers['X-Cache'] = 'HIT'
+                    return response
+
+                response = make_response(f(*args, **kwargs))
+                if response.status_code == 200 and not response.direct_passthrough:
+                    self.set(namespace, key, (response.get_data(), response.status_code, response.mimetype), ttl)
+                response.headers['X-Cache'] = 'MISS'
+                return response
+
+            return decorated_function
+
+        return decorator
@@ -0,0 +1,148 @@
+import threading
+import time
+from sqlalchemy import func, case
+from extensions import db, cache
+from models import Category, Listing
+
+# ==================== KONŠTANTY ====================
+CATEGORY_CACHE = 'categories'  # menný priestor cache, ktorého generácia určuje platnosť stromu
+COUNTS_TTL = 60  # sekúnd, po ktorých sa prepočítajú počty inzerátov
+
+
+class CategoryNode:
+    """Kategória v predpočítanom strome (šablóny ju používajú rovnako ako model Category)"""
+
+    def __init__(self, category):
+        self.id = category.id
+        self.name = category.name
+        self.description = category.description
+        self.parent_id = category.parent_id
+        self.children = []
+        self.depth = 0
+        self.ancestor_ids = []  # od koreňa po priameho rodiča
+        self.descendant_ids = {category.id}  # vrátane seba
+        self.listing_count = 0  # všetky inzeráty priamo v kategórii
+        self.active_listing_count = 0  # aktívne inzeráty priamo v kategórii
+        self.total_active_listing_count = 0  # aktívne inzeráty vrátane podkategórií
+
+    @property
+    def display_name(self):
+        return '— ' * self.depth + self.name
+
+
+class _Snapshot:
+    def __init__(self, nodes, ordered, subtrees, generation):
+        self.nodes = nodes
+        self.ordered = ordered
+        self.subtrees = subtrees  # ID koreňa -> koreň a jeho podstrom v poradí stromu
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+
+
+class CategoryRegistry:
+    """Celý strom kategórií načítaný naraz (2 dotazy) a držaný v pamäti procesu.
+
+    Zneplatní sa cez invalidate() (pridanie/zmazanie kategórie) - aj v ostatných workeroch,
+    ak je nastavená zdieľaná cache; počty inzerátov sa obnovujú každých COUNTS_TTL sekúnd.
+    """
+
+    def __init__(self, counts_ttl=COUNTS_TTL):
+        self.counts_ttl = counts_ttl
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _load(self, generation):
+        categories = Category.query.order_by(Category.id).all()
+        counts = db.session.execute(
+            db.select(Listing.category_id,
+                      func.count(Listing.id),
+                      func.sum(case((Listing.status == 'active', 1), else_=0)))
+            .group_by(Listing.category_id)
+        ).all()
+
+        nodes = {category.id: CategoryNode(category) for category in categories}
+        for category_id, listing_count, active_count in counts:
+            if category_id in nodes:
+                nodes[category_id].listing_count = listing_count
+                nodes[category_id].active_listing_count = active_count or 0
+
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node.parent_id)
+            if parent is not None and parent is not node:
+                parent.children.append(node)
+            else:
+                roots.append(node)
+
+        # Prechod do hĺbky: hĺbka, predkovia, potomkovia a súčty počtov
+        ordered = []
+        visited = set()
+
+        def walk(node, ancestor_ids):
+            visited.add(node.id)
+            node.depth = len(ancestor_ids)
+            node.ancestor_ids = list(ancestor_ids)
+            node.total_active_listing_count = node.active_listing_count
+            ordered.append(node)
+            for child in node.children:
+                if child.id in visited:
+                    continue
+                walk(child, ancestor_ids + [node.id])
+                node.descendant_ids |= child.descendant_ids
+                node.total_active_listing_count += child.total_active_listing_count
+
+        subtrees = {}
+        for root in roots:
+            start = len(ordered)
+            walk(root, [])
+            subtrees[root.id] = ordered[start:]
+
+        return _Snapshot(nodes, ordered, subtrees, generation)
+
+    def _current(self):
+        generation = cache.generation(CATEGORY_CACHE)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.generation == generation \
+                and time.monotonic() - snapshot.loaded_at < self.counts_ttl:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._load(generation)
+            self._snapshot = snapshot
+        return snapshot
+
+    def all(self):
+        """Všetky kategórie v poradí stromu (rodič pred svojimi podkategóriami)"""
+        return self._current().ordered
+
+    def roots(self):
+        """Kategórie najvyššej úrovne v poradí stromu"""
+        return [subtree[0] for subtree in self._current().subtrees.values()]
+
+    def subtree(self, root_id):
+        """Koreňová kategória a celý jej podstrom v poradí stromu"""
+        return self._current().subtrees.get(root_id, [])
+
+    def get(self, category_id):
+        return self._current().nodes.get(category_id)
+
+    def descendant_ids(self, category_id):
+        """ID kategórie a všetkých jej podkategórií (pre filter /listings?category=)"""
+        node = self.get(category_id)
+        return node.descendant_ids if node is not None else {category_id}
+
+    def ancestors(self, category_id):
+        snapshot = self._current()
+        node = snapshot.nodes.get(category_id)
+        return [snapshot.nodes[ancestor_id] for ancestor_id in node.ancestor_ids] if node is not None else []
+
+    def choices(self):
+        """Možnosti pre SelectField (podkategórie sú odsadené)"""
+        return [(node.id, node.display_name) for node in self.all()]
+
+    def invalidate(self):
+        self._snapshot = None
+        cache.invalidate(CATEGORY_CACHE)
+
+
+category_registry = CategoryRegistry()
@@ -0,0 +1,90 @@
+import sqlite3
+import time
+import click
+from extensions import db
+from database import REPLICA_BIND
+from search import create_search_index, rebuild_search_index
+from migrations import run_migrations
+from messaging import rebuild_conversations
+from images import image_pipeline
+from recommendations import rebuild_recommendations, TOP_N
+from popularity import recount_popularity
+from places import GAZETTEER_PATH, load_gazetteer, resolve_listing_places
+from assets import assets, build_assets
+
+
+# ==================== CLI PRÍKAZY ====================
+def register_commands(app):
+    """Príkazy pre `flask --app app <príkaz>`"""
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Prebuduje fulltextový index inzerátov z existujúcich dát."""
+        create_search_index()
+        rebuild_search_index()
+        click.echo('Fulltextový index inzerátov bol prebudovaný.')
+
+    @app.cli.command('migrate')
+    def migrate_command():
+        """Aplikuje čakajúce migrácie schémy na existujúcu databázu."""
+        for version, name in run_migrations():
+            click.echo(f'Migrácia {version} ({name}) bola aplikovaná.')
+        click.echo('Databáza je aktuálna.')
+
+    @app.cli.command('rebuild-conversations')
+    def rebuild_conversations_command():
+        """Prepočíta vlákna správ a počty neprečítaných z tabuľky message."""
+        rebuild_conversations()
+        click.echo('Vlákna správ boli prepočítané.')
+
+    @app.cli.command('load-gazetteer')
+    @click.option('--path', default=GAZETTEER_PATH, show_default=True, help='CSV súbor s obcami a súradnicami.')
+    def load_gazetteer_command(path):
+        """Načíta obce zo súboru gazetteera a znovu priradí obce všetkým inzerátom."""
+        places = load_gazetteer(path)
+        resolved, total = resolve_listing_places()
+        click.echo(f'Načítaných obcí: {places}. Inzeráty s rozpoznanou obcou: {resolved} z {total}.')
+
+    @app.cli.command('rebuild-recommendations')
+    @click.option('--workers', type=int, default=None, help='Počet procesov (predvolene počet jadier CPU, 1 = bez paralelizmu).')
+    @click.option('--top', 'top_n', type=int, default=TOP_N, show_default=True, help='Podobných inzerátov na inzerát.')
+    def rebuild_recommendations_command(workers, top_n):
+        """Prepočíta podobné inzeráty (TF-IDF nad názvom a popisom, kategória a cena) pre všetky aktívne inzeráty."""
+        start = time.perf_counter()
+        count = rebuild_recommendations(workers, top_n)
+        click.echo(f'Podobné inzeráty prepočítané pre {count} inzerátov za {time.perf_counter() - start:.1f} s.')
+
+    @app.cli.command('recount-popularity')
+    def recount_popularity_command():
+        """Prepočíta počty obľúbení a správ inzerátov z tabuliek favorite a message (zobrazenia ostanú)."""
+        recount_popularity()
+        db.session.commit()
+        click.echo('Počítadlá popularity inzerátov boli prepočítané.')
+
+    @app.cli.command('process-images')
+    @click.option('--all', 'reprocess', is_flag=True, help='Znovu vytvorí verzie aj pre už spracované obrázky.')
+    def process_images_command(reprocess):
+        """Vytvorí zmenšené verzie (WebP/JPEG) nahraných obrázkov."""
+        if not image_pipeline.enabled:
+            click.echo('Spracovanie obrázkov vyžaduje balík Pillow.')
+            return
+        processed = image_pipeline.process_pending(reprocess)
+        click.echo(f'Spracovaných obrázkov: {processed}.')
+
+    @app.cli.command('build-assets')
+    def build_assets_command():
+        """Minifikuje CSS/JS do static/dist s hashom obsahu v názve a zapíše manifest."""
+        manifest = build_assets(app.static_folder)
+        assets.load_manifest()
+        click.echo(f'Spracovaných súborov: {len(manifest)}.')
+
+    @app.cli.command('sync-replica')
+    def sync_replica_command():
+        """Skopíruje SQLite databázu do súboru repliky (DB_REPLICA_URI) - na testovanie smerovania čítaní."""
+        replica = db.engines.get(REPLICA_BIND)
+        if replica is None or db.engine.dialect.name != 'sqlite' or replica.dialect.name != 'sqlite':
+            click.echo('Kopírovanie je podporované len pre SQLite primárnu databázu aj repliku.')
+            return
+        with sqlite3.connect(db.engine.url.database) as source, sqlite3.connect(replica.url.database) as target:
+            source.backup(target)
+        click.echo(f'Replika {replica.url.database} bola aktualizovaná.')
@@ -0,0 +1,109 @@
+import os
+import sqlite3
+from functools import wraps
+from flask import g, has_request_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# ==================== KONŠTANTY ====================
+BUSY_TIMEOUT = 30  # sekúnd, koľko čaká zápis na uvoľnenie zámku databázy namiesto "database is locked"
+DEFAULT_POOL_SIZE = 10  # spojenia na proces - aspoň toľko, koľko vlákien obsluhuje požiadavky
+DEFAULT_MAX_OVERFLOW = 10  # dočasné spojenia navyše pri špičke (napr. dlhé SSE spojenia)
+DEFAULT_POOL_TIMEOUT = 30  # sekúnd čakania na voľné spojenie z poolu
+SERVER_POOL_RECYCLE = 1800  # sekúnd, po ktorých sa spojenie na databázový server otvorí znova
+REPLICA_BIND = 'replica'  # kľúč v SQLALCHEMY_BINDS pre repliku na čítanie
+DEFAULT_DATABASE_URI = 'sqlite:///data.db'  # relatívne k priečinku instance/
+
+
+# ==================== KONFIGURÁCIA ====================
+def database_uri_from_env(name, default=None):
+    """URL databázy z premennej prostredia (postgres:// -> postgresql://, ako ho očakáva SQLAlchemy)"""
+    uri = os.environ.get(name, default)
+    if uri and uri.startswith('postgres://'):
+        uri = 'postgresql://' + uri[len('postgres://'):]
+    return uri
+
+
+def _is_memory_database(uri):
+    return uri in ('sqlite://', 'sqlite:///:memory:') or 'mode=memory' in uri
+
+
+def configure_database(app):
+    """Doplní SQLALCHEMY_ENGINE_OPTIONS (a bind repliky) podľa konfigurácie; volá sa pred db.init_app(app).
+
+    Konfigurácia (hodnoty nastavené v app.config majú prednosť):
+        DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT  veľkosť a správanie poolu spojení
+        DB_POOL_PRE_PING                                overenie spojenia pred použitím (server: zapnuté)
+        DB_POOL_RECYCLE                                 max. vek spojenia v sekundách (server: 1800, SQLite: -1)
+        DB_BUSY_TIMEOUT                                 čakanie SQLite na zámok (sekundy)
+        DB_REPLICA_URI                                  replika na čítanie pre views s @read_replica
+    """
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    options = app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {})
+    server = not uri.startswith('sqlite')
+
+    replica_uri = app.config.setdefault('DB_REPLICA_URI', None)
+    if replica_uri:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})[REPLICA_BIND] = replica_uri
+
+    if not server:
+        connect_args = options.setdefault('connect_args', {})
+        connect_args.setdefault('timeout', app.config.setdefault('DB_BUSY_TIMEOUT', BUSY_TIMEOUT))
+        # Spojenie z poolu môže použiť ktorékoľvek vlákno (nikdy nie dve naraz)
+        connect_args.setdefault('check_same_thread', False)
+        if _is_memory_database(uri):
+            return
+
+    options.setdefault('pool_size', app.config.setdefault('DB_POOL_SIZE', DEFAULT_POOL_SIZE))
+    options.setdefault('max_overflow', app.config.setdefault('DB_MAX_OVERFLOW', DEFAULT_MAX_OVERFLOW))
+    options.setdefault('pool_timeout', app.config.setdefault('DB_POOL_TIMEOUT', DEFAULT_POOL_TIMEOUT))
+    options.setdefault('pool_pre_ping', app.config.setdefault('DB_POOL_PRE_PING', server))
+    options.setdefault('pool_recycle', app.config.setdefault('DB_POOL_RECYCLE', SERVER_POOL_RECYCLE if server else -1))
+
+
+@event.listens_for(Engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Každé nové SQLite spojenie: WAL (čitatelia neblokujú zapisovateľa) a synchronous=NORMAL.
+
+    busy_timeout nastavuje už sqlite3 z connect_args['timeout'] (DB_BUSY_TIMEOUT).
+    """
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+
+# ==================== REPLIKA NA ČÍTANIE ====================
+def _replica_requested():
+    return has_request_context() and g.get('_read_replica', False)
+
+
+class RoutingSession(Session):
+    """Session, ktorá počas views označených @read_replica posiela SELECT-y na repliku.
+
+    Zápisy (INSERT/UPDATE/DELETE, flush) idú vždy na primárnu databázu; bez nakonfigurovanej
+    repliky (DB_REPLICA_URI) sa správa ako bežná Flask-SQLAlchemy session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and getattr(clause, 'is_select', False) and _replica_requested():
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper, clause=clause, bind=bind, **kwargs)
+
+
+def read_replica(f):
+    """Dekorátor pre view, ktoré iba číta: dotazy v ňom smerujú na repliku (ak je nastavená)"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        g._read_replica = True
+        try:
+            return f(*args, **kwargs)
+        finally:
+            g._read_replica = False
+
+    return decorated_function
@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+from collections import deque
+
+# ==================== KONŠTANTY ====================
+EVENT_BUFFER_SIZE = 50  # posledné udalosti na používateľa (pre opätovné pripojenie / long-poll)
+CHANNEL_IDLE_TIMEOUT = 120  # sekúnd bez odberateľa, po ktorých sa kanál zahodí
+HEARTBEAT_INTERVAL = 15  # sekúnd medzi keepalive komentármi v SSE streame
+LONG_POLL_TIMEOUT = 25  # sekúnd, maximálne čakanie long-poll požiadavky
+DEFAULT_MAX_STREAMS = 4  # súčasných SSE/long-poll spojení na proces (gunicorn.conf.py nastavuje podľa vlákien)
+STREAM_RETRY_AFTER = 30  # sekúnd, Retry-After pri odmietnutom spojení
+
+
+class _Channel:
+    def __init__(self, lock):
+        self.events = deque(maxlen=EVENT_BUFFER_SIZE)
+        self.last_id = 0
+        self.subscribers = 0
+        self.last_seen = time.monotonic()
+        self.condition = threading.Condition(lock)
+
+
+class EventBroker:
+    """Jednoduchý pub/sub v pamäti procesu: udalosti sa doručujú prihláseným používateľom.
+
+    Každý používateľ má kanál s poradovými číslami udalostí; SSE stream aj long-poll čakajú
+    na udalosti s ID väčším ako posledné prijaté. Kanál existuje len kým je používateľ pripojený
+    (plus CHANNEL_IDLE_TIMEOUT) - udalosti pre odpojených používateľov sa zahodia, po načítaní
+    stránky si aktuálny stav aj tak stiahnu cez API.
+
+    SSE stream aj long-poll drží vlákno servera po celý čas spojenia, preto ich je na proces
+    najviac EVENTS_MAX_STREAMS (acquire_stream / release_stream); ostatné vlákna ostanú
+    pre bežné požiadavky a odmietnutí klienti sa obnovujú intervalom.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._channels = {}
+        self.max_streams = DEFAULT_MAX_STREAMS
+        self._streams = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.max_streams = app.config.setdefault('EVENTS_MAX_STREAMS', DEFAULT_MAX_STREAMS)
+        app.extensions['event_broker'] = self
+
+    def acquire_stream(self):
+        """Zaberie miesto pre dlhé spojenie; False, ak je limit procesu vyčerpaný"""
+        with self._lock:
+            if self._streams >= self.max_streams:
+                return False
+            self._streams += 1
+            return True
+
+    def release_stream(self):
+        with self._lock:
+            self._streams -= 1
+
+    def _channel(self, user_id):
+        channel = self._channels.get(user_id)
+        if channel is None:
+            channel = self._channels[user_id] = _Channel(self._lock)
+        return channel
+
+    def _collect(self):
+        now = time.monotonic()
+        idle = [user_id for user_id, channel in self._channels.items()
+                if channel.subscribers == 0 and now - channel.last_seen > CHANNEL_IDLE_TIMEOUT]
+        for user_id in idle:
+            del self._channels[user_id]
+
+    def publish(self, user_id, event_type, data):
+        """Pošle udalosť všetkým pripojeným klientom (kartám) daného používateľa"""
+        with self._lock:
+            channel = self._channels.get(user_id)
+            if channel is None:
+                return
+            channel.last_id += 1
+            channel.events.append((channel.last_id, event_type, data))
+            channel.condition.notify_all()
+
+    def last_event_id(self, user_id):
+        with self._lock:
+            channel = self._channel(user_id)
+            channel.last_seen = time.monotonic()
+            return channel.last_id
+
+    def wait(self, user_id, since, timeout):
+        """Vráti udalosti s ID > since; ak žiadne nie sú, čaká najviac `timeout` sekúnd"""
+        with self._lock:
+            channel = self._channel(user_id)
+            channel.subscribers += 1
+            # Po reštarte servera môže mať klient vyššie ID, než aké server pozná
+            since = min(since, channel.last_id)
+            deadline = time.monotonic() + timeout
+            try:
+                while True:
+                    events = [event for event in channel.events if event[0] > since]
+                    remaining = deadline - time.monotonic()
+                    if events or remaining <= 0:
+                        return events
+                    channel.condition.wait(remaining)
+            finally:
+                channel.subscribers -= 1
+                channel.last_seen = time.monotonic()
+                self._collect()
+
+
+def format_sse(event_id, event_type, data):
+    return f'id: {event_id}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n'
+
+
+def sse_stream(user_id, since):
+    """Generátor pre text/event-stream; medzi udalosťami posiela keepalive komentáre"""
+    yield 'retry: 5000\n\n'
+    last_id = since
+    while True:
+        events = event_broker.wait(user_id, last_id, HEARTBEAT_INTERVAL)
+        if not events:
+            yield ': keepalive\n\n'
+            continue
+        for event_id, event_type, data in events:
+            last_id = event_id
+            yield format_sse(event_id, event_type, data)
+
+
+event_broker = EventBroker()
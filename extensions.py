@@ -1,5 +1,8 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
+from cache import Cache
+from database import RoutingSession
 
-db = SQLAlchemy()
-login_manager = LoginManager()
\ No newline at end of file
+db = SQLAlchemy(session_options={'class_': RoutingSession})
+login_manager = LoginManager()
+cache = Cache()
@@ -0,0 +1,137 @@
+from urllib.parse import urlencode
+from sqlalchemy import func, case
+from extensions import cache
+from models import Listing, Place
+from categories import category_registry
+from search import apply_search, search_condition
+from places import location_condition, MAX_RADIUS_KM
+
+# ==================== KONŠTANTY ====================
+FACET_CACHE = 'facets'  # menný priestor cache pre počty fasiet podľa kombinácie filtrov
+FACETS_TTL = 60  # sekúnd - počty môžu byť takto staré (rovnako ako cached_count a počty v strome kategórií)
+TOP_LOCATIONS = 10
+# Cenové pásma (od, do); posledné je otvorené zhora
+PRICE_BUCKETS = ((0, 20), (20, 50), (50, 100), (100, 250), (250, 500), (500, 1000), (1000, None))
+
+
+# ==================== FILTRE ====================
+def listing_filters(args):
+    """Normalizované filtre /listings z query stringu (prázdne a neplatné hodnoty vynechá).
+
+    Okruh ?radius= (km) platí len spolu s lokalitou.
+
+    Rovnaké filtre zapísané inak (?min_price=20 a ?min_price=20.0, medzery v hľadaní)
+    dajú rovnaký slovník, a teda aj rovnaký kľúč cache.
+    """
+    filters = {}
+    search_query = ' '.join(args.get('q', '').split())
+    if search_query:
+        filters['q'] = search_query
+    category_id = args.get('category', type=int)
+    if category_id:
+        filters['category'] = category_id
+    for name in ('min_price', 'max_price'):
+        value = args.get(name, type=float)
+        if value is not None:
+            filters[name] = value
+    location = args.get('location', '').strip()
+    if location:
+        filters['location'] = location
+        radius = args.get('radius', type=int)
+        if radius and 0 < radius <= MAX_RADIUS_KM:
+            filters['radius'] = radius
+    return filters
+
+
+def apply_listing_filters(query, filters, exclude=(), ranked=True):
+    """Obmedzí query inzerátov filtrami z listing_filters(); filtre v `exclude` preskočí.
+
+    ranked=False: hľadanie len obmedzí množinu (bez JOIN a zoradenia podľa relevancie) - pre počty.
+    """
+    if 'q' in filters and 'q' not in exclude:
+        if ranked:
+            query = apply_search(query, filters['q'])
+        else:
+            condition = search_condition(filters['q'])
+            if condition is not None:
+                query = query.filter(condition)
+    if 'category' in filters and 'category' not in exclude:
+        query = query.filter(Listing.category_id.in_(category_registry.descendant_ids(filters['category'])))
+    if 'min_price' in filters and 'price' not in exclude:
+        query = query.filter(Listing.price >= filters['min_price'])
+    if 'max_price' in filters and 'price' not in exclude:
+        query = query.filter(Listing.price <= filters['max_price'])
+    if 'location' in filters and 'location' not in exclude:
+        query = query.filter(location_condition(filters['location'], filters.get('radius')))
+    return query
+
+
+def count_query(filters, exclude=()):
+    """Aktívne inzeráty vyhovujúce filtrom bez načítania vzťahov a zoradenia (pre COUNT a GROUP BY)"""
+    return apply_listing_filters(Listing.query.filter_by(status='active'), filters, exclude, ranked=False)
+
+
+# ==================== FASETY ====================
+# Každá faseta sa počíta jedným GROUP BY nad aktívnymi inzerátmi so všetkými filtrami okrem
+# vlastného - napr. počty kategórií ukazujú, koľko výsledkov by bolo po prepnutí kategórie.
+
+
+def _category_counts(filters):
+    """Počty aktívnych inzerátov podľa kategórie vrátane podkategórií (ID kategórie -> počet)"""
+    nodes = category_registry.all()
+    if not filters.keys() - {'category'}:
+        # Bez ďalších filtrov stačia počty, ktoré strom kategórií už má
+        return {node.id: node.total_active_listing_count for node in nodes}
+
+    direct = dict(count_query(filters, ('category',))
+                  .with_entities(Listing.category_id, func.count(Listing.id))
+                  .group_by(Listing.category_id).all())
+    counts = {}
+    for node in nodes:
+        count = sum(direct.get(category_id, 0) for category_id in node.descendant_ids)
+        if count:
+            counts[node.id] = count
+    return counts
+
+
+def _price_bucket():
+    """Index cenového pásma z PRICE_BUCKETS ako SQL výraz"""
+    return case(*[(Listing.price < high, index) for index, (low, high) in enumerate(PRICE_BUCKETS)
+                  if high is not None], else_=len(PRICE_BUCKETS) - 1)
+
+
+def _price_counts(filters):
+    bucket = _price_bucket().label('bucket')
+    counts = dict(count_query(filters, ('price',))
+                  .with_entities(bucket, func.count(Listing.id))
+                  .group_by(bucket).all())
+    return [{'min': low, 'max': high, 'count': counts.get(index, 0)}
+            for index, (low, high) in enumerate(PRICE_BUCKETS)]
+
+
+def _location_counts(filters):
+    """Najčastejšie obce (podľa gazetteera, takže 'Bratislava' a 'bratislava' sa spočítajú spolu)"""
+    count = func.count(Listing.id)
+    rows = count_query(filters, ('location',)) \
+        .join(Place, Listing.place_id == Place.id) \
+        .with_entities(Place.name, count) \
+        .group_by(Place.id, Place.name).order_by(count.desc(), Place.name).limit(TOP_LOCATIONS).all()
+    return [{'location': name, 'count': location_count} for name, location_count in rows]
+
+
+def listing_facets(filters):
+    """Počty pre bočný panel /listings: kategórie, cenové pásma a najčastejšie lokality.
+
+    Výsledok sa drží v cache FACETS_TTL sekúnd pod kľúčom z normalizovaných filtrov,
+    takže časté kombinácie (bez filtra, jedna kategória) stoja jeden prístup do cache.
+    """
+    key = urlencode(sorted(filters.items()))
+    facets = cache.get(FACET_CACHE, key)
+    if facets is None:
+        facets = {
+            'categories': _category_counts(filters),
+            'prices': _price_counts(filters),
+            'locations': _location_counts(filters),
+        }
+        cache.set(FACET_CACHE, key, facets, ttl=FACETS_TTL)
+    return facets
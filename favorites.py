@@ -0,0 +1,73 @@
+from datetime import datetime
+from flask import g
+from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
+from extensions import db, cache
+from models import Listing, Favorite
+from popularity import increment
+from versions import bump, FAVORITES
+
+# ==================== KONŠTANTY ====================
+FAVORITE_CACHE = 'favorites'  # menný priestor cache pre množiny ID obľúbených inzerátov používateľov
+MAX_STATUS_IDS = 100  # najviac ID inzerátov v jednej požiadavke /api/favorites/status
+
+
+# ==================== ČÍTANIE ====================
+def favorite_ids():
+    """ID obľúbených inzerátov prihláseného používateľa ako frozenset (anonymný má prázdnu množinu).
+
+    Číta sa len stĺpec listing_id cez index (user_id, listing_id), bez objektov Favorite.
+    Množina sa drží počas požiadavky v g a medzi požiadavkami v cache pod kľúčom
+    s favorites_version - každá zmena obľúbených verziu zvýši, takže sa nikdy nečíta stará množina.
+    """
+    if not current_user.is_authenticated:
+        return frozenset()
+
+    if 'favorite_ids' not in g:
+        key = f'{current_user.id}:{current_user.favorites_version}'
+        ids = cache.get(FAVORITE_CACHE, key)
+        if ids is None:
+            ids = frozenset(db.session.scalars(
+                db.select(Favorite.listing_id).where(Favorite.user_id == current_user.id)))
+            cache.set(FAVORITE_CACHE, key, ids)
+        g.favorite_ids = ids
+    return g.favorite_ids
+
+
+def favorite_statuses(user_id, listing_ids):
+    """{ID inzerátu: je obľúbený} pre zoznam ID jedným dotazom cez index (user_id, listing_id)"""
+    listing_ids = list(dict.fromkeys(listing_ids))
+    favorited = set(db.session.scalars(
+        db.select(Favorite.listing_id)
+        .where(Favorite.user_id == user_id, Favorite.listing_id.in_(listing_ids))
+    ))
+    return {listing_id: listing_id in favorited for listing_id in listing_ids}
+
+
+# ==================== ZMENA ====================
+def toggle_favorite(user_id, listing_id):
+    """Pridá alebo odoberie obľúbený inzerát a vráti nový stav (True = obľúbený); necommituje.
+
+    Najprv sa maže - zmazaný riadok znamená odobratie, inak sa vkladá. Ak ten istý pár
+    medzitým vložila súbežná požiadavka (dvojklik), INSERT zastaví unikátny index
+    uq_favorite_user_listing a výsledok je rovnaký: inzerát je obľúbený, bez duplicity.
+    Počítadlo favorite_count inzerátu sa mení len o skutočne zmazaný alebo vložený riadok.
+    """
+    deleted = db.session.execute(
+        db.delete(Favorite).where(Favorite.user_id == user_id, Favorite.listing_id == listing_id)
+    ).rowcount
+
+    if deleted:
+        increment(Listing.favorite_count, listing_id, -deleted)
+    else:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(db.insert(Favorite).values(
+                    user_id=user_id, listing_id=listing_id, created_at=datetime.utcnow()))
+                increment(Listing.favorite_count, listing_id)
+        except IntegrityError:
+            pass
+
+    bump(FAVORITES, user_id)
+    g.pop('favorite_ids', None)
+    return not deleted
@@ -0,0 +1,43 @@
+import os
+
+# ==================== GUNICORN ====================
+# Spustenie: gunicorn -c gunicorn.conf.py wsgi:app
+# Hodnoty sa dajú prepísať premennými prostredia (BIND, WEB_CONCURRENCY, THREADS).
+
+bind = os.environ.get('BIND', '0.0.0.0:8000')
+
+# Predvolene jeden proces s vláknami (gthread): udalosti pre SSE (events.event_broker), cache 'memory'
+# a register kategórií sú v pamäti procesu, takže s jedným procesom vidí každá požiadavka všetko.
+# Viac procesov (WEB_CONCURRENCY) pomáha hlavne čítaniu; vtedy sa cache prepne na zdieľanú 'sqlite'
+# a klienti udalostí z iných procesov dobehnú pravidelným obnovovaním (static/js/messages.js).
+workers = int(os.environ.get('WEB_CONCURRENCY', 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('THREADS', 32))
+
+if workers > 1:
+    os.environ['FLASK_CACHE_BACKEND'] = 'sqlite'
+
+# SSE (/api/events) a long-poll drží vlákno po celý čas spojenia - najviac threads - 8 takých spojení
+# na proces, aby ostali vlákna pre bežné požiadavky (ďalší klienti dostanú 503 a obnovujú sa intervalom).
+# Dlhé spojenia počas čakania nedržia spojenie do databázy; DB_POOL_SIZE stačí na bežné požiadavky.
+os.environ.setdefault('FLASK_EVENTS_MAX_STREAMS', str(max(threads - 8, 1)))
+
+timeout = 60  # long-poll čaká max. 25 s (events.LONG_POLL_TIMEOUT)
+graceful_timeout = 30
+keepalive = 5
+max_requests = 2000  # periodický reštart workera proti postupnému rastu pamäte
+max_requests_jitter = 200
+
+accesslog = '-'
+errorlog = '-'
+
+
+def on_starting(server):
+    """Raz v hlavnom procese pred štartom workerov: tabuľky, migrácie a FTS index"""
+    from app import create_app, init_db
+    from extensions import db
+
+    app = create_app()
+    init_db(app)
+    with app.app_context():
+        db.engine.dispose()  # workery si otvoria vlastné spojenia
@@ -0,0 +1,153 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from extensions import db, cache
+from cache import PAGE_CACHE
+from models import Image
+from versions import bump, LISTINGS
+from storage import upload_path
+
+try:
+    from PIL import Image as PILImage, ImageOps
+except ImportError:  # Pillow nie je nainštalovaný - šablóny použijú originály
+    PILImage = None
+
+# ==================== KONŠTANTY ====================
+# Názov verzie -> maximálny rozmer (šírka, výška); pomer strán sa zachová, malé obrázky sa nezväčšujú
+RENDITIONS = {
+    'thumb': (160, 160),
+    'card': (640, 640),
+    'full': (1600, 1600),
+}
+RENDITION_FOLDER = 'renditions'  # podpriečinok v static/uploads (zachováva rozdelenie podľa hashu originálu)
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+DEFAULT_WORKERS = 2
+
+
+# ==================== SPRACOVANIE ====================
+def _prepare(source):
+    """Otočí obrázok podľa EXIF a prevedie ho do RGB (priehľadnosť na bielom pozadí)"""
+    picture = ImageOps.exif_transpose(source)
+    if picture.mode in ('RGBA', 'LA') or (picture.mode == 'P' and 'transparency' in picture.info):
+        picture = picture.convert('RGBA')
+        background = PILImage.new('RGB', picture.size, (255, 255, 255))
+        background.paste(picture, mask=picture.getchannel('A'))
+        return background
+    return picture.convert('RGB')
+
+
+def render_image(app, image):
+    """Vytvorí WebP a JPEG verzie obrázka a vráti ich popis pre Image.renditions.
+
+    Verzie sa ukladajú bez metadát (EXIF vrátane GPS, ICC, XMP) - Pillow ich zapíše len na vyžiadanie.
+    """
+    stem = os.path.splitext(image.filename)[0]
+    os.makedirs(os.path.dirname(upload_path(app, f'{RENDITION_FOLDER}/{stem}')), exist_ok=True)
+
+    renditions = {}
+    with PILImage.open(upload_path(app, image.filename)) as source:
+        picture = _prepare(source)
+        for name, size in RENDITIONS.items():
+            rendition = picture.copy()
+            rendition.thumbnail(size, PILImage.LANCZOS)
+            rendition.info = {}
+
+            webp_name = f'{RENDITION_FOLDER}/{stem}_{name}.webp'
+            jpeg_name = f'{RENDITION_FOLDER}/{stem}_{name}.jpg'
+            rendition.save(upload_path(app, webp_name), 'WEBP', quality=WEBP_QUALITY, method=4)
+            rendition.save(upload_path(app, jpeg_name), 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+
+            renditions[name] = {
+                'width': rendition.width,
+                'height': rendition.height,
+                'webp': webp_name,
+                'jpeg': jpeg_name,
+            }
+    return renditions
+
+
+def process_image(app, image_id, reuse=True):
+    """Spracuje jeden obrázok a uloží jeho verzie do databázy.
+
+    Ak ten istý súbor (rovnaký obsah) už má verzie u iného obrázka, iba sa prevezmú.
+    """
+    image = db.session.get(Image, image_id)
+    if image is None:
+        return False
+
+    existing = None
+    if reuse:
+        existing = Image.query.filter(Image.filename == image.filename, Image.id != image.id,
+                                      Image.renditions.isnot(None)).first()
+    image.renditions = existing.renditions if existing is not None else render_image(app, image)
+    bump(LISTINGS, image.listing.user_id)
+    db.session.commit()
+    cache.invalidate(PAGE_CACHE)
+    return True
+
+
+# ==================== PIPELINE ====================
+class ImagePipeline:
+    """Spracovanie nahraných obrázkov mimo požiadavky v pool-e pracovných vlákien.
+
+    Route po commite zavolá enqueue() s ID nových obrázkov a hneď odpovie; kým obrázok
+    nie je spracovaný, šablóny zobrazujú originál. Úlohy žijú len v pamäti procesu -
+    obrázky, ktoré sa nestihli spracovať (napr. reštart), dorobí `flask --app app process-images`.
+
+    Konfigurácia:
+        IMAGE_WORKERS  počet pracovných vlákien (0 = spracovať hneď v požiadavke)
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        workers = app.config.setdefault('IMAGE_WORKERS', DEFAULT_WORKERS)
+        if workers:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-pipeline')
+        app.extensions['image_pipeline'] = self
+
+    @property
+    def enabled(self):
+        return PILImage is not None and self.app is not None
+
+    def enqueue(self, image_ids):
+        if not self.enabled:
+            return
+        for image_id in image_ids:
+            if self._executor is not None:
+                self._executor.submit(self._run, image_id)
+            else:
+                self._run(image_id)
+
+    def _run(self, image_id):
+        with self.app.app_context():
+            try:
+                process_image(self.app, image_id)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Chyba pri spracovaní obrázka {image_id}: {e}")
+
+    def process_pending(self, reprocess=False):
+        """Synchrónne spracuje nespracované (alebo všetky) obrázky; vráti počet spracovaných"""
+        if not self.enabled:
+            return 0
+        query = db.session.query(Image.id)
+        if not reprocess:
+            query = query.filter(Image.renditions.is_(None))
+
+        processed = 0
+        for (image_id,) in query.order_by(Image.id).all():
+            try:
+                processed += process_image(self.app, image_id, reuse=not reprocess)
+            except Exception as e:
+                db.session.rollback()
+                print(f"Chyba pri spracovaní obrázka {image_id}: {e}")
+        return processed
+
+
+image_pipeline = ImagePipeline()
@@ -0,0 +1,226 @@
+from sqlalchemy import and_, or_, case, func, tuple_
+from sqlalchemy.exc import IntegrityError
+from extensions import db
+from models import Conversation, Message, User, Listing
+from events import event_broker
+from popularity import increment
+
+
+# ==================== POMOCNÉ FUNKCIE ====================
+def conversation_key(user_id, other_user_id, listing_id):
+    """Normalizovaný kľúč vlákna (menšie ID, väčšie ID, inzerát)"""
+    user_id, other_user_id = int(user_id), int(other_user_id)
+    listing_id = int(listing_id) if listing_id else None
+    return min(user_id, other_user_id), max(user_id, other_user_id), listing_id
+
+
+def find_conversation(user_id, other_user_id, listing_id):
+    user_a_id, user_b_id, listing_id = conversation_key(user_id, other_user_id, listing_id)
+    query = Conversation.query.filter_by(user_a_id=user_a_id, user_b_id=user_b_id)
+    if listing_id is None:
+        return query.filter(Conversation.listing_id.is_(None)).first()
+    return query.filter_by(listing_id=listing_id).first()
+
+
+def _unread_column(conversation, user_id):
+    return 'unread_a' if conversation.user_a_id == int(user_id) else 'unread_b'
+
+
+# ==================== ZÁPIS ====================
+def record_message(message):
+    """Priradí novú správu k vláknu a aktualizuje poslednú správu, počet neprečítaných
+    a počet správ k inzerátu.
+
+    Volá sa po db.session.add(message) a pred commitom, aby sa všetko uložilo v jednej transakcii.
+    Ak to isté vlákno medzitým založila súbežná prvá správa, INSERT zastaví unikátny index
+    ux_conversation_key a použije sa už existujúce vlákno.
+    """
+    db.session.flush()
+
+    conversation = find_conversation(message.sender_id, message.receiver_id, message.listing_id)
+    if conversation is None:
+        user_a_id, user_b_id, listing_id = conversation_key(message.sender_id, message.receiver_id,
+                                                            message.listing_id)
+        conversation = Conversation(user_a_id=user_a_id, user_b_id=user_b_id, listing_id=listing_id,
+                                    unread_a=0, unread_b=0)
+        try:
+            with db.session.begin_nested():
+                db.session.add(conversation)
+        except IntegrityError:
+            conversation = find_conversation(message.sender_id, message.receiver_id, message.listing_id)
+
+    conversation.last_message_id = message.id
+    conversation.last_message_at = message.created_at
+
+    # Atomický inkrement priamo v SQL (UPDATE ... SET unread_x = unread_x + 1)
+    column = _unread_column(conversation, message.receiver_id)
+    setattr(conversation, column, getattr(Conversation, column) + 1)
+
+    increment(Listing.message_count, message.listing_id)
+    return conversation
+
+
+def mark_conversation_read(user_id, other_user_id, listing_id):
+    """Označí všetky prijaté správy vo vlákne ako prečítané a vynuluje počítadlo; vráti počet označených správ"""
+    _, _, listing_id = conversation_key(user_id, other_user_id, listing_id)
+
+    query = Message.query.filter(
+        Message.sender_id == other_user_id,
+        Message.receiver_id == user_id,
+        Message.is_read == False
+    )
+    if listing_id:
+        query = query.filter(Message.listing_id == listing_id)
+    else:
+        query = query.filter(Message.listing_id.is_(None))
+    updated = query.update({Message.is_read: True}, synchronize_session='fetch')
+
+    conversation = find_conversation(user_id, other_user_id, listing_id)
+    if conversation is not None:
+        setattr(conversation, _unread_column(conversation, user_id), 0)
+    return updated
+
+
+def mark_message_read(message):
+    """Označí jednu prijatú správu ako prečítanú a zníži počítadlo vlákna"""
+    if message.is_read:
+        return
+
+    message.is_read = True
+    conversation = find_conversation(message.sender_id, message.receiver_id, message.listing_id)
+    if conversation is not None:
+        column = _unread_column(conversation, message.receiver_id)
+        setattr(conversation, column, case((getattr(Conversation, column) > 0, getattr(Conversation, column) - 1),
+                                           else_=0))
+
+
+def refresh_conversation(user_id, other_user_id, listing_id):
+    """Prepočíta jedno vlákno zo zostávajúcich správ (napr. po zmazaní správy)"""
+    conversation = find_conversation(user_id, other_user_id, listing_id)
+    if conversation is None:
+        return
+
+    query = Message.query.filter(
+        or_(
+            and_(Message.sender_id == conversation.user_a_id, Message.receiver_id == conversation.user_b_id),
+            and_(Message.sender_id == conversation.user_b_id, Message.receiver_id == conversation.user_a_id)
+        )
+    )
+    if conversation.listing_id is None:
+        query = query.filter(Message.listing_id.is_(None))
+    else:
+        query = query.filter(Message.listing_id == conversation.listing_id)
+
+    last_message = query.order_by(Message.created_at.desc(), Message.id.desc()).first()
+    if last_message is None:
+        db.session.delete(conversation)
+        return
+
+    conversation.last_message_id = last_message.id
+    conversation.last_message_at = last_message.created_at
+    conversation.unread_a = query.filter(Message.receiver_id == conversation.user_a_id,
+                                         Message.is_read == False).count()
+    conversation.unread_b = query.filter(Message.receiver_id == conversation.user_b_id,
+                                         Message.is_read == False).count()
+
+
+def rebuild_conversations(pairs=None):
+    """Zostaví tabuľku conversation nanovo z tabuľky message (jeden INSERT ... SELECT).
+
+    S pairs (množina dvojíc (menšie ID, väčšie ID)) sa prepočítajú len vlákna týchto dvojíc
+    a necommituje sa - volajúci (napr. hromadné mazanie v moderation.py) to urobí spolu so svojou zmenou.
+    """
+    user_a_id = case((Message.sender_id < Message.receiver_id, Message.sender_id), else_=Message.receiver_id)
+    user_b_id = case((Message.sender_id < Message.receiver_id, Message.receiver_id), else_=Message.sender_id)
+    key = (user_a_id, user_b_id, Message.listing_id)
+
+    def unread_for(column):
+        return func.sum(case((and_(Message.receiver_id == column, Message.is_read == False), 1), else_=0)) \
+            .over(partition_by=key)
+
+    ranked = db.select(
+        user_a_id.label('user_a_id'),
+        user_b_id.label('user_b_id'),
+        Message.listing_id.label('listing_id'),
+        Message.id.label('last_message_id'),
+        Message.created_at.label('last_message_at'),
+        unread_for(user_a_id).label('unread_a'),
+        unread_for(user_b_id).label('unread_b'),
+        func.row_number().over(partition_by=key,
+                               order_by=(Message.created_at.desc(), Message.id.desc())).label('position')
+    )
+    delete = db.delete(Conversation)
+    if pairs is not None:
+        pairs = sorted(pairs)
+        if not pairs:
+            return
+        # Obidva smery každej dvojice - (sender_id, receiver_id) IN (...) ide cez index ix_message_sender_receiver_*
+        directed = pairs + [(b, a) for a, b in pairs if a != b]
+        ranked = ranked.where(tuple_(Message.sender_id, Message.receiver_id).in_(directed))
+        delete = delete.where(tuple_(Conversation.user_a_id, Conversation.user_b_id).in_(pairs))
+    ranked = ranked.subquery()
+
+    columns = ['user_a_id', 'user_b_id', 'listing_id', 'last_message_id', 'last_message_at', 'unread_a', 'unread_b']
+    db.session.execute(delete)
+    db.session.execute(
+        db.insert(Conversation).from_select(
+            columns,
+            db.select(*[ranked.c[name] for name in columns]).where(ranked.c.position == 1)
+        )
+    )
+    if pairs is None:
+        db.session.commit()
+
+
+# ==================== ČÍTANIE ====================
+def conversation_summaries(user_id):
+    """Vlákna používateľa s poslednou správou, druhým účastníkom a počtom neprečítaných.
+
+    Vracia riadky (Message, druhý User, Listing alebo None, unread_count) zoradené od najnovšej konverzácie.
+    """
+    is_a = Conversation.user_a_id == user_id
+    other_user_id = case((is_a, Conversation.user_b_id), else_=Conversation.user_a_id)
+    unread_count = case((is_a, Conversation.unread_a), else_=Conversation.unread_b)
+
+    return db.session.execute(
+        db.select(Message, User, Listing, unread_count)
+        .select_from(Conversation)
+        .join(Message, Message.id == Conversation.last_message_id)
+        .join(User, User.id == other_user_id)
+        .outerjoin(Listing, Listing.id == Conversation.listing_id)
+        .where(or_(Conversation.user_a_id == user_id, Conversation.user_b_id == user_id))
+        .order_by(Conversation.last_message_at.desc(), Conversation.id.desc())
+    ).all()
+
+
+def unread_messages_count(user_id):
+    """Súčet neprečítaných správ cez vlákna používateľa"""
+    count = db.session.execute(
+        db.select(func.sum(case((Conversation.user_a_id == user_id, Conversation.unread_a),
+                                else_=Conversation.unread_b)))
+        .where(or_(Conversation.user_a_id == user_id, Conversation.user_b_id == user_id))
+    ).scalar()
+    return count or 0
+
+
+# ==================== NOTIFIKÁCIE ====================
+def notify_new_message(message):
+    """Po commite doručí novú správu príjemcovi (a ostatným kartám odosielateľa) cez event_broker"""
+    payload = {
+        'message_id': message.id,
+        'sender_id': int(message.sender_id),
+        'sender_name': message.sender.username,
+        'receiver_id': int(message.receiver_id),
+        'listing_id': int(message.listing_id) if message.listing_id else None,
+        'content': message.content[:100] + '...' if len(message.content) > 100 else message.content,
+        'created_at': message.created_at.strftime('%d.%m.%Y %H:%M')
+    }
+
+    receiver_id = int(message.receiver_id)
+    event_broker.publish(receiver_id, 'new_message', dict(payload, unread_count=unread_messages_count(receiver_id)))
+    event_broker.publish(int(message.sender_id), 'new_message', payload)
+
+
+def notify_unread_count(user_id):
+    """Pošle používateľovi aktuálny počet neprečítaných správ (napr. po prečítaní v inej karte)"""
+    event_broker.publish(user_id, 'unread', {'unread_count': unread_messages_count(user_id)})
@@ -0,0 +1,270 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from flask import g, request, has_request_context, before_render_template, template_rendered
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# ==================== KONŠTANTY ====================
+# Hranice histogramu latencie požiadaviek (sekundy), rovnaké ako predvolené v klientoch Promethea
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOW_QUERY_MS = 100  # dotaz dlhší ako toto sa zapíše do slow-query logu
+SLOW_REQUEST_MS = 1000  # požiadavka dlhšia ako toto sa zapíše do logu
+QUERY_COUNT_WARNING = 20  # viac dotazov v jednej požiadavke naznačuje N+1
+SLOW_LOG_SIZE = 100  # posledné pomalé dotazy/požiadavky zobrazené na /admin/metrics
+STATEMENT_PREVIEW = 500  # znakov SQL v logu (parametre sa nelogujú - môžu obsahovať osobné údaje)
+
+slow_log = logging.getLogger('trhovisko.slow')
+
+
+class EndpointStats:
+    """Súhrnné štatistiky jedného endpointu od štartu procesu"""
+
+    def __init__(self):
+        self.count = 0
+        self.statuses = {}
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # posledný = +Inf
+        self.duration = 0.0
+        self.max_duration = 0.0
+        self.sql_count = 0
+        self.sql_max_count = 0
+        self.sql_duration = 0.0
+        self.template_duration = 0.0
+
+    def observe(self, status, duration, sql_count, sql_duration, template_duration):
+        self.count += 1
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if duration <= bound:
+                self.buckets[i] += 1
+                break
+        else:
+            self.buckets[-1] += 1
+        self.duration += duration
+        self.max_duration = max(self.max_duration, duration)
+        self.sql_count += sql_count
+        self.sql_max_count = max(self.sql_max_count, sql_count)
+        self.sql_duration += sql_duration
+        self.template_duration += template_duration
+
+    def quantile(self, q):
+        """Odhad kvantilu latencie z histogramu (lineárna interpolácia v rámci koša)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen, lower = 0, 0.0
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            in_bucket = self.buckets[i]
+            if seen + in_bucket >= rank and in_bucket:
+                return lower + (bound - lower) * (rank - seen) / in_bucket
+            seen += in_bucket
+            lower = bound
+        return self.max_duration
+
+    def average(self, total):
+        return total / self.count if self.count else 0.0
+
+
+class Metrics:
+    """Voliteľná inštrumentácia požiadaviek: latencia, SQL dotazy a renderovanie šablón po endpointoch.
+
+    Dáta sú v pamäti procesu (pri viacerých workeroch má každý vlastné) a zobrazujú sa
+    na /admin/metrics a v textovom formáte Promethea na /metrics.
+
+    Konfigurácia:
+        METRICS_ENABLED          zapne inštrumentáciu (predvolene vypnutá)
+        METRICS_SLOW_QUERY_MS    prah slow-query logu v ms
+        METRICS_SLOW_REQUEST_MS  prah pomalej požiadavky v ms
+        METRICS_QUERY_WARNING    počet dotazov na požiadavku, nad ktorým sa zapíše varovanie (N+1)
+        METRICS_TOKEN            token pre /metrics (Authorization: Bearer ...); bez neho len pre adminov
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.started_at = datetime.now()
+        self.endpoints = {}
+        self.slow_entries = deque(maxlen=SLOW_LOG_SIZE)
+        self.slow_query_count = 0
+        self._lock = threading.Lock()
+        self._listening = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.setdefault('METRICS_ENABLED', False)
+        self.slow_query_seconds = app.config.setdefault('METRICS_SLOW_QUERY_MS', SLOW_QUERY_MS) / 1000
+        self.slow_request_seconds = app.config.setdefault('METRICS_SLOW_REQUEST_MS', SLOW_REQUEST_MS) / 1000
+        self.query_warning = app.config.setdefault('METRICS_QUERY_WARNING', QUERY_COUNT_WARNING)
+        app.config.setdefault('METRICS_TOKEN', None)
+        app.extensions['metrics'] = self
+
+        if not self.enabled:
+            return
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        before_render_template.connect(self._before_render, app)
+        template_rendered.connect(self._after_render, app)
+        if not self._listening:
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._listening = True
+
+    # ---------- požiadavky ----------
+    def _before_request(self):
+        g._metrics = {'start': time.perf_counter(), 'sql_count': 0, 'sql_duration': 0.0,
+                      'template_duration': 0.0, 'template_starts': []}
+
+    def _after_request(self, response):
+        state = g.pop('_metrics', None)
+        if state is None:
+            return response
+
+        duration = time.perf_counter() - state['start']
+        endpoint = request.endpoint or 'unknown'
+        with self._lock:
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = EndpointStats()
+            stats.observe(response.status_code, duration, state['sql_count'],
+                          state['sql_duration'], state['template_duration'])
+
+        if duration >= self.slow_request_seconds:
+            self._log_slow('request', duration, f'{request.method} {request.path}', endpoint,
+                           f"{state['sql_count']} SQL dotazov, {state['sql_duration'] * 1000:.1f} ms v SQL")
+        if state['sql_count'] > self.query_warning:
+            self._log_slow('n+1', duration, f'{request.method} {request.path}', endpoint,
+                           f"{state['sql_count']} SQL dotazov v jednej požiadavke")
+        return response
+
+    # ---------- šablóny ----------
+    def _before_render(self, sender, template, context, **extra):
+        state = g.get('_metrics')
+        if state is not None:
+            state['template_starts'].append(time.perf_counter())
+
+    def _after_render(self, sender, template, context, **extra):
+        state = g.get('_metrics')
+        if state is not None and state['template_starts']:
+            elapsed = time.perf_counter() - state['template_starts'].pop()
+            # Vnorené renderovanie (render_template v šablóne) sa nezapočíta dvakrát
+            if not state['template_starts']:
+                state['template_duration'] += elapsed
+
+    # ---------- SQL ----------
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('_metrics_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        starts = conn.info.get('_metrics_query_start')
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+
+        endpoint = None
+        if has_request_context():
+            endpoint = request.endpoint
+            state = g.get('_metrics')
+            if state is not None:
+                state['sql_count'] += 1
+                state['sql_duration'] += duration
+
+        if duration >= self.slow_query_seconds:
+            with self._lock:
+                self.slow_query_count += 1
+            self._log_slow('query', duration, ' '.join(statement.split())[:STATEMENT_PREVIEW], endpoint)
+
+    def _log_slow(self, kind, duration, what, endpoint, detail=''):
+        entry = {
+            'time': datetime.now(),
+            'kind': kind,
+            'duration_ms': duration * 1000,
+            'endpoint': endpoint or '-',
+            'what': what,
+            'detail': detail,
+        }
+        with self._lock:
+            self.slow_entries.appendleft(entry)
+        slow_log.warning('%s %.1f ms [%s] %s %s', kind, entry['duration_ms'], entry['endpoint'], what, detail)
+
+    # ---------- výstupy ----------
+    def snapshot(self):
+        """Riadky pre /admin/metrics zoradené podľa celkového času stráveného v endpointe"""
+        with self._lock:
+            rows = []
+            for endpoint, stats in self.endpoints.items():
+                rows.append({
+                    'endpoint': endpoint,
+                    'count': stats.count,
+                    'errors': sum(n for status, n in stats.statuses.items() if status >= 500),
+                    'avg_ms': stats.average(stats.duration) * 1000,
+                    'p50_ms': stats.quantile(0.5) * 1000,
+                    'p95_ms': stats.quantile(0.95) * 1000,
+                    'p99_ms': stats.quantile(0.99) * 1000,
+                    'max_ms': stats.max_duration * 1000,
+                    'total_s': stats.duration,
+                    'avg_queries': stats.average(stats.sql_count),
+                    'max_queries': stats.sql_max_count,
+                    'avg_sql_ms': stats.average(stats.sql_duration) * 1000,
+                    'avg_template_ms': stats.average(stats.template_duration) * 1000,
+                })
+            slow_entries = list(self.slow_entries)
+        rows.sort(key=lambda row: row['total_s'], reverse=True)
+        return rows, slow_entries
+
+    def prometheus(self):
+        """Metriky v textovom formáte Promethea (exposition format 0.0.4)"""
+        lines = [
+            '# HELP trhovisko_request_duration_seconds Latencia požiadaviek podľa endpointu.',
+            '# TYPE trhovisko_request_duration_seconds histogram',
+        ]
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            for endpoint, stats in endpoints:
+                cumulative = 0
+                for bound, in_bucket in zip(LATENCY_BUCKETS, stats.buckets):
+                    cumulative += in_bucket
+                    lines.append(f'trhovisko_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+                lines.append(f'trhovisko_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {stats.count}')
+                lines.append(f'trhovisko_request_duration_seconds_sum{{endpoint="{endpoint}"}} {stats.duration:.6f}')
+                lines.append(f'trhovisko_request_duration_seconds_count{{endpoint="{endpoint}"}} {stats.count}')
+
+            counters = [
+                ('trhovisko_requests_total', 'Počet požiadaviek podľa endpointu a stavového kódu.', None),
+                ('trhovisko_sql_queries_total', 'Počet SQL dotazov vykonaných v požiadavkách.', 'sql_count'),
+                ('trhovisko_sql_duration_seconds_total', 'Čas strávený v SQL dotazoch.', 'sql_duration'),
+                ('trhovisko_template_render_seconds_total', 'Čas renderovania šablón.', 'template_duration'),
+            ]
+            for name, help_text, attribute in counters:
+                lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+                for endpoint, stats in endpoints:
+                    if attribute is None:
+                        for status, n in sorted(stats.statuses.items()):
+                            lines.append(f'{name}{{endpoint="{endpoint}",status="{status}"}} {n}')
+                    else:
+                        lines.append(f'{name}{{endpoint="{endpoint}"}} {getattr(stats, attribute)}')
+
+            lines += [
+                '# HELP trhovisko_sql_queries_per_request_max Najviac SQL dotazov v jednej požiadavke.',
+                '# TYPE trhovisko_sql_queries_per_request_max gauge',
+            ]
+            lines += [f'trhovisko_sql_queries_per_request_max{{endpoint="{endpoint}"}} {stats.sql_max_count}'
+                      for endpoint, stats in endpoints]
+            lines += [
+                '# HELP trhovisko_slow_queries_total Počet SQL dotazov nad prahom METRICS_SLOW_QUERY_MS.',
+                '# TYPE trhovisko_slow_queries_total counter',
+                f'trhovisko_slow_queries_total {self.slow_query_count}',
+            ]
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self.endpoints.clear()
+            self.slow_entries.clear()
+            self.slow_query_count = 0
+            self.started_at = datetime.now()
+
+
+metrics = Metrics()
@@ -0,0 +1,174 @@
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateIndex
+from extensions import db
+from models import User, Listing, Image, Message, Favorite, Conversation, ModerationJob, Place, SimilarListing
+
+# ==================== REGISTER MIGRÁCIÍ ====================
+# db.create_all() vytvorí len chýbajúce tabuľky, existujúce tabuľky nikdy nemení.
+# Zmeny schémy pre existujúcu databázu (instance/data.db) preto pridávame sem
+# ako očíslované kroky. Každý krok sa vykoná práve raz a zapíše sa do schema_migration.
+MIGRATIONS = []
+
+
+def migration(version):
+    """Dekorátor, ktorý zaregistruje krok migrácie pod daným číslom verzie"""
+    def decorator(f):
+        MIGRATIONS.append((version, f))
+        return f
+
+    return decorator
+
+
+# ==================== POMOCNÉ FUNKCIE ====================
+def create_indexes(*models):
+    """Vytvorí indexy definované v __table_args__ modelov (ak ešte neexistujú).
+
+    Indexy nad stĺpcami, ktoré v tabuľke ešte nie sú, preskočí - vytvorí ich neskoršia
+    migrácia, ktorá stĺpec pridá (starší krok tak nezlyhá na novšej definícii modelu).
+    """
+    with db.engine.begin() as connection:
+        for model in models:
+            existing = {c['name'] for c in inspect(connection).get_columns(model.__tablename__)}
+            for index in model.__table__.indexes:
+                if all(column.name in existing for column in index.columns):
+                    connection.execute(CreateIndex(index, if_not_exists=True))
+
+
+def add_column(model, column_name):
+    """Pridá stĺpec z definície modelu do existujúcej tabuľky (ak chýba)"""
+    table_name = model.__tablename__
+    existing = {c['name'] for c in inspect(db.engine).get_columns(table_name)}
+    if column_name in existing:
+        return
+
+    column = model.__table__.c[column_name]
+    column_type = column.type.compile(dialect=db.engine.dialect)
+    ddl = f'ALTER TABLE "{table_name}" ADD COLUMN "{column_name}" {column_type}'
+    if column.server_default is not None:
+        ddl += f' DEFAULT {column.server_default.arg}'
+    with db.engine.begin() as connection:
+        connection.execute(text(ddl))
+
+
+def remove_duplicate_favorites():
+    """Zmaže opakované obľúbené toho istého inzerátu u používateľa (ponechá najstarší riadok)"""
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            'DELETE FROM favorite WHERE id NOT IN (SELECT MIN(id) FROM favorite GROUP BY user_id, listing_id)'
+        ))
+
+
+def _ensure_migration_table():
+    with db.engine.begin() as connection:
+        connection.execute(text(
+            'CREATE TABLE IF NOT EXISTS schema_migration ('
+            'version INTEGER PRIMARY KEY, name VARCHAR(200), applied_at DATETIME)'
+        ))
+
+
+def run_migrations():
+    """Aplikuje všetky ešte nevykonané migrácie v poradí podľa verzie a vráti ich zoznam (verzia, názov).
+
+    Priebeh ide do app.logger (úroveň INFO) - pri štarte servera ho tak nevypisuje každý proces;
+    výpis pre konzolu robí príkaz `flask --app app migrate`.
+    """
+    _ensure_migration_table()
+
+    with db.engine.connect() as connection:
+        applied = {row[0] for row in connection.execute(text('SELECT version FROM schema_migration'))}
+
+    newly_applied = []
+    for version, step in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if version in applied:
+            continue
+
+        step()
+        with db.engine.begin() as connection:
+            connection.execute(
+                text('INSERT INTO schema_migration (version, name, applied_at) VALUES (:v, :n, :t)'),
+                {'v': version, 'n': step.__name__, 't': datetime.utcnow()}
+            )
+        current_app.logger.info(f"Migrácia {version} ({step.__name__}) bola aplikovaná.")
+        newly_applied.append((version, step.__name__))
+    return newly_applied
+
+
+# ==================== MIGRÁCIE ====================
+@migration(1)
+def add_hot_query_indexes():
+    remove_duplicate_favorites()  # index (user_id, listing_id) je unikátny, viď migrácia 10
+    create_indexes(Listing, Image, Message, Favorite)
+
+
+@migration(2)
+def add_conversation_table():
+    Conversation.__table__.create(db.engine, checkfirst=True)
+    create_indexes(Conversation)
+
+    from messaging import rebuild_conversations
+    rebuild_conversations()
+
+
+@migration(3)
+def add_user_data_versions():
+    for column_name in ('listings_version', 'favorites_version', 'messages_version'):
+        add_column(User, column_name)
+
+
+@migration(4)
+def add_image_renditions():
+    add_column(Image, 'renditions')
+
+
+@migration(5)
+def add_image_filename_index():
+    create_indexes(Image)
+
+
+@migration(6)
+def add_admin_table_indexes():
+    create_indexes(Listing, Message)
+
+
+@migration(7)
+def add_moderation_job_table():
+    ModerationJob.__table__.create(db.engine, checkfirst=True)
+
+
+@migration(8)
+def add_place_table():
+    Place.__table__.create(db.engine, checkfirst=True)
+    create_indexes(Place)
+    add_column(Listing, 'place_id')
+    create_indexes(Listing)
+
+    from places import load_gazetteer, resolve_listing_places
+    load_gazetteer()
+    resolve_listing_places()
+
+
+@migration(9)
+def add_similar_listing_table():
+    SimilarListing.__table__.create(db.engine, checkfirst=True)
+    create_indexes(SimilarListing)
+
+
+@migration(10)
+def add_favorite_unique_index():
+    remove_duplicate_favorites()
+    with db.engine.begin() as connection:
+        connection.execute(text('DROP INDEX IF EXISTS ix_favorite_user_listing'))
+    create_indexes(Favorite)
+
+
+@migration(11)
+def add_listing_popularity_counters():
+    for column_name in ('favorite_count', 'message_count', 'view_count'):
+        add_column(Listing, column_name)
+    create_indexes(Listing)
+
+    from popularity import recount_popularity
+    recount_popularity()
+    db.session.commit()
@@ -15,6 +15,16 @@ class Category(db.Model):
 
 
 class Listing(db.Model):
+    __table_args__ = (
+        db.Index('ix_listing_status_created_at', 'status', 'created_at'),
+        db.Index('ix_listing_category_status_created_at', 'category_id', 'status', 'created_at'),
+        db.Index('ix_listing_user_created_at', 'user_id', 'created_at'),
+        db.Index('ix_listing_status_price', 'status', 'price'),
+        db.Index('ix_listing_created_at', 'created_at'),  # admin tabuľka bez filtra statusu
+        db.Index('ix_listing_place_status_created_at', 'place_id', 'status', 'created_at'),
+        db.Index('ix_listing_status_popularity', 'status', 'favorite_count', 'message_count', 'view_count'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
@@ -22,22 +32,79 @@ class Listing(db.Model):
     location = db.Column(db.String(200))
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+    place_id = db.Column(db.Integer, db.ForeignKey('place.id'), nullable=True)  # obec z gazetteera (places.py)
     status = db.Column(db.String(20), default='active')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Denormalizované počítadlá popularity (popularity.py) - zoradenie bez načítania kolekcií
+    favorite_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    message_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    view_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
 
     images = db.relationship('Image', backref='listing', lazy=True, cascade='all, delete-orphan')
     messages = db.relationship('Message', backref='listing', lazy=True)
     favorites = db.relationship('Favorite', backref='listing', lazy=True)
+    place = db.relationship('Place', lazy=True)
+
+
+class Place(db.Model):
+    """Obec alebo mestská časť z gazetteera (data/gazetteer.csv) so súradnicami.
+
+    normalized_name je názov bez diakritiky a interpunkcie (hľadanie zhody s textom lokality),
+    grid_cell je bunka mriežky súradníc (vyhľadávanie do vzdialenosti cez index).
+    """
+    __table_args__ = (
+        db.Index('ix_place_normalized_name', 'normalized_name'),
+        db.Index('ix_place_grid_cell', 'grid_cell'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    normalized_name = db.Column(db.String(100), nullable=False)
+    district = db.Column(db.String(100))
+    region = db.Column(db.String(100))
+    latitude = db.Column(db.Float, nullable=False)
+    longitude = db.Column(db.Float, nullable=False)
+    grid_cell = db.Column(db.Integer, nullable=False)
+    parent_id = db.Column(db.Integer, db.ForeignKey('place.id'), nullable=True)  # mestská časť -> mesto
+
+    parts = db.relationship('Place', backref=db.backref('parent', remote_side=[id]), lazy=True)
 
 
 class Image(db.Model):
+    __table_args__ = (
+        db.Index('ix_image_listing_id', 'listing_id'),
+        db.Index('ix_image_filename', 'filename'),  # počet odkazov na súbor v úložisku (storage.py)
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     filename = db.Column(db.String(300), nullable=False)
     listing_id = db.Column(db.Integer, db.ForeignKey('listing.id'), nullable=False)
     is_primary = db.Column(db.Boolean, default=False)
+    # Zmenšené verzie z images.py: {'thumb': {'width', 'height', 'webp', 'jpeg'}, 'card': ..., 'full': ...}
+    # None = ešte nespracovaný obrázok (šablóny zatiaľ použijú originál)
+    renditions = db.Column(db.JSON(none_as_null=True))
+
+    def rendition_path(self, name, image_format='jpeg'):
+        """Cesta k verzii obrázka v priečinku uploads (alebo k originálu, kým nie je spracovaný)"""
+        rendition = (self.renditions or {}).get(name)
+        return rendition[image_format] if rendition else self.filename
+
+    def srcset_entries(self):
+        """Verzie obrázka zoradené podľa šírky, bez duplicitných šírok (malé originály sa nezväčšujú)"""
+        entries = {}
+        for rendition in (self.renditions or {}).values():
+            entries.setdefault(rendition['width'], rendition)
+        return [entries[width] for width in sorted(entries)]
 
 
 class Message(db.Model):
+    __table_args__ = (
+        db.Index('ix_message_sender_receiver_created_at', 'sender_id', 'receiver_id', 'created_at'),
+        db.Index('ix_message_receiver_is_read', 'receiver_id', 'is_read'),
+        db.Index('ix_message_listing_id', 'listing_id'),
+        db.Index('ix_message_created_at', 'created_at'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
     sender_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -48,12 +115,82 @@ class Message(db.Model):
 
 
 class Favorite(db.Model):
+    __table_args__ = (
+        # Unikátny: jeden inzerát je u používateľa obľúbený najviac raz (aj pri súbežnom pridaní)
+        db.Index('uq_favorite_user_listing', 'user_id', 'listing_id', unique=True),
+        db.Index('ix_favorite_listing_id', 'listing_id'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     listing_id = db.Column(db.Integer, db.ForeignKey('listing.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
 
+class SimilarListing(db.Model):
+    """Predpočítané podobné inzeráty (recommendations.py): pre každý aktívny inzerát top N podľa skóre.
+
+    Detail inzerátu ich číta jedným dotazom cez primárny kľúč (listing_id, rank).
+    """
+    __table_args__ = (
+        db.Index('ix_similar_listing_similar_id', 'similar_id'),
+    )
+
+    listing_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    rank = db.Column(db.Integer, primary_key=True, autoincrement=False)  # 0 = najpodobnejší
+    similar_id = db.Column(db.Integer, nullable=False)
+    score = db.Column(db.Float, nullable=False)
+
+
+class Conversation(db.Model):
+    """Denormalizované vlákno správ medzi dvojicou používateľov (k inzerátu alebo všeobecné).
+
+    user_a_id je vždy menšie ID z dvojice, user_b_id väčšie; unread_a/unread_b sú počty
+    neprečítaných správ pre príslušného účastníka.
+    """
+    __table_args__ = (
+        db.Index('ix_conversation_user_a_last_message_at', 'user_a_id', 'last_message_at'),
+        db.Index('ix_conversation_user_b_last_message_at', 'user_b_id', 'last_message_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_a_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_b_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    listing_id = db.Column(db.Integer, db.ForeignKey('listing.id'), nullable=True)
+    last_message_id = db.Column(db.Integer, db.ForeignKey('message.id'), nullable=True)
+    last_message_at = db.Column(db.DateTime)
+    unread_a = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    unread_b = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    last_message = db.relationship('Message', lazy=True)
+
+
+# Jedno vlákno na dvojicu a inzerát (NULL listing_id sa v unique indexe inak neporovnáva)
+db.Index('ux_conversation_key', Conversation.user_a_id, Conversation.user_b_id,
+         db.func.coalesce(Conversation.listing_id, 0), unique=True)
+
+
+class ModerationJob(db.Model):
+    """Hromadná moderátorská operácia (moderation.py) a jej priebeh.
+
+    Stav sa ukladá do databázy po každej dávke, takže priebeh vidí ktorýkoľvek worker servera.
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    action = db.Column(db.String(30), nullable=False)
+    description = db.Column(db.String(300), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default='running')  # running, done, failed
+    total = db.Column(db.Integer, nullable=False, default=0)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    created_by = db.Column(db.Integer, nullable=True)  # ID admina (bez FK - admin môže byť neskôr zmazaný)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+    error = db.Column(db.Text)
+
+    @property
+    def percent(self):
+        return 100 if not self.total else int(self.processed * 100 / self.total)
+
+
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(20), unique=True, nullable=False)
@@ -62,6 +199,15 @@ class User(db.Model, UserMixin):
     role = db.Column(db.String(20), default='user')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Verzie dát pre ETag dashboard API (zvyšujú sa pri každej relevantnej zmene, viď versions.py)
+    listings_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    favorites_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    messages_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Počty načítané len na vyžiadanie cez with_expression() (admin zoznam používateľov)
+    listing_count = db.query_expression()
+    message_count = db.query_expression()
+
     listings = db.relationship('Listing', backref='author', lazy=True, cascade='all, delete-orphan')
     sent_messages = db.relationship('Message', foreign_keys=[Message.sender_id], backref='sender', lazy=True, cascade='all, delete-orphan')
     received_messages = db.relationship('Message', foreign_keys=[Message.receiver_id], backref='receiver', lazy=True, cascade='all, delete-orphan')
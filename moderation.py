@@ -0,0 +1,204 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from sqlalchemy import or_
+from extensions import db, cache
+from cache import PAGE_CACHE
+from models import User, Listing, Image, Message, Favorite, Conversation, ModerationJob
+from messaging import rebuild_conversations
+from recommendations import forget_listings
+from popularity import recount_popularity
+from storage import release_files
+from versions import bump, bump_listings_watchers, LISTINGS, MESSAGES
+
+# ==================== KONŠTANTY ====================
+DEFAULT_CHUNK_SIZE = 500  # riadkov v jednej transakcii (drží zámok SQLite len krátko)
+DEFAULT_WORKERS = 1  # hromadné zápisy idú jeden po druhom
+RECENT_JOBS = 20  # úloh zobrazených na /admin/moderation
+INTERRUPTED_ERROR = 'Prerušené ukončením servera - spustite operáciu znova'
+
+
+# ==================== DÁVKOVÉ OPERÁCIE ====================
+# Každá funkcia spracuje jednu dávku ID množinovými príkazmi DELETE/UPDATE (bez načítania
+# objektov a ORM kaskád), necommituje a vráti odkazy na súbory, ktoré sa po commite uvoľnia.
+def _conversation_pairs(message_filter):
+    """Dvojice (menšie ID, väčšie ID), ktorých vlákna ovplyvní zmena správ vybraných filtrom"""
+    rows = db.session.execute(
+        db.select(Message.sender_id, Message.receiver_id).where(message_filter).distinct()
+    ).all()
+    return {(min(row), max(row)) for row in rows}
+
+
+def _users(pairs):
+    return {user_id for pair in pairs for user_id in pair}
+
+
+def delete_listings(listing_ids):
+    """Zmaže inzeráty aj s obrázkami, obľúbenými a odporúčaniami; správy k nim ostanú ako všeobecné (listing_id = NULL)"""
+    references = db.session.execute(
+        db.select(Image.filename, Image.renditions).where(Image.listing_id.in_(listing_ids))
+    ).all()
+    owners = db.session.scalars(db.select(Listing.user_id).where(Listing.id.in_(listing_ids)).distinct()).all()
+    pairs = _conversation_pairs(Message.listing_id.in_(listing_ids))
+
+    bump(LISTINGS, *owners)
+    bump_listings_watchers(listing_ids)
+    bump(MESSAGES, *_users(pairs))
+
+    db.session.execute(db.update(Message).where(Message.listing_id.in_(listing_ids)).values(listing_id=None))
+    db.session.execute(db.delete(Favorite).where(Favorite.listing_id.in_(listing_ids)))
+    db.session.execute(db.delete(Image).where(Image.listing_id.in_(listing_ids)))
+    forget_listings(listing_ids)
+    db.session.execute(db.delete(Listing).where(Listing.id.in_(listing_ids)))
+    rebuild_conversations(pairs)
+    return [tuple(reference) for reference in references]
+
+
+def deactivate_listings(listing_ids):
+    """Skryje inzeráty (status 'inactive') - dajú sa neskôr obnoviť úpravou"""
+    owners = db.session.scalars(db.select(Listing.user_id).where(Listing.id.in_(listing_ids)).distinct()).all()
+    bump(LISTINGS, *owners)
+    bump_listings_watchers(listing_ids)
+    db.session.execute(db.update(Listing).where(Listing.id.in_(listing_ids)).values(status='inactive'))
+    return []
+
+
+def delete_messages(message_ids):
+    """Zmaže správy a prepočíta vlákna dotknutých používateľov aj počty správ inzerátov"""
+    pairs = _conversation_pairs(Message.id.in_(message_ids))
+    listing_ids = db.session.scalars(db.select(Message.listing_id).where(
+        Message.id.in_(message_ids), Message.listing_id.isnot(None)).distinct()).all()
+    bump(MESSAGES, *_users(pairs))
+    db.session.execute(db.delete(Message).where(Message.id.in_(message_ids)))
+    rebuild_conversations(pairs)
+    recount_popularity(listing_ids)
+    return []
+
+
+def delete_users(user_ids):
+    """Zmaže používateľov aj so zvyšnými inzerátmi a správami a nakoniec samotné účty.
+
+    Väčšinu inzerátov a správ zmažú predchádzajúce kroky úlohy (viď start_delete_user), no kým
+    úloha beží, môžu pribudnúť nové. Prvý príkaz je zápis (DELETE obľúbených), ktorý získa zápisový
+    zámok SQLite - inzeráty a správy vybrané potom už do commitu nikto nepridá a nič neostane
+    bez autora.
+    """
+    favorite_listing_ids = set(db.session.scalars(
+        db.delete(Favorite).where(Favorite.user_id.in_(user_ids)).returning(Favorite.listing_id)))
+
+    listing_ids = db.session.scalars(db.select(Listing.id).where(Listing.user_id.in_(user_ids))).all()
+    message_ids = db.session.scalars(db.select(Message.id).where(
+        or_(Message.sender_id.in_(user_ids), Message.receiver_id.in_(user_ids)))).all()
+    references = delete_listings(listing_ids) if listing_ids else []
+    if message_ids:
+        delete_messages(message_ids)
+
+    recount_popularity(favorite_listing_ids - set(listing_ids))
+    db.session.execute(db.delete(Conversation).where(
+        or_(Conversation.user_a_id.in_(user_ids), Conversation.user_b_id.in_(user_ids))))
+    db.session.execute(db.delete(User).where(User.id.in_(user_ids)))
+    return references
+
+
+# ==================== ÚLOHY ====================
+class Moderation:
+    """Hromadné moderovanie: operácia nad množinou ID prebieha po dávkach mimo požiadavky.
+
+    Cieľové ID sa zistia pri spustení (snímka), potom sa po MODERATION_CHUNK_SIZE spracúvajú
+    v samostatných transakciách; priebeh sa zapisuje do ModerationJob v tej istej transakcii
+    ako dávka. Súbory obrázkov sa mažú z disku po commite každej dávky.
+
+    Konfigurácia:
+        MODERATION_CHUNK_SIZE  riadkov v jednej transakcii
+        MODERATION_WORKERS     počet pracovných vlákien (0 = spracovať hneď v požiadavke)
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._executor = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.chunk_size = app.config.setdefault('MODERATION_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+        workers = app.config.setdefault('MODERATION_WORKERS', DEFAULT_WORKERS)
+        if workers:
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='moderation')
+        app.extensions['moderation'] = self
+
+    def start(self, action, description, steps, created_by=None):
+        """Zaeviduje úlohu a spustí ju; steps je zoznam (funkcia dávky, zoznam ID)"""
+        job = ModerationJob(action=action, description=description, status='running',
+                            total=sum(len(ids) for _, ids in steps), processed=0, created_by=created_by)
+        db.session.add(job)
+        db.session.commit()
+
+        if self._executor is not None:
+            self._executor.submit(self._run_in_context, job.id, steps)
+        else:
+            self._run(job.id, steps)
+        return job
+
+    def start_listings(self, action, listing_ids, created_by=None):
+        operation = delete_listings if action == 'delete' else deactivate_listings
+        verb = 'Zmazanie' if action == 'delete' else 'Skrytie'
+        return self.start(f'{action}_listings', f'{verb} inzerátov ({len(listing_ids)})',
+                          [(operation, listing_ids)], created_by)
+
+    def start_delete_messages(self, message_ids, created_by=None):
+        return self.start('delete_messages', f'Zmazanie správ ({len(message_ids)})',
+                          [(delete_messages, message_ids)], created_by)
+
+    def start_delete_user(self, user, created_by=None):
+        """Zmaže používateľa so všetkými dátami: inzeráty, správy, obľúbené a nakoniec účet"""
+        listing_ids = db.session.scalars(db.select(Listing.id).where(Listing.user_id == user.id)).all()
+        message_ids = db.session.scalars(db.select(Message.id).where(
+            or_(Message.sender_id == user.id, Message.receiver_id == user.id))).all()
+        return self.start('delete_user', f'Zmazanie používateľa "{user.username}" so všetkými dátami',
+                          [(delete_listings, listing_ids), (delete_messages, message_ids),
+                           (delete_users, [user.id])], created_by)
+
+    def fail_interrupted_jobs(self):
+        """Úlohy, ktoré ostali v stave 'running' po ukončení servera, označí ako zlyhané; vráti ich počet.
+
+        Volá sa pri štarte servera (init_db), keď ešte žiadna úloha nebeží - rozpracovanú úlohu
+        nikto nedokončí a opakované spustenie spracuje len to, čo ešte ostalo.
+        """
+        count = db.session.execute(
+            db.update(ModerationJob).where(ModerationJob.status == 'running')
+            .values(status='failed', error=INTERRUPTED_ERROR, finished_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        return count
+
+    def _run_in_context(self, job_id, steps):
+        with self.app.app_context():
+            self._run(job_id, steps)
+
+    def _run(self, job_id, steps):
+        job = db.session.get(ModerationJob, job_id)
+        try:
+            for operation, ids in steps:
+                for start in range(0, len(ids), self.chunk_size):
+                    chunk = ids[start:start + self.chunk_size]
+                    references = operation(chunk)
+                    job.processed = ModerationJob.processed + len(chunk)
+                    db.session.commit()
+                    release_files(self.app, references)
+            job.status = 'done'
+        except Exception as e:
+            db.session.rollback()
+            print(f"Chyba pri hromadnej operácii {job_id}: {e}")
+            job = db.session.get(ModerationJob, job_id)
+            job.status = 'failed'
+            job.error = str(e)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        cache.invalidate(PAGE_CACHE)
+
+    def recent_jobs(self):
+        return ModerationJob.query.order_by(ModerationJob.created_at.desc(), ModerationJob.id.desc()) \
+            .limit(RECENT_JOBS).all()
+
+
+moderation = Moderation()
@@ -0,0 +1,163 @@
+import base64
+import binascii
+import threading
+import time
+from datetime import datetime
+from flask import jsonify, request
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import or_, and_
+
+# ==================== KONŠTANTY ====================
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 100
+COUNT_CACHE_TTL = 60  # sekúnd
+COUNT_CACHE_MAX_KEYS = 1000
+
+_count_cache = {}
+_count_cache_lock = threading.Lock()
+
+
+# ==================== KURZORY ====================
+def encode_cursor(created_at, id):
+    """Kurzor (created_at, id) zakódovaný do URL-safe reťazca"""
+    raw = f'{created_at.isoformat()}|{id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Vráti (created_at, id) alebo None pri chýbajúcom/neplatnom kurzore"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, id = base64.urlsafe_b64decode(padded).decode().split('|')
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+
+class KeysetPage:
+    """Jedna stránka výsledkov stránkovaných podľa (created_at, id), od najnovších"""
+
+    def __init__(self, items, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+
+def keyset_paginate(query, created_column, id_column, after=None, before=None, per_page=DEFAULT_PER_PAGE):
+    """Stránkovanie bez OFFSET: WHERE (created_at, id) < kurzor ORDER BY created_at DESC, id DESC LIMIT n.
+
+    after  - kurzor poslednej položky predchádzajúcej stránky (ďalšia, staršia stránka)
+    before - kurzor prvej položky nasledujúcej stránky (predchádzajúca, novšia stránka)
+    Položky musia mať atribúty created_at a id zodpovedajúce stĺpcom created_column a id_column.
+    """
+    after, before = decode_cursor(after), decode_cursor(before)
+    query = query.order_by(None)
+
+    if before:
+        created_at, id = before
+        items = query.filter(or_(created_column > created_at,
+                                 and_(created_column == created_at, id_column > id))) \
+            .order_by(created_column.asc(), id_column.asc()) \
+            .limit(per_page + 1) \
+            .all()
+        has_prev = len(items) > per_page
+        items = list(reversed(items[:per_page]))
+        has_next = True
+    else:
+        if after:
+            created_at, id = after
+            query = query.filter(or_(created_column < created_at,
+                                     and_(created_column == created_at, id_column < id)))
+        items = query.order_by(created_column.desc(), id_column.desc()) \
+            .limit(per_page + 1) \
+            .all()
+        has_next = len(items) > per_page
+        items = items[:per_page]
+        has_prev = after is not None
+
+    if not items:
+        return KeysetPage(items)
+
+    first, last = items[0], items[-1]
+    return KeysetPage(
+        items,
+        next_cursor=encode_cursor(last.created_at, last.id) if has_next else None,
+        prev_cursor=encode_cursor(first.created_at, first.id) if has_prev else None
+    )
+
+
+class ListPagination(Pagination):
+    """Stránkovanie zoznamu v pamäti (napr. strom kategórií z registra) s rovnakým rozhraním
+    ako db.paginate() - šablóny môžu použiť page, pages, iter_pages() atď.
+
+    ListPagination(items=zoznam, page=..., per_page=...); bez page/per_page sa čítajú z ?page=&per_page=
+    """
+
+    def _query_items(self):
+        items = self._query_args['items']
+        return items[self._query_offset:self._query_offset + self.per_page]
+
+    def _query_count(self):
+        return len(self._query_args['items'])
+
+
+# ==================== POČTY ====================
+def cached_count(key, query, ttl=COUNT_CACHE_TTL):
+    """Celkový počet výsledkov, prepočítaný najviac raz za `ttl` sekúnd pre daný kľúč filtra"""
+    now = time.monotonic()
+    with _count_cache_lock:
+        cached = _count_cache.get(key)
+        if cached and cached[0] > now:
+            return cached[1]
+
+    count = query.order_by(None).count()
+
+    with _count_cache_lock:
+        if len(_count_cache) >= COUNT_CACHE_MAX_KEYS:
+            _count_cache.clear()
+        _count_cache[key] = (now + ttl, count)
+    return count
+
+
+# ==================== JSON API ====================
+def page_args():
+    """Parametre stránkovania z query stringu: ?after=...&before=...&limit=..."""
+    per_page = request.args.get('limit', DEFAULT_PER_PAGE, type=int)
+    return {
+        'after': request.args.get('after'),
+        'before': request.args.get('before'),
+        'per_page': max(1, min(per_page, MAX_PER_PAGE))
+    }
+
+
+def paginated_json(data, page, total=None):
+    """JSON pole položiek; kurzory a voliteľný celkový počet idú v hlavičkách odpovede"""
+    response = jsonify(data)
+    if page.next_cursor:
+        response.headers['X-Next-Cursor'] = page.next_cursor
+    if page.prev_cursor:
+        response.headers['X-Prev-Cursor'] = page.prev_cursor
+    if total is not None:
+        response.headers['X-Total-Count'] = str(total)
+    return response
+
+
+def paged_json(data, pagination):
+    """JSON pole položiek jednej stránky; číslo stránky a počty idú v hlavičkách odpovede"""
+    response = jsonify(data)
+    response.headers['X-Page'] = str(pagination.page)
+    response.headers['X-Per-Page'] = str(pagination.per_page)
+    if pagination.total is not None:
+        response.headers['X-Total-Count'] = str(pagination.total)
+        response.headers['X-Total-Pages'] = str(pagination.pages)
+    return response
@@ -0,0 +1,198 @@
+import csv
+import math
+import os
+import re
+import threading
+import unicodedata
+from extensions import db
+from models import Listing, Place
+
+# ==================== KONŠTANTY ====================
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'gazetteer.csv')
+GRID_SIZE = 0.1  # stupňov - bunka mriežky má na Slovensku asi 11 x 7 km
+GRID_COLUMNS = int(360 / GRID_SIZE)
+KM_PER_DEGREE = 111.32  # km na stupeň zemepisnej šírky
+EARTH_RADIUS_KM = 6371.0
+RADIUS_CHOICES = (5, 10, 25, 50, 100)  # ponuka vo filtri /listings
+MAX_RADIUS_KM = 100
+LOCATION_CACHE_MAX_KEYS = 1000
+
+
+# ==================== NORMALIZÁCIA ====================
+def normalize_location(text):
+    """'Bratislava - Ružinov' -> 'bratislava ruzinov' (bez diakritiky, veľkých písmen, čísel a interpunkcie)"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    letters = ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return ' '.join(re.findall(r'[a-z]+', letters))
+
+
+def _candidates(text):
+    """Kandidáti na zhodu: celý text, potom jeho časti oddelené pomlčkou, čiarkou a pod."""
+    candidates = [normalize_location(text)] + [normalize_location(part) for part in re.split(r'[-–,/;()]', text or '')]
+    unique = []
+    for candidate in candidates:
+        if candidate and candidate not in unique:
+            unique.append(candidate)
+    return unique
+
+
+def resolve_place(text):
+    """Obec z gazetteera pre voľný text lokality alebo None (jeden dotaz cez index normalized_name).
+
+    'Bratislava - Ružinov' nájde mestskú časť, 'Ružinov, Bratislava' aspoň mesto;
+    pri rovnakom názve vyhrá skôr načítaná obec.
+    """
+    candidates = _candidates(text)
+    if not candidates:
+        return None
+
+    places = {}
+    for place in Place.query.filter(Place.normalized_name.in_(candidates)).order_by(Place.id):
+        places.setdefault(place.normalized_name, place)
+    return next((places[candidate] for candidate in candidates if candidate in places), None)
+
+
+def assign_place(listing):
+    """Priradí inzerátu obec podľa textu lokality (volá sa pri uložení inzerátu)"""
+    place = resolve_place(listing.location)
+    listing.place_id = place.id if place is not None else None
+
+
+# ==================== MRIEŽKA A VZDIALENOSŤ ====================
+def grid_cell(latitude, longitude):
+    row = math.floor((latitude + 90) / GRID_SIZE)
+    column = math.floor((longitude + 180) / GRID_SIZE)
+    return row * GRID_COLUMNS + column
+
+
+def distance_km(latitude1, longitude1, latitude2, longitude2):
+    """Vzdialenosť po povrchu Zeme (haversine)"""
+    phi1, phi2 = math.radians(latitude1), math.radians(latitude2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(longitude2 - longitude1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _cells_around(latitude, longitude, radius_km):
+    """Bunky mriežky, ktoré pokrývajú štvorec okolo bodu so stranou 2 * radius_km"""
+    latitude_delta = radius_km / KM_PER_DEGREE
+    longitude_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    first_row = math.floor((latitude - latitude_delta + 90) / GRID_SIZE)
+    last_row = math.floor((latitude + latitude_delta + 90) / GRID_SIZE)
+    first_column = math.floor((longitude - longitude_delta + 180) / GRID_SIZE)
+    last_column = math.floor((longitude + longitude_delta + 180) / GRID_SIZE)
+    return [row * GRID_COLUMNS + column
+            for row in range(first_row, last_row + 1)
+            for column in range(first_column, last_column + 1)]
+
+
+def places_within(place, radius_km):
+    """ID obcí do radius_km od obce: kandidáti z buniek mriežky (index), presne sa dofiltrujú haversine"""
+    candidates = Place.query.filter(Place.grid_cell.in_(_cells_around(place.latitude, place.longitude, radius_km)))
+    return {candidate.id for candidate in candidates
+            if distance_km(place.latitude, place.longitude, candidate.latitude, candidate.longitude) <= radius_km}
+
+
+# ==================== FILTER INZERÁTOV ====================
+_location_cache = {}
+_location_cache_lock = threading.Lock()
+
+
+def location_place_ids(text, radius_km=None):
+    """ID obcí pre filter ?location=&radius= alebo None, ak text nezodpovedá žiadnej obci.
+
+    Bez okruhu obec a jej mestské časti ('Bratislava' nájde aj 'Bratislava - Petržalka'),
+    s okruhom aj všetky obce do radius_km. Výsledok sa drží v pamäti procesu (gazetteer sa mení zriedka).
+    """
+    key = (normalize_location(text), radius_km)
+    with _location_cache_lock:
+        if key in _location_cache:
+            return _location_cache[key]
+
+    place = resolve_place(text)
+    place_ids = None
+    if place is not None:
+        place_ids = {place.id} | {part.id for part in place.parts}
+        if radius_km:
+            place_ids |= places_within(place, radius_km)
+        place_ids = frozenset(place_ids)
+
+    with _location_cache_lock:
+        if len(_location_cache) >= LOCATION_CACHE_MAX_KEYS:
+            _location_cache.clear()
+        _location_cache[key] = place_ids
+    return place_ids
+
+
+def location_condition(text, radius_km=None):
+    """Podmienka pre filter lokality: podľa obce cez index place_id, inak pôvodné hľadanie v texte.
+
+    Bez okruhu sa k rozpoznanej obci pridajú aj inzeráty s nerozpoznanou lokalitou (place_id NULL),
+    ktorých text hľadaný výraz obsahuje - napr. 'Pezinok okolie' pri ?location=Pezinok.
+    """
+    place_ids = location_place_ids(text, radius_km)
+    text_match = Listing.location.ilike(f'%{text}%')
+    if place_ids is None:
+        return text_match
+    if radius_km:
+        return Listing.place_id.in_(place_ids)
+    return db.or_(Listing.place_id.in_(place_ids), db.and_(Listing.place_id.is_(None), text_match))
+
+
+# ==================== GAZETTEER ====================
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Načíta obce zo CSV (name, district, region, latitude, longitude, parent) a vráti ich počet.
+
+    Existujúce obce (rovnaký názov a okres) sa aktualizujú, takže ID odkazované z inzerátov ostávajú;
+    obce, ktoré zo súboru zmizli, sa nemažú.
+    """
+    with open(path, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    existing = {(place.normalized_name, place.district): place for place in Place.query.all()}
+    by_name = {}
+    loaded = []
+    for row in rows:
+        normalized_name = normalize_location(row['name'])
+        place = existing.get((normalized_name, row['district']))
+        if place is None:
+            place = Place(normalized_name=normalized_name, district=row['district'])
+            db.session.add(place)
+        place.name = row['name']
+        place.region = row['region']
+        place.latitude = float(row['latitude'])
+        place.longitude = float(row['longitude'])
+        place.grid_cell = grid_cell(place.latitude, place.longitude)
+        by_name.setdefault(normalized_name, place)
+        loaded.append((row, place))
+    db.session.flush()
+
+    for row, place in loaded:
+        parent = by_name.get(normalize_location(row['parent'])) if row.get('parent') else None
+        place.parent_id = parent.id if parent is not None else None
+    db.session.commit()
+
+    with _location_cache_lock:
+        _location_cache.clear()
+    return len(rows)
+
+
+def resolve_listing_places():
+    """Priradí obce všetkým inzerátom (po načítaní gazetteera); každý rozdielny text sa rozpozná raz.
+
+    Vráti (počet inzerátov s obcou, počet všetkých inzerátov).
+    """
+    rows = db.session.execute(db.select(Listing.id, Listing.location)).all()
+    resolved = {}
+    updates = []
+    for listing_id, location in rows:
+        if location not in resolved:
+            place = resolve_place(location) if location else None
+            resolved[location] = place.id if place is not None else None
+        updates.append({'id': listing_id, 'place_id': resolved[location]})
+
+    if updates:
+        db.session.execute(db.update(Listing), updates)
+    db.session.commit()
+    return sum(1 for update in updates if update['place_id'] is not None), len(updates)
@@ -0,0 +1,141 @@
+import atexit
+import os
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from sqlalchemy import func, bindparam
+from extensions import db
+from models import Listing, Favorite, Message
+
+# ==================== KONŠTANTY ====================
+DEFAULT_FLUSH_INTERVAL = 30  # sekúnd medzi zápismi zobrazení vláknom na pozadí
+DEFAULT_FLUSH_SIZE = 500  # rozdielnych inzerátov v bufferi, pri ktorých sa zapíše hneď
+TOP_LISTINGS = 10  # najpopulárnejších inzerátov na admin dashboarde
+POPULAR_SORT = 'popular'  # hodnota ?sort= pre /listings
+
+
+# ==================== POČÍTADLÁ ====================
+# Počty obľúbení a správ sa menia atomickým UPDATE ... SET x = x + 1 v tej istej transakcii
+# ako samotná zmena; hromadné operácie (moderovanie) ich namiesto toho prepočítajú.
+def increment(column, listing_id, amount=1):
+    """Zvýši (alebo pri zápornom amount zníži) počítadlo inzerátu priamo v SQL; necommituje"""
+    if listing_id is None:
+        return
+    db.session.execute(db.update(Listing).where(Listing.id == listing_id).values({column: column + amount}),
+                       execution_options={'synchronize_session': False})
+
+
+def recount_popularity(listing_ids=None):
+    """Prepočíta favorite_count a message_count zo skutočných riadkov (pre zadané ID alebo všetky); necommituje"""
+    favorites = db.select(func.count(Favorite.id)).where(Favorite.listing_id == Listing.id).scalar_subquery()
+    messages = db.select(func.count(Message.id)).where(Message.listing_id == Listing.id).scalar_subquery()
+    statement = db.update(Listing).values(favorite_count=favorites, message_count=messages)
+    if listing_ids is not None:
+        statement = statement.where(Listing.id.in_(listing_ids))
+    db.session.execute(statement, execution_options={'synchronize_session': False})
+
+
+def popularity_order():
+    """Zoradenie 'najpopulárnejšie': obľúbenia, potom správy, potom zobrazenia (index ix_listing_status_popularity)"""
+    return (Listing.favorite_count.desc(), Listing.message_count.desc(), Listing.view_count.desc(),
+            Listing.id.desc())
+
+
+def top_listings(limit=TOP_LISTINGS):
+    """Najpopulárnejšie aktívne inzeráty - číta sa len začiatok indexu, bez prechodu obľúbených a správ"""
+    return Listing.query.filter_by(status='active').order_by(*popularity_order()).limit(limit).all()
+
+
+# ==================== ZOBRAZENIA ====================
+class ViewCounter:
+    """Počítadlo zobrazení inzerátov: zobrazenia sa sčítavajú v pamäti procesu a do databázy
+    sa zapíšu jedným dávkovým UPDATE (view_count = view_count + n) každých VIEW_FLUSH_INTERVAL
+    sekúnd vláknom na pozadí, alebo hneď, keď sa nazbiera VIEW_FLUSH_SIZE inzerátov.
+
+    Vlákno sa spúšťa pri prvom zobrazení v každom procese zvlášť - gunicorn workery vznikajú
+    fork-om a vlákno hlavného procesu v nich neexistuje. Zápis ide cez vlastné spojenie,
+    nezávisle od session požiadavky. Pri ukončení procesu sa zvyšok zapíše tiež; pri páde
+    procesu sa stratia najviac zobrazenia za posledný interval.
+
+    Konfigurácia:
+        VIEW_FLUSH_INTERVAL  sekúnd medzi zápismi (0 = zapisovať pri každom zobrazení)
+        VIEW_FLUSH_SIZE      rozdielnych inzerátov v bufferi, pri ktorých sa zapíše hneď
+    """
+
+    def __init__(self, app=None):
+        self.app = None
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._timer_pid = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = app.config.setdefault('VIEW_FLUSH_INTERVAL', DEFAULT_FLUSH_INTERVAL)
+        self.flush_size = app.config.setdefault('VIEW_FLUSH_SIZE', DEFAULT_FLUSH_SIZE)
+        app.extensions['view_counter'] = self
+        atexit.register(self._flush_in_context)
+
+    def record(self, listing_id):
+        self._start_timer()
+        with self._lock:
+            self._pending[listing_id] += 1
+            due = len(self._pending) >= self.flush_size or not self.flush_interval
+        if due:
+            self.flush()
+
+    def counts_views(self, f):
+        """Dekorátor pre detail inzerátu (parameter id): započíta zobrazenie aj pri odpovedi z cache stránok"""
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            response = f(*args, **kwargs)
+            self.record(kwargs['id'])
+            return response
+
+        return decorated_function
+
+    def flush(self):
+        """Zapíše nazbierané zobrazenia a vráti ich počet; pri chybe ich vráti do bufferu"""
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        if not pending:
+            return 0
+
+        table = Listing.__table__
+        statement = table.update().where(table.c.id == bindparam('listing_id')) \
+            .values(view_count=table.c.view_count + bindparam('views'))
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(statement, [{'listing_id': listing_id, 'views': views}
+                                               for listing_id, views in pending.items()])
+        except Exception as e:
+            self.app.logger.error(f"Chyba pri zápise zobrazení: {e}")
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        return sum(pending.values())
+
+    def _flush_in_context(self):
+        if self.app is not None and self._pending:
+            with self.app.app_context():
+                self.flush()
+
+    def _start_timer(self):
+        """Spustí vlákno pravidelného zápisu, ak v tomto procese ešte nebeží"""
+        if not self.flush_interval or self._timer_pid == os.getpid():
+            return
+        with self._lock:
+            if self._timer_pid == os.getpid():
+                return
+            self._timer_pid = os.getpid()
+        threading.Thread(target=self._flush_periodically, name='view-counter', daemon=True).start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self._flush_in_context()
+
+
+view_counter = ViewCounter()
@@ -0,0 +1,204 @@
+import math
+import os
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from heapq import nlargest
+from extensions import db, cache
+from cache import PAGE_CACHE
+from models import Listing, SimilarListing
+from categories import category_registry
+
+# ==================== KONŠTANTY ====================
+TOP_N = 8  # uložených podobných inzerátov na inzerát (detail zobrazí 4, zvyšok je rezerva za predané)
+STEM_LENGTH = 6  # slová sa skracujú na prvých 6 písmen ('bicykel', 'bicykla' -> 'bicykl')
+TITLE_WEIGHT = 3  # slovo v názve váži ako 3 výskyty v popise
+MAX_DF_RATIO = 0.1  # slová vo viac ako 10 % inzerátov nevyberajú kandidátov (len sa započítajú do podobnosti)
+MIN_DF_CUTOFF = 50  # ... no pri malom počte inzerátov sa vyberajú vždy
+RERANK_FACTOR = 4  # pre koľkonásobok top N sa počíta presná podobnosť
+CHUNK_SIZE = 500  # inzerátov na jednu úlohu pre pracovný proces
+INSERT_BATCH_SIZE = 5000
+
+# Váhy zložiek skóre (spolu 1.0)
+TEXT_WEIGHT = 0.6
+CATEGORY_WEIGHT = 0.25  # rovnaká kategória 1, rovnaká hlavná kategória 0.5
+PRICE_WEIGHT = 0.15  # 1 pri rovnakej cene, 0 pri PRICE_SPAN-násobnom rozdiele (porovnávajú sa logaritmy cien)
+PRICE_SPAN = 4.0
+
+STOP_WORDS = {
+    'a', 'aj', 'ako', 'ale', 'alebo', 'bez', 'by', 'do', 'je', 'k', 'ku', 'len', 'ma', 'mi', 'na', 'nie', 'o',
+    'od', 'po', 'pre', 'pri', 's', 'sa', 'si', 'so', 'som', 'su', 'ta', 'te', 'to', 'v', 'vo', 'z', 'za', 'zo',
+    'cena', 'predam', 'predavam', 'ponukam', 'stav', 'velmi', 'eur',
+}
+
+
+# ==================== TEXT ====================
+def _terms(text):
+    """Slová bez diakritiky a stop slov, skrátené na STEM_LENGTH (jednoduchý stemming pre slovenčinu)"""
+    decomposed = unicodedata.normalize('NFKD', text or '')
+    letters = ''.join(c for c in decomposed if not unicodedata.combining(c)).lower()
+    return [word[:STEM_LENGTH] for word in re.findall(r'[a-z0-9]+', letters)
+            if len(word) > 1 and not word.isdigit() and word not in STOP_WORDS]
+
+
+def build_model(rows):
+    """TF-IDF vektory (normované na dĺžku 1) a invertovaný index pre riadky (id, title, description, category, price).
+
+    Vráti slovník, ktorý sa pošle pracovným procesom (musí sa dať pickle-ovať).
+    """
+    counts = {}
+    document_frequency = Counter()
+    meta = {}
+    for listing_id, title, description, category_id, price in rows:
+        terms = Counter(_terms(description))
+        for term in _terms(title):
+            terms[term] += TITLE_WEIGHT
+        counts[listing_id] = terms
+        document_frequency.update(terms.keys())
+        node = category_registry.get(category_id)
+        root_id = node.ancestor_ids[0] if node is not None and node.ancestor_ids else category_id
+        meta[listing_id] = (category_id, root_id, math.log(max(price or 0, 1.0)))
+
+    total = len(counts)
+    idf = {term: math.log(total / df) + 1 for term, df in document_frequency.items()}
+    cutoff = max(MAX_DF_RATIO * total, MIN_DF_CUTOFF)
+
+    vectors = {}
+    postings = defaultdict(list)
+    for listing_id, terms in counts.items():
+        vector = {term: (1 + math.log(tf)) * idf[term] for term, tf in terms.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values())) or 1.0
+        vector = {term: weight / norm for term, weight in vector.items()}
+        vectors[listing_id] = vector
+        for term, weight in vector.items():
+            if document_frequency[term] <= cutoff:
+                postings[term].append((listing_id, weight))
+
+    return {'vectors': vectors, 'postings': dict(postings), 'meta': meta}
+
+
+# ==================== SKÓRE ====================
+def _category_score(a, b):
+    if a[0] == b[0]:
+        return 1.0
+    return 0.5 if a[1] == b[1] else 0.0
+
+
+def _price_score(a, b):
+    return max(0.0, 1 - abs(a[2] - b[2]) / math.log(PRICE_SPAN))
+
+
+def _score(text, a, b):
+    return TEXT_WEIGHT * text + CATEGORY_WEIGHT * _category_score(a, b) + PRICE_WEIGHT * _price_score(a, b)
+
+
+def similar_for(model, listing_id, top_n=TOP_N):
+    """Top N podobných inzerátov ako [(skóre, id)].
+
+    Kandidáti zdieľajú aspoň jedno menej časté slovo; predbežné skóre sa sčíta z invertovaného
+    indexu (bez častých slov) a pre RERANK_FACTOR * top_n najlepších sa dopočíta presný kosínus.
+    """
+    vectors, postings, meta = model['vectors'], model['postings'], model['meta']
+    vector = vectors[listing_id]
+
+    partial = defaultdict(float)
+    for term, weight in vector.items():
+        for candidate_id, candidate_weight in postings.get(term, ()):
+            partial[candidate_id] += weight * candidate_weight
+    partial.pop(listing_id, None)
+
+    # To isté ako _score(), ale bez volaní funkcií - tento cyklus beží pre každého kandidáta
+    own = meta[listing_id]
+    own_category, own_root, own_price = own
+    price_slope = PRICE_WEIGHT / math.log(PRICE_SPAN)
+    preranked = []
+    for candidate_id, text in partial.items():
+        category_id, root_id, price = meta[candidate_id]
+        score = TEXT_WEIGHT * text + max(0.0, PRICE_WEIGHT - abs(price - own_price) * price_slope)
+        if category_id == own_category:
+            score += CATEGORY_WEIGHT
+        elif root_id == own_root:
+            score += CATEGORY_WEIGHT / 2
+        preranked.append((score, candidate_id))
+
+    scored = []
+    for _, candidate_id in nlargest(top_n * RERANK_FACTOR, preranked):
+        other = vectors[candidate_id]
+        text = sum(weight * other.get(term, 0.0) for term, weight in vector.items())
+        scored.append((_score(text, own, meta[candidate_id]), candidate_id))
+    return nlargest(top_n, scored)
+
+
+# ==================== PARALELNÝ VÝPOČET ====================
+_worker_model = None
+
+
+def _init_worker(model):
+    global _worker_model
+    _worker_model = model
+
+
+def _similar_chunk(args):
+    listing_ids, top_n = args
+    return [(listing_id, similar_for(_worker_model, listing_id, top_n)) for listing_id in listing_ids]
+
+
+def rebuild_recommendations(workers=None, top_n=TOP_N):
+    """Prepočíta tabuľku similar_listing pre všetky aktívne inzeráty; vráti počet inzerátov.
+
+    Model sa zostaví raz, porovnávanie beží v `workers` procesoch (predvolene počet jadier CPU,
+    1 = v tomto procese). Stará tabuľka sa nahradí v jednej transakcii.
+    """
+    rows = db.session.execute(
+        db.select(Listing.id, Listing.title, Listing.description, Listing.category_id, Listing.price)
+        .where(Listing.status == 'active')
+    ).all()
+    model = build_model(rows)
+    listing_ids = sorted(model['vectors'])
+    chunks = [(listing_ids[start:start + CHUNK_SIZE], top_n) for start in range(0, len(listing_ids), CHUNK_SIZE)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        _init_worker(model)
+        results = [_similar_chunk(chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,)) as executor:
+            results = list(executor.map(_similar_chunk, chunks))
+
+    db.session.execute(db.delete(SimilarListing))
+    batch = []
+    for chunk in results:
+        for listing_id, similar in chunk:
+            batch.extend({'listing_id': listing_id, 'rank': rank, 'similar_id': similar_id, 'score': score}
+                         for rank, (score, similar_id) in enumerate(similar))
+            if len(batch) >= INSERT_BATCH_SIZE:
+                db.session.execute(db.insert(SimilarListing), batch)
+                batch = []
+    if batch:
+        db.session.execute(db.insert(SimilarListing), batch)
+    db.session.commit()
+    cache.invalidate(PAGE_CACHE)
+    return len(listing_ids)
+
+
+def forget_listings(listing_ids):
+    """Odstráni odporúčania zmazaných inzerátov (v oboch smeroch); necommituje"""
+    db.session.execute(db.delete(SimilarListing).where(
+        db.or_(SimilarListing.listing_id.in_(listing_ids), SimilarListing.similar_id.in_(listing_ids))))
+
+
+# ==================== ČÍTANIE ====================
+def similar_listings(query, listing, limit=4):
+    """Podobné aktívne inzeráty pre detail: predpočítané (jeden dotaz cez primárny kľúč),
+    pre inzeráty, ktoré ešte nie sú v tabuľke (nové od posledného prepočtu), najnovšie v kategórii"""
+    similar = query.join(SimilarListing, SimilarListing.similar_id == Listing.id) \
+        .filter(SimilarListing.listing_id == listing.id, Listing.status == 'active') \
+        .order_by(SimilarListing.rank).limit(limit).all()
+    if similar:
+        return similar
+
+    return query.filter(Listing.category_id == listing.category_id,
+                        Listing.id != listing.id,
+                        Listing.status == 'active') \
+        .order_by(Listing.created_at.desc()).limit(limit).all()
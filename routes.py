@@ -1,17 +1,34 @@
-from flask import render_template, redirect, url_for, flash, request, jsonify
+from flask import render_template, redirect, url_for, flash, request, jsonify, Response
 from flask_login import login_user, login_required, logout_user, current_user
-from extensions import db
-from sqlalchemy import or_, desc, and_
+from extensions import db, cache
+from cache import PAGE_CACHE
+from database import read_replica
+from metrics import metrics
+from sqlalchemy import or_, and_, func
+from sqlalchemy.orm import selectinload, joinedload, with_expression
 from models import User, Category, Listing, Image, Message, Favorite
 from forms import RegistrationForm, LoginForm, ListingForm, ChangePasswordForm
+from places import assign_place, RADIUS_CHOICES
+from recommendations import similar_listings
+from popularity import view_counter, increment, popularity_order, top_listings, POPULAR_SORT
+from favorites import favorite_ids, favorite_statuses, toggle_favorite as toggle_user_favorite, MAX_STATUS_IDS
+from facets import listing_filters, apply_listing_filters, count_query, listing_facets
+from categories import category_registry
+from admin_tables import filter_listings, filter_messages, selected_ids, LISTING_STATUSES
+from moderation import moderation, delete_listings
+from pagination import keyset_paginate, cached_count, page_args, paginated_json, paged_json, ListPagination
+from messaging import (record_message, mark_message_read, mark_conversation_read, refresh_conversation,
+                       conversation_summaries, unread_messages_count, notify_new_message, notify_unread_count)
+from events import event_broker, sse_stream, LONG_POLL_TIMEOUT, STREAM_RETRY_AFTER
+from images import image_pipeline
+from storage import store_upload, finish_uploads, file_references, release_files
+from versions import versioned, bump, bump_listing_watchers, LISTINGS, FAVORITES, MESSAGES
 from werkzeug.security import check_password_hash, generate_password_hash
-from werkzeug.utils import secure_filename
-from datetime import datetime
-import os
+from werkzeug.wsgi import ClosingIterator
 
 # ==================== KONŠTANTY ====================
-UPLOAD_FOLDER = 'static/uploads'
 ALLOWED_EXTENSIONS = {'jpg', 'jpeg', 'png', 'gif'}
+ADMIN_PER_PAGE = 50  # riadkov na stránku v admin tabuľkách
 
 
 # ==================== POMOCNÉ FUNKCIE ====================
@@ -19,6 +36,47 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def listing_cards(query):
+    """Načíta k inzerátom naraz aj obrázky, kategóriu a autora (pre karty inzerátov, bez N+1 dotazov)"""
+    return query.options(
+        selectinload(Listing.images),
+        joinedload(Listing.category),
+        joinedload(Listing.author)
+    )
+
+
+def with_user_counts(query):
+    """Doplní k používateľom počty inzerátov a správ v tom istom SELECT-e (korelované poddotazy cez indexy).
+
+    Nahrádza user.listings|length a user.sent_messages|length v šablóne, ktoré načítavali celé kolekcie.
+    populate_existing: aj už načítaný používateľ (current_user) dostane počty.
+    """
+    def count(model, column):
+        return db.select(func.count()).select_from(model).where(column == User.id).scalar_subquery()
+
+    return query.populate_existing().options(
+        with_expression(User.listing_count, count(Listing, Listing.user_id)),
+        with_expression(User.message_count,
+                        count(Message, Message.sender_id) + count(Message, Message.receiver_id))
+    )
+
+
+def admin_page(name, query, filters):
+    """Jedna stránka admin tabuľky (?page=); celkový počet pre dané filtre sa drží v cache počtov"""
+    pagination = query.paginate(page=request.args.get('page', 1, type=int), per_page=ADMIN_PER_PAGE,
+                                 error_out=False, count=False)
+    pagination.total = cached_count((name,) + tuple(sorted(filters.items())), query)
+    return pagination
+
+
+def _streams_exhausted():
+    """503 pre SSE/long-poll, keď proces nemá voľné miesto - klient sa obnovuje intervalom"""
+    response = jsonify({'error': 'Príliš veľa otvorených spojení, skúste neskôr'})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(STREAM_RETRY_AFTER)
+    return response
+
+
 def admin_required(f):
     """Dekorátor pre admin-only routes"""
     from functools import wraps
@@ -125,7 +183,7 @@ def register_auth_routes(app):
     @app.route('/dashboard')
     @login_required
     def dashboard():
-        return render_template('dashboard.html')
+        return render_template('dashboard.html', favorite_count=len(favorite_ids()))
 
     @app.route('/api/change-password', methods=['POST'])
     @login_required
@@ -159,9 +217,11 @@ def register_listing_routes(app):
     """Routes pre správu inzerátov"""
 
     @app.route('/')
+    @cache.cached_page(PAGE_CACHE)
+    @read_replica
     def home():
-        categories = Category.query.all()
-        latest_listings = Listing.query.filter_by(status='active') \
+        categories = category_registry.all()
+        latest_listings = listing_cards(Listing.query).filter_by(status='active') \
             .order_by(Listing.created_at.desc()) \
             .limit(6) \
             .all()
@@ -172,7 +232,7 @@ def register_listing_routes(app):
     @login_required
     def new_listing():
         form = ListingForm()
-        form.category_id.choices = [(c.id, c.name) for c in Category.query.all()]
+        form.category_id.choices = category_registry.choices()
 
         if form.validate_on_submit():
             listing = Listing(
@@ -183,29 +243,31 @@ def register_listing_routes(app):
                 user_id=current_user.id,
                 category_id=form.category_id.data
             )
+            assign_place(listing)
 
             db.session.add(listing)
+            bump(LISTINGS, current_user.id)
             db.session.commit()
 
+            new_images = []
             if form.images.data:
                 for file in form.images.data:
                     if file and allowed_file(file.filename):
-                        filename = secure_filename(file.filename)
-                        unique_filename = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{filename}"
-                        file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
-
-                        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-                        file.save(file_path)
-
                         image = Image(
-                            filename=unique_filename,
+                            filename=store_upload(app, file),
                             listing_id=listing.id,
                             is_primary=False
                         )
                         db.session.add(image)
+                        new_images.append(image)
 
+                bump(LISTINGS, current_user.id)
+                db.session.flush()
+                finish_uploads(app)
                 db.session.commit()
 
+            image_pipeline.enqueue([image.id for image in new_images])
+            cache.invalidate(PAGE_CACHE)
             flash('Inzerát bol úspešne pridaný!', 'success')
             return redirect(url_for('dashboard'))
 
@@ -213,14 +275,17 @@ def register_listing_routes(app):
 
     @app.route('/api/my-listings')
     @login_required
+    @versioned(LISTINGS)
     def api_my_listings():
-        listings = Listing.query.filter_by(user_id=current_user.id).order_by(Listing.created_at.desc()).all()
+        query = listing_cards(Listing.query).filter_by(user_id=current_user.id)
+        page = keyset_paginate(query, Listing.created_at, Listing.id, **page_args())
+        total = query.count() if request.args.get('with_total') else None
 
         listings_data = []
-        for listing in listings:
+        for listing in page.items:
             image_url = None
             if listing.images and len(listing.images) > 0:
-                image_url = url_for('static', filename='uploads/' + listing.images[0].filename)
+                image_url = url_for('static', filename='uploads/' + listing.images[0].rendition_path('card'))
 
             listings_data.append({
                 'id': listing.id,
@@ -235,28 +300,21 @@ def register_listing_routes(app):
                 'has_images': len(listing.images) > 0
             })
 
-        return jsonify(listings_data)
+        return paginated_json(listings_data, page, total)
 
     @app.route('/listings/<int:id>')
+    @view_counter.counts_views
+    @cache.cached_page(PAGE_CACHE)
+    @read_replica
     def listing_detail(id):
-        listing = Listing.query.get_or_404(id)
+        listing = listing_cards(Listing.query).filter_by(id=id).first_or_404()
 
-        similar_listings = Listing.query \
-            .filter(Listing.category_id == listing.category_id,
-                    Listing.id != listing.id,
-                    Listing.status == 'active') \
-            .order_by(Listing.created_at.desc()) \
-            .limit(4) \
-            .all()
-
-        current_user_favorites = []
-        if current_user.is_authenticated:
-            current_user_favorites = [f.listing_id for f in current_user.favorites]
+        similar = similar_listings(listing_cards(Listing.query), listing)
 
         return render_template('listing_detail.html',
                                listing=listing,
-                               similar_listings=similar_listings,
-                               current_user_favorites=current_user_favorites)
+                               similar_listings=similar,
+                               current_user_favorites=favorite_ids())
 
     @app.route('/listings/<int:id>/edit', methods=['GET', 'POST'])
     @login_required
@@ -268,7 +326,7 @@ def register_listing_routes(app):
             return redirect(url_for('dashboard'))
 
         form = ListingForm()
-        form.category_id.choices = [(c.id, c.name) for c in Category.query.all()]
+        form.category_id.choices = category_registry.choices()
 
         if request.method == 'GET':
             form.title.data = listing.title
@@ -283,74 +341,101 @@ def register_listing_routes(app):
             listing.price = form.price.data
             listing.location = form.location.data
             listing.category_id = form.category_id.data
+            assign_place(listing)
 
+            new_images = []
             if form.images.data:
                 for file in form.images.data:
                     if hasattr(file, 'filename') and file.filename and allowed_file(file.filename):
-                        filename = secure_filename(file.filename)
-                        unique_filename = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{filename}"
-                        file_path = os.path.join(UPLOAD_FOLDER, unique_filename)
-
-                        os.makedirs(UPLOAD_FOLDER, exist_ok=True)
-                        file.save(file_path)
-
                         image = Image(
-                            filename=unique_filename,
+                            filename=store_upload(app, file),
                             listing_id=listing.id,
                             is_primary=False
                         )
                         db.session.add(image)
+                        new_images.append(image)
 
+            bump(LISTINGS, current_user.id)
+            bump_listing_watchers(listing.id)
+            db.session.flush()
+            finish_uploads(app)
             db.session.commit()
+            image_pipeline.enqueue([image.id for image in new_images])
+            cache.invalidate(PAGE_CACHE)
             flash('Inzerát bol úspešne upravený!', 'success')
             return redirect(url_for('dashboard'))
 
         return render_template('edit_listing.html', form=form, listing=listing)
 
     @app.route('/listings')
+    @read_replica
     def listings():
-        search_query = request.args.get('q', '').strip()
-        category_id = request.args.get('category', type=int)
-        min_price = request.args.get('min_price', type=float)
-        max_price = request.args.get('max_price', type=float)
-        location_query = request.args.get('location', '').strip()
-
-        query = Listing.query.filter_by(status='active')
-
-        if search_query:
-            like_pattern = f'%{search_query}%'
-            query = query.filter(
-                or_(
-                    Listing.title.ilike(like_pattern),
-                    Listing.description.ilike(like_pattern)
-                )
-            )
+        filters = listing_filters(request.args)
+        query = apply_listing_filters(listing_cards(Listing.query).filter_by(status='active'), filters)
 
-        if category_id:
-            query = query.filter_by(category_id=category_id)
-
-        if min_price is not None:
-            query = query.filter(Listing.price >= min_price)
-        if max_price is not None:
-            query = query.filter(Listing.price <= max_price)
-
-        if location_query:
-            query = query.filter(Listing.location.ilike(f'%{location_query}%'))
-
-        query = query.order_by(Listing.created_at.desc())
-
-        page = request.args.get('page', 1, type=int)
         per_page = 12
-        paginated_listings = query.paginate(page=page, per_page=per_page, error_out=False)
-
-        categories = Category.query.all()
+        filter_args = {key: value for key, value in request.args.items() if key not in ('page', 'after', 'before')}
+        categories = category_registry.all()
+        facets = listing_facets(filters)
+        total_listings = cached_count(('listings',) + tuple(sorted(filters.items())), count_query(filters))
+
+        sort = request.args.get('sort')
+        if 'q' in filters or sort == POPULAR_SORT:
+            # Výsledky vyhľadávania sú zoradené podľa relevancie, najpopulárnejšie podľa počítadiel
+            # (nie podľa created_at) -> klasické stránkovanie
+            if sort == POPULAR_SORT:
+                query = query.order_by(None).order_by(*popularity_order())
+            else:
+                query = query.order_by(Listing.created_at.desc())
+            page = request.args.get('page', 1, type=int)
+            paginated_listings = query.paginate(page=page, per_page=per_page, error_out=False, count=False)
+            paginated_listings.total = total_listings
+
+            return render_template('listings.html',
+                                   listings=paginated_listings.items,
+                                   pagination=paginated_listings,
+                                   categories=categories,
+                                   selected_category=filters.get('category'),
+                                   filter_args=filter_args,
+                                   facets=facets,
+                                   facet_filters=filters,
+                                   radius_choices=RADIUS_CHOICES,
+                                   current_user_favorites=favorite_ids(),
+                                   sort=sort,
+                                   total_listings=total_listings)
+
+        listings_page = keyset_paginate(query, Listing.created_at, Listing.id,
+                                        after=request.args.get('after'),
+                                        before=request.args.get('before'),
+                                        per_page=per_page)
 
         return render_template('listings.html',
-                               listings=paginated_listings.items,
-                               pagination=paginated_listings,
+                               listings=listings_page.items,
+                               keyset_page=listings_page,
                                categories=categories,
-                               selected_category=category_id,
-                               total_listings=query.count())
+                               selected_category=filters.get('category'),
+                               filter_args=filter_args,
+                               facets=facets,
+                               facet_filters=filters,
+                               radius_choices=RADIUS_CHOICES,
+                               current_user_favorites=favorite_ids(),
+                               sort=sort,
+                               total_listings=total_listings)
+
+    @app.route('/api/listings/facets')
+    @read_replica
+    def api_listing_facets():
+        """Počty fasiet pre rovnaké filtre ako /listings (?q=&category=&min_price=&max_price=&location=&radius=)"""
+        filters = listing_filters(request.args)
+        facets = listing_facets(filters)
+        return jsonify({
+            'filters': filters,
+            'categories': [{'id': node.id, 'name': node.name, 'parent_id': node.parent_id,
+                            'count': facets['categories'].get(node.id, 0)}
+                           for node in category_registry.all()],
+            'prices': facets['prices'],
+            'locations': facets['locations']
+        })
 
     @app.route('/listings/<int:id>/delete', methods=['POST'])
     @login_required
@@ -360,8 +445,10 @@ def register_listing_routes(app):
         if listing.user_id != current_user.id:
             return jsonify({'success': False, 'message': 'Nemáte oprávnenie'}), 403
 
-        db.session.delete(listing)
+        references = delete_listings([listing.id])
         db.session.commit()
+        release_files(app, references)
+        cache.invalidate(PAGE_CACHE)
 
         return jsonify({'success': True, 'message': 'Inzerát bol odstránený'}), 200
 
@@ -378,12 +465,13 @@ def register_listing_routes(app):
             return jsonify({'success': False, 'message': 'Obrázok nepatrí k tomuto inzerátu'}), 400
 
         try:
-            file_path = os.path.join(UPLOAD_FOLDER, image.filename)
-            if os.path.exists(file_path):
-                os.remove(file_path)
-
+            references = file_references([image])
             db.session.delete(image)
+            bump(LISTINGS, current_user.id)
+            bump_listing_watchers(listing.id)
             db.session.commit()
+            release_files(app, references)
+            cache.invalidate(PAGE_CACHE)
 
             return jsonify({'success': True, 'message': 'Obrázok bol odstránený'}), 200
         except Exception as e:
@@ -398,15 +486,21 @@ def register_favorite_routes(app):
 
     @app.route('/api/my-favorites')
     @login_required
+    @versioned(FAVORITES)
     def api_my_favorites():
-        favorite_ids = [f.listing_id for f in current_user.favorites]
-        listings = Listing.query.filter(Listing.id.in_(favorite_ids)).all()
+        query = Favorite.query.filter_by(user_id=current_user.id).options(
+            joinedload(Favorite.listing).selectinload(Listing.images),
+            joinedload(Favorite.listing).joinedload(Listing.category),
+            joinedload(Favorite.listing).joinedload(Listing.author)
+        )
+        page = keyset_paginate(query, Favorite.created_at, Favorite.id, **page_args())
+        total = query.count() if request.args.get('with_total') else None
 
         listings_data = []
-        for listing in listings:
+        for listing in [favorite.listing for favorite in page.items]:
             image_url = None
             if listing.images and len(listing.images) > 0:
-                image_url = url_for('static', filename='uploads/' + listing.images[0].filename)
+                image_url = url_for('static', filename='uploads/' + listing.images[0].rendition_path('card'))
 
             listings_data.append({
                 'id': listing.id,
@@ -423,31 +517,15 @@ def register_favorite_routes(app):
                 'is_favorite': True
             })
 
-        return jsonify(listings_data)
+        return paginated_json(listings_data, page, total)
 
     @app.route('/api/favorite/<int:listing_id>', methods=['POST'])
     @login_required
     def api_favorite(listing_id):
-        favorite = Favorite.query.filter_by(
-            user_id=current_user.id,
-            listing_id=listing_id
-        ).first()
-
-        if favorite:
-            db.session.delete(favorite)
-            action = 'odstránený'
-            favorited = False
-        else:
-            favorite = Favorite(
-                user_id=current_user.id,
-                listing_id=listing_id
-            )
-            db.session.add(favorite)
-            action = 'pridaný'
-            favorited = True
-
         try:
+            favorited = toggle_user_favorite(current_user.id, listing_id)
             db.session.commit()
+            action = 'pridaný' if favorited else 'odstránený'
             return jsonify({
                 'success': True,
                 'message': f'Inzerát bol {action} do obľúbených.',
@@ -461,7 +539,7 @@ def register_favorite_routes(app):
     @app.route('/toggle-favorite', methods=['POST'])
     @login_required
     def toggle_favorite():
-        listing_id = request.form.get('listing_id')
+        listing_id = request.form.get('listing_id', type=int)
         is_ajax = request.headers.get(
             'X-Requested-With') == 'XMLHttpRequest' or request.content_type == 'multipart/form-data'
 
@@ -471,26 +549,10 @@ def register_favorite_routes(app):
             flash('Chýbajúce údaje.', 'danger')
             return redirect(request.referrer or url_for('home'))
 
-        favorite = Favorite.query.filter_by(
-            user_id=current_user.id,
-            listing_id=listing_id
-        ).first()
-
-        if favorite:
-            db.session.delete(favorite)
-            action = 'odstránený z'
-            favorited = False
-        else:
-            favorite = Favorite(
-                user_id=current_user.id,
-                listing_id=listing_id
-            )
-            db.session.add(favorite)
-            action = 'pridaný do'
-            favorited = True
-
         try:
+            favorited = toggle_user_favorite(current_user.id, listing_id)
             db.session.commit()
+            action = 'pridaný do' if favorited else 'odstránený z'
             if is_ajax:
                 return jsonify({
                     'success': True,
@@ -510,12 +572,29 @@ def register_favorite_routes(app):
     @app.route('/api/check-favorite/<int:listing_id>')
     @login_required
     def check_favorite(listing_id):
-        favorite = Favorite.query.filter_by(
-            user_id=current_user.id,
-            listing_id=listing_id
-        ).first()
+        return jsonify({'is_favorite': listing_id in favorite_ids()})
 
-        return jsonify({'is_favorite': favorite is not None})
+    @app.route('/api/favorites/status', methods=['GET', 'POST'])
+    @login_required
+    def api_favorites_status():
+        """Stav obľúbenia pre viac inzerátov naraz: ?ids=1,2,3 alebo JSON {"ids": [1, 2, 3]}"""
+        if request.method == 'POST':
+            payload = request.get_json(silent=True)
+            raw_ids = payload.get('ids', []) if isinstance(payload, dict) else None
+            if not isinstance(raw_ids, list):
+                return jsonify({'success': False, 'message': 'Očakáva sa JSON {"ids": [...]}.'}), 400
+        else:
+            raw_ids = request.args.get('ids', '').split(',')
+
+        try:
+            listing_ids = [int(listing_id) for listing_id in raw_ids if str(listing_id).strip()]
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'message': 'Neplatné ID inzerátov.'}), 400
+        if len(listing_ids) > MAX_STATUS_IDS:
+            return jsonify({'success': False, 'message': f'Najviac {MAX_STATUS_IDS} inzerátov naraz.'}), 400
+
+        statuses = favorite_statuses(current_user.id, listing_ids)
+        return jsonify({'favorites': {str(listing_id): favorited for listing_id, favorited in statuses.items()}})
 
 
 # ==================== MESSAGE ROUTES ====================
@@ -526,7 +605,7 @@ def register_message_routes(app):
     @login_required
     def send_message():
         receiver_id = request.form.get('receiver_id')
-        listing_id = request.form.get('listing_id')
+        listing_id = request.form.get('listing_id') or None
         content = request.form.get('content')
 
         if not receiver_id or not content:
@@ -542,7 +621,10 @@ def register_message_routes(app):
 
         try:
             db.session.add(message)
+            record_message(message)
+            bump(MESSAGES, message.sender_id, message.receiver_id)
             db.session.commit()
+            notify_new_message(message)
             flash('Správa bola odoslaná.', 'success')
         except Exception as e:
             db.session.rollback()
@@ -552,14 +634,17 @@ def register_message_routes(app):
 
     @app.route('/api/my-messages')
     @login_required
+    @versioned(MESSAGES)
     def api_my_messages():
-        messages = Message.query.filter(
+        query = Message.query.filter(
             (Message.sender_id == current_user.id) |
             (Message.receiver_id == current_user.id)
-        ).order_by(desc(Message.created_at)).all()
+        ).options(joinedload(Message.sender), joinedload(Message.receiver), joinedload(Message.listing))
+        page = keyset_paginate(query, Message.created_at, Message.id, **page_args())
+        total = query.count() if request.args.get('with_total') else None
 
         messages_data = []
-        for message in messages:
+        for message in page.items:
             messages_data.append({
                 'id': message.id,
                 'content': message.content,
@@ -574,7 +659,7 @@ def register_message_routes(app):
                 'is_sender': message.sender_id == current_user.id
             })
 
-        return jsonify(messages_data)
+        return paginated_json(messages_data, page, total)
 
     @app.route('/api/messages/<int:message_id>/read', methods=['POST'])
     @login_required
@@ -585,8 +670,10 @@ def register_message_routes(app):
             return jsonify({'success': False, 'message': 'Nemáte oprávnenie'}), 403
 
         try:
-            message.is_read = True
+            mark_message_read(message)
+            bump(MESSAGES, message.sender_id, message.receiver_id)
             db.session.commit()
+            notify_unread_count(current_user.id)
             return jsonify({'success': True, 'message': 'Správa označená ako prečítaná'}), 200
         except Exception as e:
             db.session.rollback()
@@ -597,6 +684,14 @@ def register_message_routes(app):
     @app.route('/api/conversation/<int:other_user_id>/<int:listing_id>')
     @login_required
     def api_conversation(other_user_id, listing_id=None):
+        try:
+            if mark_conversation_read(current_user.id, other_user_id, listing_id):
+                bump(MESSAGES, current_user.id, other_user_id)
+            db.session.commit()
+            notify_unread_count(current_user.id)
+        except:
+            db.session.rollback()
+
         query = Message.query.filter(
             or_(
                 and_(Message.sender_id == current_user.id, Message.receiver_id == other_user_id),
@@ -611,15 +706,6 @@ def register_message_routes(app):
 
         messages = query.order_by(Message.created_at.asc()).all()
 
-        for msg in messages:
-            if msg.receiver_id == current_user.id and not msg.is_read:
-                msg.is_read = True
-
-        try:
-            db.session.commit()
-        except:
-            db.session.rollback()
-
         other_user = User.query.get(other_user_id)
         listing = Listing.query.get(listing_id) if listing_id else None
 
@@ -669,7 +755,10 @@ def register_message_routes(app):
 
         try:
             db.session.add(message)
+            record_message(message)
+            bump(MESSAGES, message.sender_id, message.receiver_id)
             db.session.commit()
+            notify_new_message(message)
             return jsonify({
                 'success': True,
                 'message': 'Správa bola odoslaná',
@@ -683,42 +772,10 @@ def register_message_routes(app):
 
     @app.route('/api/conversations')
     @login_required
+    @versioned(MESSAGES)
     def api_conversations():
-        all_messages = Message.query.filter(
-            or_(
-                Message.sender_id == current_user.id,
-                Message.receiver_id == current_user.id
-            )
-        ).order_by(desc(Message.created_at)).all()
-
-        conversations_dict = {}
-
-        for msg in all_messages:
-            other_user_id = msg.receiver_id if msg.sender_id == current_user.id else msg.sender_id
-            listing_id = msg.listing_id
-
-            key = (other_user_id, listing_id)
-
-            if key not in conversations_dict:
-                conversations_dict[key] = msg
-
         conversations = []
-        for (other_user_id, listing_id), msg in conversations_dict.items():
-            other_user = msg.receiver if msg.sender_id == current_user.id else msg.sender
-            listing = msg.listing
-
-            unread_query = Message.query.filter(
-                Message.sender_id == other_user_id,
-                Message.receiver_id == current_user.id,
-                Message.is_read == False
-            )
-            if listing_id is not None:
-                unread_query = unread_query.filter(Message.listing_id == listing_id)
-            else:
-                unread_query = unread_query.filter(Message.listing_id.is_(None))
-
-            unread_count = unread_query.count()
-
+        for msg, other_user, listing, unread_count in conversation_summaries(current_user.id):
             conversations.append({
                 'other_user_id': other_user.id,
                 'other_user_name': other_user.username,
@@ -730,19 +787,57 @@ def register_message_routes(app):
                 'unread_count': unread_count
             })
 
-        conversations.sort(key=lambda x: x['last_message_time'], reverse=True)
-
         return jsonify(conversations)
 
     @app.route('/api/unread-messages-count')
     @login_required
     def api_unread_messages_count():
-        count = Message.query.filter(
-            Message.receiver_id == current_user.id,
-            Message.is_read == False
-        ).count()
+        return jsonify({'count': unread_messages_count(current_user.id)})
 
-        return jsonify({'count': count})
+    @app.route('/api/events')
+    @login_required
+    def api_events():
+        """Server-Sent Events: nové správy a zmeny počtu neprečítaných bez pollingu"""
+        user_id = current_user.id
+        since = request.headers.get('Last-Event-ID', type=int)
+        if since is None:
+            since = request.args.get('since', type=int)
+        if since is None:
+            since = event_broker.last_event_id(user_id)
+
+        if not event_broker.acquire_stream():
+            return _streams_exhausted()
+        # Miesto sa uvoľní pri zatvorení odpovede (odpojenie klienta), aj keď sa stream nezačal čítať
+        stream = ClosingIterator(sse_stream(user_id, since), [event_broker.release_stream])
+        return Response(stream, mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+
+    @app.route('/api/events/poll')
+    @login_required
+    def api_events_poll():
+        """Long-poll záloha pre klientov bez EventSource (alebo za proxy, ktorá nedrží spojenie)"""
+        user_id = current_user.id
+        since = request.args.get('since', type=int)
+        if since is None:
+            return jsonify({'events': [], 'last_event_id': event_broker.last_event_id(user_id)})
+
+        # Počas čakania nedržať pripojenie k databáze z poolu
+        db.session.close()
+
+        if not event_broker.acquire_stream():
+            return _streams_exhausted()
+        timeout = min(request.args.get('timeout', LONG_POLL_TIMEOUT, type=int), LONG_POLL_TIMEOUT)
+        try:
+            events = event_broker.wait(user_id, since, max(timeout, 0))
+        finally:
+            event_broker.release_stream()
+
+        return jsonify({
+            'events': [{'id': event_id, 'type': event_type, 'data': data} for event_id, event_type, data in events],
+            'last_event_id': events[-1][0] if events else since
+        })
 
 
 # ==================== ADMIN ROUTES ====================
@@ -752,24 +847,33 @@ def register_admin_routes(app):
     @app.route('/admin')
     @login_required
     @admin_required
+    @read_replica
     def admin_panel():
         users_count = User.query.count()
         listings_count = Listing.query.count()
         messages_count = Message.query.count()
         categories_count = Category.query.count()
+        view_counter.flush()  # zobrazenia tohto procesu; ostatné workery zapisujú každých VIEW_FLUSH_INTERVAL
 
         return render_template('admin/dashboard.html',
                                users_count=users_count,
                                listings_count=listings_count,
                                messages_count=messages_count,
-                               categories_count=categories_count)
+                               categories_count=categories_count,
+                               top_listings=top_listings())
 
     @app.route('/admin/users')
     @login_required
     @admin_required
+    @read_replica
     def admin_users():
-        users = User.query.order_by(User.created_at.desc()).all()
-        return render_template('admin/users.html', users=users)
+        users_page = keyset_paginate(with_user_counts(User.query), User.created_at, User.id,
+                                     after=request.args.get('after'),
+                                     before=request.args.get('before'),
+                                     per_page=ADMIN_PER_PAGE)
+        total_users = cached_count(('admin_users',), User.query)
+        return render_template('admin/users.html', users=users_page.items, keyset_page=users_page,
+                               total_users=total_users)
 
     @app.route('/admin/users/<int:user_id>/delete', methods=['POST'])
     @login_required
@@ -781,18 +885,17 @@ def register_admin_routes(app):
             flash('Nemôžete zmazať svoj vlastný účet.', 'danger')
             return redirect(url_for('admin_users'))
 
-        username = user.username
-
         try:
-            db.session.delete(user)
-            db.session.commit()
-            flash(f'Používateľ "{username}" a všetky jeho dáta boli zmazané.', 'success')
+            # Množinové DELETE po dávkach namiesto ORM kaskád (tie načítali každý inzerát a správu)
+            job = moderation.start_delete_user(user, created_by=current_user.id)
+            flash(f'{job.description}: spustené.', 'success')
         except Exception as e:
             db.session.rollback()
             print(f"Chyba pri mazaní používateľa: {e}")
             flash('Chyba pri mazaní používateľa.', 'danger')
+            return redirect(url_for('admin_users'))
 
-        return redirect(url_for('admin_users'))
+        return redirect(url_for('admin_moderation'))
 
     @app.route('/admin/users/<int:user_id>/toggle-role', methods=['POST'])
     @login_required
@@ -817,9 +920,50 @@ def register_admin_routes(app):
     @app.route('/admin/listings')
     @login_required
     @admin_required
+    @read_replica
     def admin_listings():
-        listings = Listing.query.order_by(Listing.created_at.desc()).all()
-        return render_template('admin/listings.html', listings=listings)
+        query, filters = filter_listings(request.args)
+        pagination = admin_page('admin_listings', query, filters)
+        return render_template('admin/listings.html', listings=pagination.items, pagination=pagination,
+                               filters=filters, statuses=LISTING_STATUSES)
+
+    @app.route('/api/admin/listings')
+    @login_required
+    @admin_required
+    @read_replica
+    def api_admin_listings():
+        query, filters = filter_listings(request.args)
+        pagination = admin_page('admin_listings', query, filters)
+        return paged_json([{
+            'id': listing.id,
+            'title': listing.title,
+            'price': listing.price,
+            'status': listing.status,
+            'created_at': listing.created_at.isoformat() if listing.created_at else None,
+            'user_id': listing.user_id,
+            'author': listing.author.username,
+            'category_name': listing.category.name if listing.category else None,
+            'url': url_for('listing_detail', id=listing.id),
+        } for listing in pagination.items], pagination)
+
+    @app.route('/admin/listings/bulk', methods=['POST'])
+    @login_required
+    @admin_required
+    def admin_bulk_listings():
+        action = request.form.get('action')
+        if action not in ('delete', 'deactivate'):
+            flash('Neznáma hromadná akcia.', 'danger')
+            return redirect(url_for('admin_listings'))
+
+        query, filters = filter_listings(request.form)
+        listing_ids = selected_ids(request.form, query, Listing.id)
+        if not listing_ids:
+            flash('Nie sú vybrané žiadne inzeráty.', 'warning')
+            return redirect(url_for('admin_listings', **filters))
+
+        job = moderation.start_listings(action, listing_ids, created_by=current_user.id)
+        flash(f'{job.description}: spustené.', 'success')
+        return redirect(url_for('admin_moderation'))
 
     @app.route('/admin/listings/<int:listing_id>/delete', methods=['POST'])
     @login_required
@@ -829,8 +973,10 @@ def register_admin_routes(app):
         title = listing.title
 
         try:
-            db.session.delete(listing)
+            references = delete_listings([listing.id])
             db.session.commit()
+            release_files(app, references)
+            cache.invalidate(PAGE_CACHE)
             flash(f'Inzerát "{title}" bol zmazaný.', 'success')
         except Exception as e:
             db.session.rollback()
@@ -842,9 +988,46 @@ def register_admin_routes(app):
     @app.route('/admin/messages')
     @login_required
     @admin_required
+    @read_replica
     def admin_messages():
-        messages = Message.query.order_by(Message.created_at.desc()).all()
-        return render_template('admin/messages.html', messages=messages)
+        query, filters = filter_messages(request.args)
+        pagination = admin_page('admin_messages', query, filters)
+        return render_template('admin/messages.html', messages=pagination.items, pagination=pagination,
+                               filters=filters)
+
+    @app.route('/api/admin/messages')
+    @login_required
+    @admin_required
+    @read_replica
+    def api_admin_messages():
+        query, filters = filter_messages(request.args)
+        pagination = admin_page('admin_messages', query, filters)
+        return paged_json([{
+            'id': message.id,
+            'content': message.content,
+            'is_read': message.is_read,
+            'created_at': message.created_at.isoformat() if message.created_at else None,
+            'sender_id': message.sender_id,
+            'sender': message.sender.username,
+            'receiver_id': message.receiver_id,
+            'receiver': message.receiver.username,
+            'listing_id': message.listing_id,
+            'listing_title': message.listing.title if message.listing else None,
+        } for message in pagination.items], pagination)
+
+    @app.route('/admin/messages/bulk', methods=['POST'])
+    @login_required
+    @admin_required
+    def admin_bulk_messages():
+        query, filters = filter_messages(request.form)
+        message_ids = selected_ids(request.form, query, Message.id)
+        if not message_ids:
+            flash('Nie sú vybrané žiadne správy.', 'warning')
+            return redirect(url_for('admin_messages', **filters))
+
+        job = moderation.start_delete_messages(message_ids, created_by=current_user.id)
+        flash(f'{job.description}: spustené.', 'success')
+        return redirect(url_for('admin_moderation'))
 
     @app.route('/admin/messages/<int:message_id>/delete', methods=['POST'])
     @login_required
@@ -854,6 +1037,10 @@ def register_admin_routes(app):
 
         try:
             db.session.delete(message)
+            db.session.flush()
+            refresh_conversation(message.sender_id, message.receiver_id, message.listing_id)
+            increment(Listing.message_count, message.listing_id, -1)
+            bump(MESSAGES, message.sender_id, message.receiver_id)
             db.session.commit()
             flash('Správa bola zmazaná.', 'success')
         except Exception as e:
@@ -863,12 +1050,65 @@ def register_admin_routes(app):
 
         return redirect(url_for('admin_messages'))
 
+    @app.route('/admin/moderation')
+    @login_required
+    @admin_required
+    def admin_moderation():
+        return render_template('admin/moderation.html', jobs=moderation.recent_jobs())
+
+    @app.route('/api/admin/moderation')
+    @login_required
+    @admin_required
+    def api_admin_moderation():
+        return jsonify([{
+            'id': job.id,
+            'action': job.action,
+            'description': job.description,
+            'status': job.status,
+            'total': job.total,
+            'processed': job.processed,
+            'percent': job.percent,
+            'error': job.error,
+        } for job in moderation.recent_jobs()])
+
+    @app.route('/admin/metrics')
+    @login_required
+    @admin_required
+    def admin_metrics():
+        rows, slow_entries = metrics.snapshot()
+        return render_template('admin/metrics.html', metrics=metrics, rows=rows, slow_entries=slow_entries)
+
+    @app.route('/admin/metrics/reset', methods=['POST'])
+    @login_required
+    @admin_required
+    def admin_metrics_reset():
+        metrics.reset()
+        flash('Metriky boli vynulované.', 'success')
+        return redirect(url_for('admin_metrics'))
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        """Metriky pre Prometheus: s METRICS_TOKEN cez Authorization: Bearer, inak len pre adminov"""
+        token = app.config.get('METRICS_TOKEN')
+        authorized = (token and request.headers.get('Authorization') == f'Bearer {token}') \
+            or (current_user.is_authenticated and current_user.is_admin())
+        if not authorized:
+            return Response('Forbidden\n', status=403, mimetype='text/plain')
+        if not metrics.enabled:
+            return Response('Metriky sú vypnuté (METRICS_ENABLED).\n', status=404, mimetype='text/plain')
+        return Response(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+
     @app.route('/admin/categories')
     @login_required
     @admin_required
+    @read_replica
     def admin_categories():
-        categories = Category.query.all()
-        return render_template('admin/categories.html', categories=categories)
+        # Strom aj počty inzerátov drží category_registry (2 dotazy, nie jeden na kategóriu).
+        # Stránkuje sa po koreňových kategóriách - podstrom sa nikdy nerozdelí medzi stránky.
+        pagination = ListPagination(items=category_registry.roots(), per_page=ADMIN_PER_PAGE, error_out=False)
+        categories = [node for root in pagination.items for node in category_registry.subtree(root.id)]
+        return render_template('admin/categories.html', categories=categories, pagination=pagination,
+                               categories_count=len(category_registry.all()))
 
     @app.route('/admin/categories/add', methods=['POST'])
     @login_required
@@ -886,6 +1126,8 @@ def register_admin_routes(app):
         try:
             db.session.add(category)
             db.session.commit()
+            category_registry.invalidate()
+            cache.invalidate(PAGE_CACHE)
             flash(f'Kategória "{name}" bola pridaná.', 'success')
         except Exception as e:
             db.session.rollback()
@@ -900,7 +1142,7 @@ def register_admin_routes(app):
     def admin_delete_category(category_id):
         category = Category.query.get_or_404(category_id)
 
-        if category.listings:
+        if db.session.query(Listing.query.filter_by(category_id=category.id).exists()).scalar():
             flash(f'Kategória "{category.name}" obsahuje inzeráty a nemôže byť zmazaná.', 'danger')
             return redirect(url_for('admin_categories'))
 
@@ -909,6 +1151,8 @@ def register_admin_routes(app):
         try:
             db.session.delete(category)
             db.session.commit()
+            category_registry.invalidate()
+            cache.invalidate(PAGE_CACHE)
             flash(f'Kategória "{name}" bola zmazaná.', 'success')
         except Exception as e:
             db.session.rollback()
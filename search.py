@@ -0,0 +1,119 @@
+from sqlalchemy import text, table, column, literal_column, func
+from extensions import db
+from models import Listing
+
+# ==================== KONŠTANTY ====================
+FTS_TABLE = 'listing_fts'
+
+# Váhy pre bm25 (title, description) - zhoda v názve je dôležitejšia
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+listing_fts = table(FTS_TABLE, column('rowid'), column('title'), column('description'))
+
+# FTS5 tabuľka s externým obsahom (dáta sa neduplikujú, index ukazuje na listing.id).
+# unicode61 + remove_diacritics 2 => "zlty" nájde "žltý" a naopak.
+_CREATE_STATEMENTS = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description,
+        content='listing', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON listing BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON listing BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON listing BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END
+    """,
+]
+
+
+# ==================== POMOCNÉ FUNKCIE ====================
+def search_supported():
+    """FTS5 index existuje len pre SQLite"""
+    return db.engine.dialect.name == 'sqlite'
+
+
+def build_match_expression(search_query):
+    """Z textu používateľa spraví bezpečný FTS5 MATCH výraz (všetky slová, prefixová zhoda)"""
+    terms = [term.replace('"', '') for term in search_query.split()]
+    return ' '.join(f'"{term}"*' for term in terms if term)
+
+
+def create_search_index():
+    """Vytvorí FTS tabuľku a triggery; pri prvom vytvorení naplní index existujúcimi dátami"""
+    if not search_supported():
+        return
+
+    exists = db.session.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {'name': FTS_TABLE}
+    ).first()
+
+    for statement in _CREATE_STATEMENTS:
+        db.session.execute(text(statement))
+
+    if not exists:
+        rebuild_search_index()
+
+    db.session.commit()
+
+
+def rebuild_search_index():
+    """Prebuduje celý index z tabuľky listing"""
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+    db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+    db.session.commit()
+
+
+def search_condition(search_query):
+    """Podmienka WHERE pre inzeráty zodpovedajúce textu, bez zoradenia (pre počty a fasety).
+
+    ID sa vyberú z FTS indexu poddotazom, takže SQLite nemôže zvoliť plán, ktorý pre každý
+    aktívny inzerát znovu vyhodnocuje MATCH (JOIN bez ORDER BY bm25 to tak robí).
+    Vráti None, ak text neobsahuje žiadne slovo.
+    """
+    match_expression = build_match_expression(search_query)
+    if not match_expression:
+        return None
+
+    if not search_supported():
+        like_pattern = f'%{search_query}%'
+        return db.or_(Listing.title.ilike(like_pattern), Listing.description.ilike(like_pattern))
+
+    fts = literal_column(FTS_TABLE)
+    return Listing.id.in_(db.select(listing_fts.c.rowid).where(fts.op('MATCH')(match_expression)))
+
+
+def apply_search(query, search_query):
+    """Obmedzí query na inzeráty zodpovedajúce hľadanému textu a zoradí ich podľa relevancie"""
+    match_expression = build_match_expression(search_query)
+    if not match_expression:
+        return query
+
+    if not search_supported():
+        like_pattern = f'%{search_query}%'
+        return query.filter(db.or_(Listing.title.ilike(like_pattern),
+                                   Listing.description.ilike(like_pattern)))
+
+    fts = literal_column(FTS_TABLE)
+    return query.join(listing_fts, listing_fts.c.rowid == Listing.id) \
+        .filter(fts.op('MATCH')(match_expression)) \
+        .order_by(func.bm25(fts, TITLE_WEIGHT, DESCRIPTION_WEIGHT))
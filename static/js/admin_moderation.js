@@ -0,0 +1,61 @@
+// Priebeh hromadných operácií na /admin/moderation - obnovuje sa, kým nejaká úloha beží
+
+const MODERATION_POLL_INTERVAL = 2000;
+
+function renderJobStatus(row, job) {
+    const bar = row.querySelector('.progress-bar');
+    bar.style.width = `${job.percent}%`;
+    row.querySelector('.job-progress').textContent = `${job.processed} / ${job.total}`;
+    row.dataset.status = job.status;
+
+    const status = row.querySelector('.job-status');
+    if (job.status === 'running') {
+        return;
+    }
+    bar.classList.remove('progress-bar-striped', 'progress-bar-animated');
+    if (job.status === 'failed') {
+        bar.classList.add('bg-danger');
+        status.innerHTML = '<span class="badge bg-danger">Chyba</span>';
+        status.firstChild.title = job.error || '';
+    } else {
+        bar.classList.add('bg-success');
+        status.innerHTML = '<span class="badge bg-success">Hotovo</span>';
+    }
+}
+
+function pollModerationJobs() {
+    const table = document.getElementById('moderation-jobs');
+    if (!table || !table.querySelector('tr[data-status="running"]')) {
+        return;
+    }
+
+    fetch(table.dataset.url)
+        .then(response => response.json())
+        .then(jobs => {
+            jobs.forEach(job => {
+                const row = table.querySelector(`tr[data-job-id="${job.id}"]`);
+                if (row) {
+                    renderJobStatus(row, job);
+                }
+            });
+        })
+        .catch(error => console.error('Chyba pri načítaní priebehu operácií:', error))
+        .finally(() => setTimeout(pollModerationJobs, MODERATION_POLL_INTERVAL));
+}
+
+document.addEventListener('DOMContentLoaded', () => {
+    setTimeout(pollModerationJobs, MODERATION_POLL_INTERVAL);
+});
+
+// Výber všetkých riadkov v admin tabuľke pre hromadnú akciu
+document.addEventListener('DOMContentLoaded', () => {
+    const selectAll = document.getElementById('bulk-select-all');
+    if (!selectAll) {
+        return;
+    }
+    selectAll.addEventListener('change', () => {
+        document.querySelectorAll('.bulk-select').forEach(checkbox => {
+            checkbox.checked = selectAll.checked;
+        });
+    });
+});
@@ -1,14 +1,40 @@
 
 // --- 1. CORE FUNCTIONS (Load Listings, Delete Listing) ---
 
-function loadUserListings() {
+// Tlačidlo "Načítať ďalšie" pre stránkované API (kurzor prichádza v hlavičke X-Next-Cursor)
+function renderLoadMoreButton(container, nextCursor, loadFunction) {
+    const existing = container.querySelector('.load-more');
+    if (existing) {
+        existing.remove();
+    }
+    if (!nextCursor) {
+        return;
+    }
+
+    container.insertAdjacentHTML('beforeend', `
+        <div class="col-12 text-center mb-4 load-more">
+            <button class="btn btn-outline-primary">
+                <i class="bi bi-arrow-down-circle"></i> Načítať ďalšie
+            </button>
+        </div>
+    `);
+    container.querySelector('.load-more button').addEventListener('click', () => loadFunction(nextCursor));
+}
+
+function loadUserListings(after = null) {
     const loadingElement = document.getElementById('listings-loading');
     if (loadingElement) {
         loadingElement.style.display = 'block';
     }
 
-    fetch('/api/my-listings')
-        .then(response => response.json())
+    let nextCursor = null;
+    const url = after ? `/api/my-listings?after=${encodeURIComponent(after)}` : '/api/my-listings';
+
+    fetchWithEtag(url)
+        .then(result => {
+            nextCursor = result.headers.get('X-Next-Cursor');
+            return result.data;
+        })
         .then(listings => {
             const container = document.getElementById('user-listings');
             let htmlContent = '';
@@ -17,7 +43,7 @@ function loadUserListings() {
                 loadingElement.style.display = 'none';
             }
 
-            if (listings.length === 0) {
+            if (listings.length === 0 && !after) {
                 htmlContent = `
                     <div class="col-12">
                         <div class="alert alert-info text-center">
@@ -116,7 +142,13 @@ function loadUserListings() {
             }
 
             if (container) {
-                container.innerHTML = htmlContent;
+                if (after) {
+                    container.querySelector('.load-more')?.remove();
+                    container.insertAdjacentHTML('beforeend', htmlContent);
+                } else {
+                    container.innerHTML = htmlContent;
+                }
+                renderLoadMoreButton(container, nextCursor, loadUserListings);
             }
         })
         .catch(error => {
@@ -309,14 +341,20 @@ function changePassword() {
     });
 }
 // Funkcia na načítanie obľúbených inzerátov
-function loadUserFavorites() {
+function loadUserFavorites(after = null) {
     const loadingElement = document.getElementById('favorites-loading');
     if (loadingElement) {
         loadingElement.style.display = 'block';
     }
 
-    fetch('/api/my-favorites')
-        .then(response => response.json())
+    let nextCursor = null;
+    const url = after ? `/api/my-favorites?after=${encodeURIComponent(after)}` : '/api/my-favorites';
+
+    fetchWithEtag(url)
+        .then(result => {
+            nextCursor = result.headers.get('X-Next-Cursor');
+            return result.data;
+        })
         .then(listings => {
             const container = document.getElementById('user-favorites');
             let htmlContent = '';
@@ -325,7 +363,7 @@ function loadUserFavorites() {
                 loadingElement.style.display = 'none';
             }
 
-            if (listings.length === 0) {
+            if (listings.length === 0 && !after) {
                 htmlContent = `
                     <div class="col-12">
                         <div class="alert alert-info text-center">
@@ -428,15 +466,23 @@ function loadUserFavorites() {
             }
 
             if (container) {
-                container.innerHTML = htmlContent;
+                if (after) {
+                    container.querySelector('.load-more')?.remove();
+                    container.insertAdjacentHTML('beforeend', htmlContent);
+                } else {
+                    container.innerHTML = htmlContent;
+                }
 
                 // Pridanie event listenerov pre formuláre na odstránenie z obľúbených
-                container.querySelectorAll('form').forEach(form => {
+                container.querySelectorAll('form:not([data-bound])').forEach(form => {
+                    form.dataset.bound = 'true';
                     form.addEventListener('submit', function(e) {
                         e.preventDefault();
                         removeFromFavorites(this);
                     });
                 });
+
+                renderLoadMoreButton(container, nextCursor, loadUserFavorites);
             }
         })
         .catch(error => {
@@ -0,0 +1,26 @@
+// main.js - spoločné funkcie pre všetky stránky
+
+// Podmienený GET: odpovede JSON API sa pamätajú podľa URL spolu s ETagom a pri ďalšej požiadavke
+// sa posiela If-None-Match. Ak sa dáta na serveri nezmenili (304), vrátia sa zapamätané dáta.
+const etagCache = new Map();
+
+function fetchWithEtag(url) {
+    const cached = etagCache.get(url);
+    const options = cached ? { headers: { 'If-None-Match': cached.etag } } : {};
+
+    return fetch(url, options).then(response => {
+        if (response.status === 304 && cached) {
+            return { data: cached.data, headers: cached.headers };
+        }
+        if (!response.ok) {
+            throw new Error('Chyba pri načítaní ' + url + ': ' + response.status);
+        }
+        return response.json().then(data => {
+            const etag = response.headers.get('ETag');
+            if (etag) {
+                etagCache.set(url, { etag: etag, data: data, headers: response.headers });
+            }
+            return { data: data, headers: response.headers };
+        });
+    });
+}
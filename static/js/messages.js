@@ -2,6 +2,8 @@
 
 let currentConversation = null;
 let refreshInterval = null;
+let safetyRefreshInterval = null;
+let eventSource = null;
 
 // Načítanie konverzácií
 function loadConversations() {
@@ -10,8 +12,8 @@ function loadConversations() {
         loadingElement.style.display = 'block';
     }
 
-    fetch('/api/conversations')
-        .then(response => response.json())
+    fetchWithEtag('/api/conversations')
+        .then(result => result.data)
         .then(conversations => {
             const container = document.getElementById('conversations-list');
 
@@ -211,22 +213,131 @@ function closeConversation() {
     document.getElementById('no-conversation-selected').style.display = 'block';
 }
 
+// Zobrazenie počtu neprečítaných správ v badge
+function setUnreadBadge(count) {
+    const badge = document.getElementById('unread-count');
+    if (badge) {
+        if (count > 0) {
+            badge.textContent = count;
+            badge.style.display = 'inline';
+        } else {
+            badge.style.display = 'none';
+        }
+    }
+}
+
 // Aktualizácia počtu neprečítaných správ
 function updateUnreadCount() {
     fetch('/api/unread-messages-count')
         .then(response => response.json())
-        .then(data => {
-            const badge = document.getElementById('unread-count');
-            if (badge) {
-                if (data.count > 0) {
-                    badge.textContent = data.count;
-                    badge.style.display = 'inline';
-                } else {
-                    badge.style.display = 'none';
-                }
+        .then(data => setUnreadBadge(data.count))
+        .catch(error => console.error('Chyba pri aktualizácii počtu správ:', error));
+}
+
+function isMessagesTabActive() {
+    const messagesTab = document.getElementById('messages');
+    return messagesTab && (messagesTab.classList.contains('active') || messagesTab.classList.contains('show'));
+}
+
+// Patrí správa do práve otvorenej konverzácie?
+function isCurrentConversation(data) {
+    if (!currentConversation) {
+        return false;
+    }
+    const otherUserId = parseInt(currentConversation.otherUserId);
+    const listingId = currentConversation.listingId && currentConversation.listingId !== 'null'
+        ? parseInt(currentConversation.listingId)
+        : null;
+    return (data.sender_id === otherUserId || data.receiver_id === otherUserId) && data.listing_id === listingId;
+}
+
+// Spracovanie udalosti zo servera (SSE alebo long-poll)
+function handleServerEvent(type, data) {
+    if (data.unread_count !== undefined) {
+        setUnreadBadge(data.unread_count);
+    }
+
+    if (type !== 'new_message') {
+        return;
+    }
+
+    if (isCurrentConversation(data)) {
+        // Znovu načíta správy (označí ich ako prečítané) aj zoznam konverzácií
+        openConversation(currentConversation.otherUserId, currentConversation.listingId);
+    } else if (isMessagesTabActive()) {
+        loadConversations();
+    }
+}
+
+// Server-Sent Events - server pošle udalosť len keď príde nová správa alebo sa zmení počet neprečítaných
+function startEventStream() {
+    if (!window.EventSource) {
+        startLongPolling();
+        return;
+    }
+
+    eventSource = new EventSource('/api/events');
+    ['new_message', 'unread'].forEach(type => {
+        eventSource.addEventListener(type, event => handleServerEvent(type, JSON.parse(event.data)));
+    });
+
+    eventSource.onerror = function() {
+        // Prehliadač sa pri výpadku pripája znova sám; ak spojenie úplne zlyhá, prejdeme na long-poll
+        if (eventSource.readyState === EventSource.CLOSED) {
+            eventSource = null;
+            startLongPolling();
+        }
+    };
+}
+
+// Záloha: long-poll požiadavka čaká na serveri, kým nepríde udalosť (alebo vyprší timeout)
+function startLongPolling(since = null) {
+    const url = since === null ? '/api/events/poll' : `/api/events/poll?since=${since}`;
+
+    fetch(url)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error('Long-poll zlyhal: ' + response.status);
             }
+            return response.json();
         })
-        .catch(error => console.error('Chyba pri aktualizácii počtu správ:', error));
+        .then(data => {
+            data.events.forEach(event => handleServerEvent(event.type, event.data));
+            startLongPolling(data.last_event_id);
+        })
+        .catch(error => {
+            console.error('Chyba pri čakaní na udalosti, prechádzam na pravidelné obnovovanie:', error);
+            startIntervalRefresh();
+        });
+}
+
+// Obnovenie počtu neprečítaných (a zoznamu konverzácií na tabe Správy) priamo z databázy
+function refreshMessages() {
+    if (isMessagesTabActive()) {
+        loadConversations();
+    }
+    updateUnreadCount();
+}
+
+// Popri SSE/long-poll pomalé obnovovanie každých 60 sekúnd - udalosti publikuje len proces servera,
+// ktorý správu spracoval, takže pri viacerých procesoch by sa k tomuto klientovi nemuseli dostať
+function startSafetyRefresh() {
+    if (safetyRefreshInterval) {
+        return;
+    }
+    safetyRefreshInterval = setInterval(refreshMessages, 60000);
+}
+
+// Posledná záloha: obnovovanie konverzácií každých 30 sekúnd (nahrádza pomalé obnovovanie)
+function startIntervalRefresh() {
+    if (safetyRefreshInterval) {
+        clearInterval(safetyRefreshInterval);
+        safetyRefreshInterval = null;
+    }
+    if (refreshInterval) {
+        return;
+    }
+    refreshInterval = setInterval(refreshMessages, 30000);
 }
 
 // Inicializácia
@@ -239,28 +350,30 @@ document.addEventListener('DOMContentLoaded', function() {
         });
 
         // Ak je tab Správy aktívny pri načítaní stránky, načítame konverzácie
-        const messagesTab = document.getElementById('messages');
-        if (messagesTab && (messagesTab.classList.contains('active') || messagesTab.classList.contains('show'))) {
+        if (isMessagesTabActive()) {
             loadConversations();
         }
     }
 
-    // Auto-refresh konverzácií každých 30 sekúnd
-    refreshInterval = setInterval(() => {
-        const messagesTab = document.getElementById('messages');
-        if (messagesTab && (messagesTab.classList.contains('active') || messagesTab.classList.contains('show'))) {
-            loadConversations();
-        }
-        updateUnreadCount();
-    }, 30000);
+    // Nové správy a počet neprečítaných posiela server sám, s pomalým obnovovaním ako poistkou
+    startEventStream();
+    startSafetyRefresh();
 
     // Načítanie počtu neprečítaných správ pri načítaní stránky
     updateUnreadCount();
 });
 
-// Funkcia na zastavenie refresh intervalu (volať pri odchode zo stránky)
+// Funkcia na zastavenie obnovovania (volať pri odchode zo stránky)
 function stopMessagesRefresh() {
+    if (eventSource) {
+        eventSource.close();
+        eventSource = null;
+    }
     if (refreshInterval) {
         clearInterval(refreshInterval);
     }
-}
\ No newline at end of file
+    if (safetyRefreshInterval) {
+        clearInterval(safetyRefreshInterval);
+        safetyRefreshInterval = null;
+    }
+}
@@ -0,0 +1,151 @@
+import hashlib
+import os
+import tempfile
+from flask import g
+from sqlalchemy import func, false, text
+from extensions import db
+from models import Image
+
+# ==================== KONŠTANTY ====================
+UPLOAD_FOLDER = 'uploads'  # podpriečinok v static/
+CHUNK_SIZE = 64 * 1024  # bajtov, po koľkých sa súbor číta, hashuje a zapisuje
+SHARD_DEPTH = 2  # úrovne podpriečinkov podľa prefixu hashu (ab/cd/abcd...)
+
+
+def upload_path(app, filename):
+    """Absolútna cesta k súboru v static/uploads"""
+    return os.path.join(app.static_folder, UPLOAD_FOLDER, filename)
+
+
+# ==================== UKLADANIE ====================
+def content_filename(digest, extension):
+    """Relatívna cesta súboru podľa jeho hashu, napr. '3f/a2/3fa2...e1.jpg'"""
+    shards = [digest[i * 2:i * 2 + 2] for i in range(SHARD_DEPTH)]
+    return '/'.join(shards + [f'{digest}.{extension}'])
+
+
+def store_upload(app, file):
+    """Uloží nahraný súbor (FileStorage) pod názvom podľa SHA-256 obsahu a vráti jeho relatívnu cestu.
+
+    Súbor sa číta po častiach, zároveň sa hashuje a zapisuje do dočasného súboru v tom istom
+    priečinku, takže sa nikdy nenačíta celý do pamäte. Rovnaký obrázok nahraný viackrát
+    (aj k rôznym inzerátom) sa na disku uloží len raz.
+
+    Dočasný súbor ostáva ako záložná kópia, kým route po flushi riadkov Image nezavolá finish_uploads().
+    """
+    extension = file.filename.rsplit('.', 1)[1].lower()
+    upload_root = upload_path(app, '')
+    os.makedirs(upload_root, exist_ok=True)
+
+    digest = hashlib.sha256()
+    descriptor, temp_path = tempfile.mkstemp(dir=upload_root, prefix='.upload-')
+    try:
+        with os.fdopen(descriptor, 'wb') as temp_file:
+            while True:
+                chunk = file.stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                temp_file.write(chunk)
+
+        filename = content_filename(digest.hexdigest(), extension)
+        destination = upload_path(app, filename)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        os.chmod(temp_path, 0o644)  # mkstemp vytvára súbor čitateľný len pre vlastníka
+        _link(temp_path, destination)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    g.setdefault('pending_uploads', []).append((filename, temp_path))
+    return filename
+
+
+def finish_uploads(app):
+    """Po flushi nových riadkov Image a pred commitom obnoví súbory, ktoré medzitým zmazal
+    release_files, a zahodí záložné kópie zo store_upload.
+
+    Transakcia požiadavky si vezme zámky súborov (lock_files) a drží ich až do commitu; release_files
+    počíta odkazy aj maže pod tými istými zámkami - súbor zmazaný predtým sa tu obnoví a po tomto
+    bode ho už nikto nezmaže.
+    """
+    pending = g.pop('pending_uploads', [])
+    if pending:
+        lock_files(db.session.connection(), [filename for filename, _ in pending])
+    for filename, temp_path in pending:
+        _link(temp_path, upload_path(app, filename))
+        os.remove(temp_path)
+
+
+def _link(source, destination):
+    """Atomicky sprístupní súbor pod cieľovým názvom; existujúci súbor má rovnaký obsah a ostane"""
+    try:
+        os.link(source, destination)
+    except FileExistsError:
+        pass
+
+
+# ==================== POČTY ODKAZOV ====================
+def lock_files(connection, filenames):
+    """Zamkne súbory v transakcii spojenia až do jej konca (medzi finish_uploads a release_files).
+
+    SQLite: zápisový zámok celej databázy (prázdny UPDATE; flush nových Image ho už drží tiež).
+    PostgreSQL: transakčný advisory zámok pre každý názov súboru - riadky FOR UPDATE by nestačili,
+    súbor bez odkazu žiadny riadok na zamknutie nemá. Zámky sa berú v zoradenom poradí (bez deadlocku).
+    Iné databázy sa nepodporujú (database.py počíta so SQLite alebo PostgreSQL).
+    """
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        connection.execute(db.update(Image).where(false()).values(filename=Image.filename))
+    elif dialect == 'postgresql':
+        for filename in sorted(set(filenames)):
+            connection.execute(text('SELECT pg_advisory_xact_lock(hashtext(:filename))'), {'filename': filename})
+
+
+def reference_counts(connection, filenames):
+    """Počet riadkov Image, ktoré odkazujú na jednotlivé súbory (jeden GROUP BY cez ix_image_filename)"""
+    if not filenames:
+        return {}
+    rows = connection.execute(
+        db.select(Image.filename, func.count(Image.id))
+        .where(Image.filename.in_(set(filenames)))
+        .group_by(Image.filename)
+    ).all()
+    return dict(rows)
+
+
+def file_references(images):
+    """Zoznam súborov obrázkov (originál + verzie) - treba ho získať pred zmazaním riadkov"""
+    return [(image.filename, image.renditions) for image in images]
+
+
+def release_files(app, references):
+    """Po commite zmaže z disku súbory, na ktoré už neodkazuje žiadny obrázok.
+
+    references je výsledok file_references() zachytený pred zmazaním riadkov Image.
+    Počty sa čítajú a súbory mažú pod zámkami lock_files(), takže medzitým nemôže pribudnúť
+    nový odkaz - pozri finish_uploads().
+    """
+    if not references:
+        return
+    with db.engine.begin() as connection:
+        lock_files(connection, [filename for filename, _ in references])
+        counts = reference_counts(connection, [filename for filename, _ in references])
+        removed = set()
+        for filename, renditions in references:
+            if counts.get(filename) or filename in removed:
+                continue
+            removed.add(filename)
+
+            paths = [filename]
+            for rendition in (renditions or {}).values():
+                paths += [rendition['webp'], rendition['jpeg']]
+            for path in paths:
+                file_path = upload_path(app, path)
+                try:
+                    os.remove(file_path)
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"Chyba pri mazaní súboru {path}: {e}")
@@ -0,0 +1,106 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, init_db  # noqa: E402
+from extensions import db  # noqa: E402
+from models import User, Category  # noqa: E402
+
+PASSWORD = 'heslo123'
+
+
+def _reset_process_caches():
+    """Cache v pamäti procesu prežijú medzi aplikáciami - každý test začína s prázdnymi"""
+    import pagination
+    import places
+    from categories import category_registry
+    from popularity import view_counter
+
+    pagination._count_cache.clear()
+    places._location_cache.clear()
+    category_registry._snapshot = None
+    view_counter._pending.clear()  # zobrazenia z predchádzajúceho testu by sa zapísali do novej databázy
+
+
+# Kontext aplikácie sa drží len v blokoch `with app.app_context()` - požiadavky test klienta
+# si vytvárajú vlastný (inak by zdieľali g, a teda aj prihláseného používateľa).
+@pytest.fixture
+def app(tmp_path):
+    _reset_process_caches()
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}',
+        'DB_REPLICA_URI': None,
+        'TESTING': True,
+        'WTF_CSRF_ENABLED': False,
+        'CACHE_BACKEND': 'null',
+        'IMAGE_WORKERS': 0,
+        'MODERATION_WORKERS': 0,
+    })
+    init_db(app)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    def make_user(username, role='user'):
+        with app.app_context():
+            user = User(username=username, email=f'{username}@example.sk', role=role)
+            user.set_password(PASSWORD)
+            db.session.add(user)
+            db.session.commit()
+            return _detached(user)
+
+    return make_user
+
+
+@pytest.fixture
+def category(app):
+    with app.app_context():
+        category = Category(name='Bicykle')
+        db.session.add(category)
+        db.session.commit()
+        return _detached(category)
+
+
+def _detached(instance):
+    """Objekt použiteľný aj mimo kontextu aplikácie (načítané stĺpce, bez session)"""
+    db.session.refresh(instance)
+    db.session.expunge(instance)
+    return instance
+
+
+class QueryCounter:
+    """Počíta SQL dotazy vykonané na všetkých engine-och (ako benchmarks/endpoints.py)"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __enter__(self):
+        event.listen(Engine, 'after_cursor_execute', self._count)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(Engine, 'after_cursor_execute', self._count)
+
+    def _count(self, *args):
+        self.count += 1
+
+
+def login(client, user):
+    """Prihlási používateľa v test klientovi (každý klient má vlastnú session)"""
+    response = client.post('/login', data={'email': user.email, 'password': PASSWORD})
+    assert response.status_code == 302
+    return client
+
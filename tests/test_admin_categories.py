@@ -0,0 +1,27 @@
+import re
+
+from conftest import login
+from extensions import db
+from models import Category
+
+import routes
+
+
+def test_subtrees_are_not_split_across_pages(app, client, make_user, monkeypatch):
+    monkeypatch.setattr(routes, 'ADMIN_PER_PAGE', 2)
+    with app.app_context():
+        for name in ('Auto', 'Bývanie', 'Šport'):
+            root = Category(name=name)
+            db.session.add(root)
+            db.session.flush()
+            for i in range(3):
+                db.session.add(Category(name=f'{name} {i}', parent_id=root.id))
+        db.session.commit()
+
+    login(client, make_user('spravca', role='admin'))
+    pages = [client.get(f'/admin/categories?page={page}').get_data(as_text=True) for page in (1, 2)]
+
+    names = [re.findall(r'<td><strong>(?:— )*([^<]+)</strong></td>', page) for page in pages]
+    assert names[0] == ['Auto', 'Auto 0', 'Auto 1', 'Auto 2', 'Bývanie', 'Bývanie 0', 'Bývanie 1', 'Bývanie 2']
+    assert names[1] == ['Šport', 'Šport 0', 'Šport 1', 'Šport 2']
+    assert '12 kategórií' in pages[1]
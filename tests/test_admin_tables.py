@@ -0,0 +1,25 @@
+from werkzeug.datastructures import MultiDict
+
+from admin_tables import filter_listings
+from extensions import db
+from models import Listing
+
+
+def test_listing_text_filter_uses_fulltext_index(app, make_user, category):
+    user = make_user('predajca')
+    with app.app_context():
+        db.session.add_all([
+            Listing(title='Žltý bicykel', description='Horský', price=100, user_id=user.id,
+                    category_id=category.id, status='inactive'),
+            Listing(title='Kočík', description='Zachovalý', price=50, user_id=user.id, category_id=category.id),
+        ])
+        db.session.commit()
+
+        query, filters = filter_listings(MultiDict({'q': 'zlty bic'}))
+        assert 'listing_fts' in str(query.statement)
+        assert [listing.title for listing in query] == ['Žltý bicykel']
+        assert filters == {'q': 'zlty bic'}
+
+        # Text bez slov sa ignoruje
+        query, filters = filter_listings(MultiDict({'q': '""'}))
+        assert query.count() == 2 and filters == {}
@@ -0,0 +1,39 @@
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from assets import minify_js
+
+STATIC_JS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static', 'js')
+
+
+# Delenie vs. regulárny výraz po rôznych tokenoch - chybné rozhodnutie by potichu pokazilo bundle
+@pytest.mark.parametrize('source, expected', [
+    ("a = i++ / 2; // it's\nb = 1", 'a = i++ / 2;\nb = 1\n'),
+    ('x = a-- / b / c;', 'x = a-- / b / c;\n'),
+    ('y = (a + b) / 2 // polovica', 'y = (a + b) / 2\n'),
+    ('z = items[0] / 2 // prvý', 'z = items[0] / 2\n'),
+    ('q = a / b; z = c / d', 'q = a / b; z = c / d\n'),
+    ('n = total\n    / count', 'n = total\n/ count\n'),
+    ('r = /[/]/g.test(s); // trieda so lomkou', 'r = /[/]/g.test(s);\n'),
+    ('if (x) return /a\\/b/i.test(y);', 'if (x) return /a\\/b/i.test(y);\n'),
+    ("s = 'a' + /x\\/\\/y/.source", "s = 'a' + /x\\/\\/y/.source\n"),
+    ('typeof /x/', 'typeof /x/\n'),
+    ("url = 'http://example.sk'; // koniec", "url = 'http://example.sk';\n"),
+    ('t = `${a / 2} // v šablóne`', 't = `${a / 2} // v šablóne`\n'),
+    ('/* blok */ a = 1 /* ďalší */ + 2', 'a = 1  + 2\n'),
+])
+def test_minify_js_division_and_regex(source, expected):
+    assert minify_js(source) == expected
+
+
+@pytest.mark.skipif(shutil.which('node') is None, reason='node nie je nainštalovaný')
+@pytest.mark.parametrize('name', sorted(name for name in os.listdir(STATIC_JS) if name.endswith('.js')))
+def test_minified_static_js_is_valid(tmp_path, name):
+    with open(os.path.join(STATIC_JS, name), encoding='utf-8') as f:
+        minified = tmp_path / name
+        minified.write_text(minify_js(f.read()), encoding='utf-8')
+    result = subprocess.run(['node', '--check', str(minified)], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
@@ -0,0 +1,26 @@
+from conftest import login
+from events import event_broker
+
+
+def test_long_poll_releases_stream_slot(client, make_user):
+    login(client, make_user('kupec'))
+
+    response = client.get('/api/events/poll?since=0&timeout=0')
+    assert response.status_code == 200
+    assert event_broker._streams == 0
+
+
+def test_streams_over_limit_are_rejected(client, make_user, monkeypatch):
+    login(client, make_user('kupec'))
+    monkeypatch.setattr(event_broker, 'max_streams', 1)
+
+    stream = client.get('/api/events', buffered=False)
+    assert stream.status_code == 200 and event_broker._streams == 1
+
+    # Ďalšie dlhé spojenie v tom istom procese už nedostane vlákno
+    for url in ('/api/events', '/api/events/poll?since=0'):
+        response = client.get(url)
+        assert response.status_code == 503 and response.headers['Retry-After']
+
+    stream.close()
+    assert event_broker._streams == 0
@@ -0,0 +1,36 @@
+import pytest
+
+from conftest import login
+from extensions import db
+from models import Listing, Favorite
+
+
+@pytest.fixture
+def listings(app, make_user, category):
+    user, seller = make_user('kupec'), make_user('predajca')
+    with app.app_context():
+        listings = [Listing(title=f'Bicykel {i}', description='Popis', price=10, user_id=seller.id,
+                            category_id=category.id) for i in range(3)]
+        db.session.add_all(listings)
+        db.session.flush()
+        db.session.add(Favorite(user_id=user.id, listing_id=listings[0].id))
+        db.session.commit()
+        return user, [listing.id for listing in listings]
+
+
+def test_batch_status(client, listings):
+    user, ids = listings
+    login(client, user)
+
+    response = client.post('/api/favorites/status', json={'ids': ids})
+    assert response.status_code == 200
+    assert response.get_json()['favorites'] == {str(ids[0]): True, str(ids[1]): False, str(ids[2]): False}
+
+    response = client.get(f'/api/favorites/status?ids={ids[0]},{ids[1]}')
+    assert response.get_json()['favorites'] == {str(ids[0]): True, str(ids[1]): False}
+
+
+@pytest.mark.parametrize('body', [[1, 2], 'ids', {'ids': '1,2'}, {'ids': [1, 'x']}, {'ids': [{}]}])
+def test_batch_status_rejects_malformed_body(client, listings, body):
+    login(client, listings[0])
+    assert client.post('/api/favorites/status', json=body).status_code == 400
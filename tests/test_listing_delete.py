@@ -0,0 +1,53 @@
+import pytest
+
+from conftest import login
+from extensions import db
+from models import Listing, Message, Conversation
+
+
+@pytest.fixture
+def thread_about_listing(app, make_user, category):
+    """Kupujúci napíše predajcovi správu k jeho inzerátu"""
+    seller, buyer = make_user('predajca', role='admin'), make_user('kupec')
+    with app.app_context():
+        listing = Listing(title='Horský bicykel', description='Málo jazdený bicykel', price=250,
+                          user_id=seller.id, category_id=category.id)
+        db.session.add(listing)
+        db.session.commit()
+        listing_id = listing.id
+
+    buyer_client = login(app.test_client(), buyer)
+    response = buyer_client.post('/api/send-message', json={
+        'receiver_id': seller.id, 'listing_id': listing_id, 'content': 'Je ešte k dispozícii?'})
+    assert response.status_code == 200
+    return seller, buyer, listing_id, buyer_client
+
+
+def _pair_conversations(seller, buyer):
+    return Conversation.query.filter_by(user_a_id=min(seller.id, buyer.id), user_b_id=max(seller.id, buyer.id)).all()
+
+
+@pytest.mark.parametrize('url', ['/listings/{id}/delete', '/admin/listings/{id}/delete'])
+def test_delete_listing_merges_conversation_into_general_thread(app, client, thread_about_listing, url):
+    seller, buyer, listing_id, buyer_client = thread_about_listing
+
+    login(client, seller)
+    assert client.post(url.format(id=listing_id)).status_code in (200, 302)
+
+    # Správy ostanú ako všeobecné a vlákno sa prepočíta v tej istej transakcii
+    with app.app_context():
+        assert db.session.get(Listing, listing_id) is None
+        assert Message.query.filter_by(listing_id=listing_id).count() == 0
+        assert [conversation.listing_id for conversation in _pair_conversations(seller, buyer)] == [None]
+
+    response = buyer_client.post('/api/send-message', json={
+        'receiver_id': seller.id, 'listing_id': None, 'content': 'Máte aj iný bicykel?'})
+    assert response.status_code == 200
+
+    with app.app_context():
+        conversations = _pair_conversations(seller, buyer)
+        assert [conversation.listing_id for conversation in conversations] == [None]
+        assert conversations[0].unread_a + conversations[0].unread_b == 2
+
+    threads = client.get('/api/conversations').get_json()
+    assert len(threads) == 1 and threads[0]['unread_count'] == 2
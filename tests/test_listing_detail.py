@@ -0,0 +1,21 @@
+import re
+
+from extensions import db
+from models import Listing, Image
+
+
+def test_first_carousel_image_is_loaded_eagerly(app, client, make_user, category):
+    user = make_user('predajca')
+    with app.app_context():
+        listing = Listing(title='Bicykel', description='Popis', price=10, user_id=user.id, category_id=category.id)
+        listing.images = [Image(filename=f'fotka-{i}.jpg', is_primary=i == 0) for i in range(3)]
+        db.session.add(listing)
+        db.session.commit()
+        listing_id = listing.id
+
+    page = client.get(f'/listings/{listing_id}').get_data(as_text=True)
+    carousel = re.findall(r'<img [^>]*alt="Bicykel - obrázok \d"[^>]*>', page)
+
+    assert len(carousel) == 3
+    assert 'loading="eager"' in carousel[0] and 'fetchpriority="high"' in carousel[0]
+    assert all('loading="lazy"' in img and 'fetchpriority' not in img for img in carousel[1:])
@@ -0,0 +1,49 @@
+import pytest
+
+from conftest import QueryCounter, login
+from extensions import db
+from models import Listing, Image, Favorite
+
+# Počet dotazov pre stránku s inzerátmi - nesmie rásť s počtom inzerátov (obrázky, kategória
+# a autor sa načítajú naraz cez listing_cards, žiadne N+1 dotazy pri vykresľovaní kariet)
+EXPECTED_QUERIES = {
+    '/': 2,
+    '/listings': 5,
+    '/api/my-listings': 3,
+    '/api/my-favorites': 3,
+}
+
+
+@pytest.fixture
+def seeded(app, make_user, category):
+    def seed(n):
+        """Prihlásený používateľ s n obľúbenými inzerátmi iného predajcu a n vlastnými (najnovšími),
+        každý inzerát s dvoma obrázkami"""
+        seller, owner = make_user('predajca'), make_user('kupec')
+        with app.app_context():
+            for author in (seller, owner):
+                for i in range(n):
+                    listing = Listing(title=f'Bicykel {i}', description='Málo jazdený bicykel', price=100 + i,
+                                      user_id=author.id, category_id=category.id)
+                    listing.images = [Image(filename=f'{author.username}-{i}-{j}.jpg', is_primary=j == 0)
+                                      for j in range(2)]
+                    db.session.add(listing)
+                    db.session.flush()
+                    if author is seller:
+                        db.session.add(Favorite(user_id=owner.id, listing_id=listing.id))
+            db.session.commit()
+        return login(app.test_client(), owner)
+
+    return seed
+
+
+@pytest.mark.parametrize('n', [1, 6, 20])
+@pytest.mark.parametrize('url', list(EXPECTED_QUERIES))
+def test_query_count_is_constant(seeded, url, n):
+    client = seeded(n)
+    # Prvá požiadavka naplní cache počtov a register kategórií, meria sa až druhá
+    assert client.get(url).status_code == 200
+
+    with QueryCounter() as counter:
+        assert client.get(url).status_code == 200
+    assert counter.count == EXPECTED_QUERIES[url]
@@ -0,0 +1,29 @@
+from conftest import login
+from models import Conversation
+import messaging
+
+
+def test_concurrent_first_messages_share_one_conversation(app, make_user, monkeypatch):
+    seller, buyer = make_user('predajca'), make_user('kupec')
+    seller_client, buyer_client = login(app.test_client(), seller), login(app.test_client(), buyer)
+
+    assert buyer_client.post('/api/send-message', json={
+        'receiver_id': seller.id, 'listing_id': None, 'content': 'Dobrý deň'}).status_code == 200
+
+    # Druhá požiadavka vlákno ešte nevidela (prišla v tom istom okamihu ako prvá)
+    find_conversation = messaging.find_conversation
+    calls = []
+
+    def not_yet_visible(*args):
+        calls.append(args)
+        return None if len(calls) == 1 else find_conversation(*args)
+
+    monkeypatch.setattr(messaging, 'find_conversation', not_yet_visible)
+    response = seller_client.post('/api/send-message', json={
+        'receiver_id': buyer.id, 'listing_id': None, 'content': 'Dobrý deň, áno'})
+    assert response.status_code == 200
+
+    with app.app_context():
+        conversations = Conversation.query.all()
+        assert len(conversations) == 1
+        assert (conversations[0].unread_a, conversations[0].unread_b) == (1, 1)
@@ -0,0 +1,50 @@
+from app import init_db
+from extensions import db
+from models import User, Listing, Image, Message, Favorite, Conversation, ModerationJob
+from moderation import moderation, delete_users, INTERRUPTED_ERROR
+
+
+def test_delete_users_removes_data_created_after_job_start(app, make_user, category):
+    user, other = make_user('podvodnik'), make_user('kupec')
+    with app.app_context():
+        # Inzerát a správy vzniknuté až po snímke ID v start_delete_user
+        listing = Listing(title='Nový inzerát', description='Pridaný počas mazania', price=10,
+                          user_id=user.id, category_id=category.id)
+        listing.images = [Image(filename='novy.jpg')]
+        foreign = Listing(title='Cudzí inzerát', description='Iného predajcu', price=20,
+                          user_id=other.id, category_id=category.id)
+        db.session.add_all([listing, foreign])
+        db.session.flush()
+        db.session.add_all([
+            Message(sender_id=other.id, receiver_id=user.id, listing_id=listing.id, content='Kúpim'),
+            Message(sender_id=user.id, receiver_id=other.id, listing_id=foreign.id, content='Mám záujem'),
+            Favorite(user_id=user.id, listing_id=foreign.id),
+        ])
+        db.session.commit()
+
+        references = delete_users([user.id])
+        db.session.commit()
+
+        assert references == [('novy.jpg', None)]
+        assert db.session.get(User, user.id) is None
+        assert Listing.query.filter_by(user_id=user.id).count() == 0
+        assert Message.query.count() == 0
+        assert Conversation.query.count() == 0
+        assert db.session.get(Listing, foreign.id).favorite_count == 0
+        assert db.session.get(Listing, foreign.id).message_count == 0
+
+
+def test_startup_fails_interrupted_jobs(app):
+    with app.app_context():
+        db.session.add_all([ModerationJob(action='delete_user', description='Prerušená', status='running'),
+                            ModerationJob(action='delete_user', description='Hotová', status='done')])
+        db.session.commit()
+
+    init_db(app)
+
+    with app.app_context():
+        jobs = {job.description: job for job in ModerationJob.query}
+        assert jobs['Prerušená'].status == 'failed' and jobs['Prerušená'].error == INTERRUPTED_ERROR
+        assert jobs['Prerušená'].finished_at is not None
+        assert jobs['Hotová'].status == 'done'
+        assert moderation.fail_interrupted_jobs() == 0
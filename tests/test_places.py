@@ -0,0 +1,23 @@
+from extensions import db
+from models import Listing, Place
+from places import assign_place, grid_cell
+
+
+def test_location_filter_keeps_listings_with_unresolved_location(app, client, make_user, category):
+    user = make_user('predajca')
+    with app.app_context():
+        db.session.add(Place(name='Pezinok', normalized_name='pezinok', district='Pezinok', region='Bratislavský',
+                             latitude=48.289, longitude=17.266, grid_cell=grid_cell(48.289, 17.266)))
+        db.session.flush()
+        for title, location in (('Bicykel v meste', 'Pezinok'), ('Bicykel z okolia', 'Pezinok okolie'),
+                                ('Bicykel inde', 'Trnava')):
+            listing = Listing(title=title, description='Popis', price=10, location=location,
+                              user_id=user.id, category_id=category.id)
+            assign_place(listing)
+            db.session.add(listing)
+        db.session.commit()
+        assert Listing.query.filter_by(location='Pezinok okolie').one().place_id is None
+
+    page = client.get('/listings?location=Pezinok').get_data(as_text=True)
+    assert 'Bicykel v meste' in page and 'Bicykel z okolia' in page
+    assert 'Bicykel inde' not in page
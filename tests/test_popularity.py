@@ -0,0 +1,30 @@
+import time
+
+from extensions import db
+from models import Listing
+from popularity import view_counter
+
+
+def test_views_are_flushed_in_background(app, client, make_user, category, monkeypatch):
+    user = make_user('predajca')
+    with app.app_context():
+        listing = Listing(title='Bicykel', description='Popis', price=10, user_id=user.id, category_id=category.id)
+        db.session.add(listing)
+        db.session.commit()
+        listing_id = listing.id
+
+    # Nový proces (napr. gunicorn worker po fork-e) si spustí vlastné vlákno zápisu
+    monkeypatch.setattr(view_counter, 'flush_interval', 0.05)
+    monkeypatch.setattr(view_counter, '_timer_pid', None)
+    for _ in range(3):
+        assert client.get(f'/listings/{listing_id}').status_code == 200
+
+    # Bez ďalšej požiadavky aj bez admin dashboardu
+    deadline = time.monotonic() + 2
+    while True:
+        with app.app_context():
+            view_count = db.session.get(Listing, listing_id).view_count
+        if view_count == 3 or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert view_count == 3
@@ -0,0 +1,60 @@
+import io
+import os
+
+from werkzeug.datastructures import FileStorage
+
+from extensions import db
+from models import Listing, Image
+from storage import store_upload, finish_uploads, release_files, upload_path, lock_files
+
+
+def _upload(content):
+    return FileStorage(stream=io.BytesIO(content), filename='fotka.jpg')
+
+
+def test_upload_survives_concurrent_release_of_same_content(app, make_user, category, tmp_path):
+    app.static_folder = str(tmp_path)
+    user = make_user('predajca')
+    with app.test_request_context():
+        listing = Listing(title='Bicykel', description='Popis', price=10, user_id=user.id, category_id=category.id)
+        db.session.add(listing)
+        db.session.commit()
+
+        filename = store_upload(app, _upload(b'rovnaky obsah'))
+        # Iná požiadavka medzitým zmazala posledný obrázok s rovnakým obsahom
+        release_files(app, [(filename, None)])
+        assert not os.path.exists(upload_path(app, filename))
+
+        db.session.add(Image(filename=filename, listing_id=listing.id))
+        db.session.flush()
+        finish_uploads(app)
+        db.session.commit()
+
+        assert os.path.exists(upload_path(app, filename))
+        assert [name for name in os.listdir(upload_path(app, '')) if name.startswith('.upload-')] == []
+
+        # Súbor s odkazom release_files nezmaže
+        release_files(app, [(filename, None)])
+        assert os.path.exists(upload_path(app, filename))
+
+
+class _RecordingConnection:
+    """Spojenie, ktoré len zaznamená príkazy (PostgreSQL tu nie je k dispozícii)"""
+
+    class dialect:
+        name = 'postgresql'
+
+    def __init__(self):
+        self.executed = []
+
+    def execute(self, statement, parameters=None):
+        self.executed.append((str(statement), parameters))
+
+
+def test_postgresql_takes_advisory_lock_per_file_in_order():
+    connection = _RecordingConnection()
+    lock_files(connection, ['b.jpg', 'a.jpg', 'b.jpg'])
+    assert connection.executed == [
+        ('SELECT pg_advisory_xact_lock(hashtext(:filename))', {'filename': 'a.jpg'}),
+        ('SELECT pg_advisory_xact_lock(hashtext(:filename))', {'filename': 'b.jpg'}),
+    ]
@@ -0,0 +1,62 @@
+from functools import wraps
+from flask import request, make_response
+from flask_login import current_user
+from extensions import db
+from models import User, Favorite, Conversation
+
+# ==================== VERZIE DÁT ====================
+# Každý používateľ má čísla verzií pre svoje inzeráty, obľúbené a správy (stĺpce na User).
+# Zvyšujú sa v tej istej transakcii ako zmena dát; dashboard API z nich skladajú ETag,
+# takže nezmenené dáta sa vôbec nenačítavajú a klient dostane 304 Not Modified.
+LISTINGS = 'listings_version'
+FAVORITES = 'favorites_version'
+MESSAGES = 'messages_version'
+
+
+def bump(version, *user_ids):
+    """Zvýši verziu `version` daným používateľom (jeden UPDATE)"""
+    user_ids = {int(user_id) for user_id in user_ids if user_id is not None}
+    if not user_ids:
+        return
+    column = getattr(User, version)
+    User.query.filter(User.id.in_(user_ids)) \
+        .update({column: column + 1}, synchronize_session=False)
+
+
+def bump_listing_watchers(listing_id):
+    """Zmena inzerátu mení obľúbené jeho fanúšikov a konverzácie, ktoré sa k nemu viažu"""
+    bump_listings_watchers([listing_id])
+
+
+def bump_listings_watchers(listing_ids):
+    """To isté ako bump_listing_watchers pre viac inzerátov naraz (zoznam ID alebo SELECT s ID)"""
+    favorite_user_ids = db.select(Favorite.user_id).where(Favorite.listing_id.in_(listing_ids))
+    User.query.filter(User.id.in_(favorite_user_ids)) \
+        .update({User.favorites_version: User.favorites_version + 1}, synchronize_session=False)
+
+    participants = db.session.execute(
+        db.select(Conversation.user_a_id, Conversation.user_b_id).where(Conversation.listing_id.in_(listing_ids))
+    ).all()
+    bump(MESSAGES, *[user_id for pair in participants for user_id in pair])
+
+
+# ==================== PODMIENENÝ GET ====================
+def versioned(version):
+    """Dekorátor pre JSON API prihláseného používateľa: ETag podľa verzie, pri zhode 304 bez volania view"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag = f'{version}-{current_user.id}-{getattr(current_user, version)}'
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        return decorated_function
+
+    return decorator
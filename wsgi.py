@@ -0,0 +1,11 @@
+"""WSGI vstupný bod pre produkčný server.
+
+    gunicorn -c gunicorn.conf.py wsgi:app          (Linux, viac procesov x vlákien)
+    waitress-serve --threads=8 wsgi:app            (Windows, jeden proces s vláknami)
+
+Databázu (tabuľky, migrácie, FTS index) treba pripraviť pred štartom workerov -
+gunicorn to robí v on_starting (gunicorn.conf.py), inak `flask --app app migrate`.
+"""
+from app import create_app
+
+app = create_app()